@@ -0,0 +1,249 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_batch import HeatExchangerBatch
+from heat_exchanger_reverse import HeatExchangerReverse
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+from workspace import REVERSE_OUTPUTS, Workspace, area_into, reverse_into
+
+MIXERS = (('none', 'none', 'none'), ('bypass_hot', 'bypass', 'none'), ('bypass_cold', 'none', 'bypass'), ('admixer_hot', 'admixer', 'none'), ('admixer_cold', 'none', 'admixer'))
+MIXER_SIDES = ('hot', 'cold')
+BATCH_ROWS = (10**3, 10**4, 10**5, 10**6, 10**7)
+MODULES = ('heat_exchanger', 'heat_exchanger_reverse', 'heat_exchanger_batch', 'heat_exchanger_reverse_batch', 'heat_exchanger_fast', 'lambert_w', 'lmtd')
+THRESHOLD = 0.25
+
+inlet_temperatures = [80.0, 20.0]
+film_heat_transfer_coefficients = [1, 1]
+heat_capacity_flows = [5, 4]
+heat_load = 50
+mixer_fraction = 0.2
+
+
+def time_per_call(function, repeat=5):
+    """Best time (s) of one call of the function out of several repeats of timeit's automatic number of calls"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def heat_exchanger_benchmarks():
+    """Area of a new HeatExchanger per mixer type, so every call runs the full (uncached) property chain"""
+    benchmarks = {}
+    for name, mixer_type_hot, mixer_type_cold in MIXERS:
+        def benchmark(mixer_type_hot=mixer_type_hot, mixer_type_cold=mixer_type_cold):
+            return HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, mixer_type_hot, mixer_type_cold, mixer_fraction, mixer_fraction).area
+        benchmarks['heat_exchanger_area_' + name] = benchmark
+    return benchmarks
+
+
+def heat_exchanger_reverse_benchmarks():
+    """heat_exchanger_temperature_calculation of HeatExchangerReverse per mixer type and mixer side"""
+    area = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load).area
+    benchmarks = {}
+    for mixer_type, existent_area in (('admixer', 0.8 * area), ('bypass', 1.2 * area)):
+        for mixer_side in MIXER_SIDES:
+            def benchmark(existent_area=existent_area, mixer_side=mixer_side):
+                m = HeatExchangerReverse(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area)
+                m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+            benchmarks['heat_exchanger_reverse_{}_{}'.format(mixer_type, mixer_side)] = benchmark
+    return benchmarks
+
+
+def batch_benchmarks(batch_rows=BATCH_ROWS):
+    """Areas of HeatExchangerBatch and mixer fractions of HeatExchangerReverseBatch over heat loads of 25...75 kW with a hot bypass and a cold mixer
+
+    Returns:
+        dict: Benchmark name -> setup function creating the rows and returning the benchmark, so only the selected benchmarks allocate their rows
+    """
+    area = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load).area
+    benchmarks = {}
+    for rows in batch_rows:
+        def setup(rows=rows):
+            heat_loads = np.linspace(25, 75, rows)
+
+            def benchmark():
+                return HeatExchangerBatch(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_loads, 'bypass', 'none', mixer_fraction).area
+            return benchmark
+
+        def reverse_setup(rows=rows):
+            heat_loads = np.linspace(25, 75, rows)
+
+            def benchmark():
+                m = HeatExchangerReverseBatch(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_loads, area)
+                m.heat_exchanger_temperature_calculation(mixer_side='cold')
+            return benchmark
+        benchmarks['heat_exchanger_batch_{}'.format(rows)] = setup
+        benchmarks['heat_exchanger_reverse_batch_{}'.format(rows)] = reverse_setup
+    return benchmarks
+
+
+def workspace_benchmarks(batch_rows=BATCH_ROWS):
+    """The calculations of batch_benchmarks with the in-place functions of workspace.py and preallocated outputs
+
+    Returns:
+        dict: Benchmark name -> setup function creating the rows, the workspace and the outputs and returning the benchmark
+    """
+    area = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load).area
+    columns = dict(inlet_temperature_hot_stream=inlet_temperatures[0], inlet_temperature_cold_stream=inlet_temperatures[1], film_heat_transfer_coefficient_hot_stream=film_heat_transfer_coefficients[0], film_heat_transfer_coefficient_cold_stream=film_heat_transfer_coefficients[1], heat_capacity_flow_hot_stream=heat_capacity_flows[0], heat_capacity_flow_cold_stream=heat_capacity_flows[1], mixer_type_hot='bypass', mixer_fraction_hot=mixer_fraction, existent_area=area)
+    benchmarks = {}
+    for rows in batch_rows:
+        def setup(rows=rows):
+            chunk = dict(columns, heat_load=np.linspace(25, 75, rows))
+            workspace = Workspace(rows)
+            areas = np.empty(rows)
+
+            def benchmark():
+                return area_into(chunk, workspace, areas)
+            return benchmark
+
+        def reverse_setup(rows=rows):
+            chunk = dict(columns, heat_load=np.linspace(25, 75, rows))
+            workspace = Workspace(rows)
+            outputs = {name: np.empty(rows, dtype=dtype) for name, dtype in REVERSE_OUTPUTS}
+
+            def benchmark():
+                return reverse_into(chunk, workspace, 'cold', outputs)
+            return benchmark
+        benchmarks['workspace_area_{}'.format(rows)] = setup
+        benchmarks['workspace_reverse_{}'.format(rows)] = reverse_setup
+    return benchmarks
+
+
+def peak_memory(function):
+    """Peak of the memory (bytes) allocated by one call of the function after a warm-up call, traced with tracemalloc (NumPy reports its array data to tracemalloc)"""
+    function()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_memory(batch_rows=BATCH_ROWS, select=None):
+    """Measures the peak memory of the batch and workspace benchmarks whose name contains select
+
+    Counting single allocations needs a hook into the C allocator, so the number of temporary row arrays is reported as the peak memory in units of one row array of floats.
+
+    Returns:
+        dict: Benchmark name -> dict of peak_bytes and peak_row_arrays
+    """
+    setups = {}
+    setups.update(batch_benchmarks(batch_rows))
+    setups.update(workspace_benchmarks(batch_rows))
+    memory = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, setup in setups.items():
+            if select is None or select in name:
+                peak = peak_memory(setup())
+                memory[name] = dict(peak_bytes=peak, peak_row_arrays=peak / (8 * int(name.rsplit('_', 1)[1])))
+    return memory
+
+
+def import_time(module, repeat=5):
+    """Best cold start time (s) of importing the module in a new interpreter"""
+    code = 'import time; start = time.perf_counter(); import {}; print(time.perf_counter() - start)'.format(module)
+    return min(float(subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout) for _ in range(repeat))
+
+
+def run(batch_rows=BATCH_ROWS, modules=MODULES, select=None, repeat=5):
+    """Runs all benchmarks whose name contains select
+
+    Args:
+        batch_rows (tuple, optional): Numbers of rows of the batch benchmarks. Defaults to BATCH_ROWS.
+        modules (tuple, optional): Modules of the import benchmarks. Defaults to MODULES.
+        select (str, optional): Only run benchmarks whose name contains this string. Defaults to None (all).
+        repeat (int, optional): Number of repeats, the best one is kept. Defaults to 5.
+
+    Returns:
+        dict: Benchmark name -> time (s)
+    """
+    benchmarks = {}
+    benchmarks.update(heat_exchanger_benchmarks())
+    benchmarks.update(heat_exchanger_reverse_benchmarks())
+    setups = {}
+    setups.update(batch_benchmarks(batch_rows))
+    setups.update(workspace_benchmarks(batch_rows))
+    results = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, benchmark in benchmarks.items():
+            if select is None or select in name:
+                results[name] = time_per_call(benchmark, repeat)
+        # The rows of a batch benchmark only exist while it is timed
+        for name, setup in setups.items():
+            if select is None or select in name:
+                results[name] = time_per_call(setup(), repeat)
+    for module in modules:
+        name = 'import_' + module
+        if select is None or select in name:
+            results[name] = import_time(module, repeat)
+    return results
+
+
+def save(results, path, memory=None):
+    """Saves the results and the peak memory of run_memory together with the Python and numpy versions as JSON"""
+    with open(path, 'w') as json_file:
+        json.dump(dict(python=platform.python_version(), numpy=np.__version__, machine=platform.machine(), results=results, memory=memory or {}), json_file, indent=2, sort_keys=True)
+
+
+def load(path):
+    """Loads the results (benchmark name -> time (s)) of a JSON file written by save"""
+    with open(path) as json_file:
+        return json.load(json_file)['results']
+
+
+def compare(baseline, results, threshold=THRESHOLD):
+    """Compares the results with a baseline
+
+    Args:
+        baseline (dict): Benchmark name -> time (s) of the baseline run
+        results (dict): Benchmark name -> time (s) of the current run
+        threshold (float, optional): Relative slow down counted as regression. Defaults to THRESHOLD.
+
+    Returns:
+        list: (name, baseline time, time, ratio) of every benchmark in both runs, and list of the names of the regressions
+    """
+    rows = [(name, baseline[name], results[name], results[name] / baseline[name]) for name in results if name in baseline]
+    regressions = [name for name, _, _, ratio in rows if ratio > 1 + threshold]
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of the heat exchanger calculation')
+    parser.add_argument('--save', help='JSON file for the results')
+    parser.add_argument('--compare', help='JSON file of a baseline run; exits with 1 if a benchmark regressed')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='relative slow down counted as regression (default: %(default)s)')
+    parser.add_argument('--maximum-rows', type=int, default=max(BATCH_ROWS), help='largest batch benchmark (default: %(default)s)')
+    parser.add_argument('--select', help='only run benchmarks whose name contains this string')
+    parser.add_argument('--repeat', type=int, default=5, help='number of repeats, the best one is kept (default: %(default)s)')
+    parser.add_argument('--memory', action='store_true', help='also measure the peak memory of the batch benchmarks')
+    arguments = parser.parse_args(argv)
+
+    batch_rows = [rows for rows in BATCH_ROWS if rows <= arguments.maximum_rows]
+    results = run(batch_rows, select=arguments.select, repeat=arguments.repeat)
+    memory = run_memory(batch_rows, select=arguments.select) if arguments.memory else {}
+    if arguments.save:
+        save(results, arguments.save, memory)
+    if not arguments.compare:
+        for name, seconds in results.items():
+            print('{:<45} {:>12.3e} s'.format(name, seconds))
+        for name, peak in memory.items():
+            print('{:<45} {:>12.3e} B {:>9.2f} row arrays'.format(name, peak['peak_bytes'], peak['peak_row_arrays']))
+        return 0
+    rows, regressions = compare(load(arguments.compare), results, arguments.threshold)
+    for name, baseline_seconds, seconds, ratio in rows:
+        print('{:<45} {:>12.3e} s {:>12.3e} s {:>7.2f}{}'.format(name, baseline_seconds, seconds, ratio, '  REGRESSION' if name in regressions else ''))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import collections
+import threading
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_reverse import HeatExchangerReverse
+
+HEAT_EXCHANGER_FIELDS = ('inlet_temperature_hot_stream', 'inlet_temperature_cold_stream', 'film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream', 'heat_capacity_flow_hot_stream', 'heat_capacity_flow_cold_stream', 'heat_load', 'mixer_fraction_hot', 'mixer_fraction_cold')
+HEAT_EXCHANGER_REVERSE_FIELDS = HEAT_EXCHANGER_FIELDS[:7] + ('existent_area',)
+FIELDS = HEAT_EXCHANGER_FIELDS + ('existent_area',)
+
+HeatExchangerResult = collections.namedtuple('HeatExchangerResult', ['overall_heat_transfer_coefficient', 'outlet_temperature_hot_stream', 'outlet_temperature_cold_stream', 'heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream', 'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_cold_stream', 'logarithmic_temperature_difference', 'area'])
+HeatExchangerResult.__doc__ = """Properties of a HeatExchanger at a quantized operating point"""
+HeatExchangerReverseResult = collections.namedtuple('HeatExchangerReverseResult', ['area_no_mixer', 'mixer_type', 'admixer_fraction', 'bypass_fraction', 'heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream', 'heat_exchanger_outlet_temperature_cold_stream'])
+HeatExchangerReverseResult.__doc__ = """Properties of a HeatExchangerReverse after heat_exchanger_temperature_calculation at a quantized operating point"""
+
+
+class QuantizedCache:
+    """Class for a bounded LRU cache of heat exchanger results keyed on quantized operating points
+
+        Every numeric input is rounded to a multiple of its tolerance, and the result is calculated at the rounded operating point, so it does not depend on which of the nearly equal operating points came first. Inputs without tolerance are only equal for equal values.
+        The cache is thread safe; two threads missing the same operating point at the same time both calculate it.
+
+        Arguments:
+            maximum_size {int} -- Largest number of cached results, the least recently used result is evicted first
+            tolerances {dict} -- Input name (see FIELDS) -> quantization step, e.g. dict(inlet_temperature_hot_stream=0.1, heat_load=1)
+        Properties:
+            hits {int} -- Number of results returned from the cache
+            misses {int} -- Number of calculated results
+            evictions {int} -- Number of evicted results
+        """
+
+    def __init__(self, maximum_size=4096, tolerances=None):
+        tolerances = dict(tolerances or {})
+        if maximum_size < 1 or not set(tolerances) <= set(FIELDS) or any(not tolerance >= 0 for tolerance in tolerances.values()):
+            raise Exception("Sorry, the cache needs a positive size and tolerances >= 0 of known inputs")
+        self.maximum_size = maximum_size
+        self.tolerances = tolerances
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def quantize(self, names, values):
+        """Rounds the values to multiples of the tolerances of their inputs
+
+        Returns:
+            tuple: Key (tuple of integer multiples or exact values) and rounded values
+        """
+        key = []
+        rounded = []
+        for name, value in zip(names, values):
+            tolerance = self.tolerances.get(name)
+            if tolerance:
+                step = round(value / tolerance)
+                key.append(step)
+                rounded.append(step * tolerance)
+            else:
+                key.append(value)
+                rounded.append(value)
+        return tuple(key), rounded
+
+    def lookup(self, key, calculation):
+        """Returns the cached result of the key or calculates, stores and returns it; exceptions of the calculation are not cached"""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        result = calculation()
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maximum_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def heat_exchanger(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, mixer_type_hot='none', mixer_type_cold='none', mixer_fraction_hot=0, mixer_fraction_cold=0, lmtd_mode='exact'):
+        """Cached properties of HeatExchanger (same arguments)
+
+        Returns:
+            HeatExchangerResult: Properties at the quantized operating point
+        """
+        key, values = self.quantize(HEAT_EXCHANGER_FIELDS, (inlet_temperatures[0], inlet_temperatures[1], film_heat_transfer_coefficients[0], film_heat_transfer_coefficients[1], heat_capacity_flows[0], heat_capacity_flows[1], heat_load, mixer_fraction_hot, mixer_fraction_cold))
+
+        def calculation():
+            m = HeatExchanger(values[0:2], values[2:4], values[4:6], values[6], mixer_type_hot, mixer_type_cold, values[7], values[8], lmtd_mode)
+            return HeatExchangerResult(*(getattr(m, name) for name in HeatExchangerResult._fields))
+        return self.lookup(('heat_exchanger', mixer_type_hot, mixer_type_cold, lmtd_mode) + key, calculation)
+
+    def heat_exchanger_reverse(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area, mixer_side='none', lmtd_mode='exact'):
+        """Cached mixer calculation of HeatExchangerReverse (same arguments and mixer_side of heat_exchanger_temperature_calculation)
+
+        Returns:
+            HeatExchangerReverseResult: Properties at the quantized operating point
+        """
+        key, values = self.quantize(HEAT_EXCHANGER_REVERSE_FIELDS, (inlet_temperatures[0], inlet_temperatures[1], film_heat_transfer_coefficients[0], film_heat_transfer_coefficients[1], heat_capacity_flows[0], heat_capacity_flows[1], heat_load, existent_area))
+
+        def calculation():
+            m = HeatExchangerReverse(values[0:2], values[2:4], values[4:6], values[6], values[7], lmtd_mode)
+            m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+            return HeatExchangerReverseResult(*(getattr(m, name) for name in HeatExchangerReverseResult._fields))
+        return self.lookup(('heat_exchanger_reverse', mixer_side, lmtd_mode) + key, calculation)
+
+    def statistics(self):
+        """Hit and miss statistics
+
+        Returns:
+            dict: size, maximum_size, hits, misses, evictions and hit_rate (hits per lookup)
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(size=len(self._entries), maximum_size=self.maximum_size, hits=self.hits, misses=self.misses, evictions=self.evictions, hit_rate=self.hits / lookups if lookups else 0.0)
+
+    def clear(self):
+        """Removes all results and resets the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
@@ -0,0 +1,138 @@
+import struct
+
+import numpy as np
+
+from heat_exchanger_batch import HeatExchangerBatch, mixer_type_codes
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+
+# File layout: fixed header, column table, then one contiguous column per field, every column aligned to ALIGNMENT bytes
+MAGIC = b'HEXCOL01'
+HEADER = struct.Struct('<8sQI')
+COLUMN_ENTRY = struct.Struct('<64s2sQ')
+ALIGNMENT = 64
+DTYPES = {'f8': np.float64, 'i1': np.int8}
+
+HEAT_EXCHANGER_COLUMNS = (
+    ('inlet_temperature_hot_stream', 'f8'), ('inlet_temperature_cold_stream', 'f8'),
+    ('film_heat_transfer_coefficient_hot_stream', 'f8'), ('film_heat_transfer_coefficient_cold_stream', 'f8'),
+    ('heat_capacity_flow_hot_stream', 'f8'), ('heat_capacity_flow_cold_stream', 'f8'),
+    ('heat_load', 'f8'),
+    ('mixer_type_hot', 'i1'), ('mixer_type_cold', 'i1'), ('mixer_fraction_hot', 'f8'), ('mixer_fraction_cold', 'f8'),
+    ('outlet_temperature_hot_stream', 'f8'), ('outlet_temperature_cold_stream', 'f8'),
+    ('logarithmic_temperature_difference', 'f8'), ('area', 'f8'))
+HEAT_EXCHANGER_REVERSE_COLUMNS = (
+    ('inlet_temperature_hot_stream', 'f8'), ('inlet_temperature_cold_stream', 'f8'),
+    ('film_heat_transfer_coefficient_hot_stream', 'f8'), ('film_heat_transfer_coefficient_cold_stream', 'f8'),
+    ('heat_capacity_flow_hot_stream', 'f8'), ('heat_capacity_flow_cold_stream', 'f8'),
+    ('heat_load', 'f8'), ('existent_area', 'f8'),
+    ('mixer_type', 'i1'), ('admixer_fraction', 'f8'), ('bypass_fraction', 'f8'),
+    ('heat_exchanger_inlet_temperature_hot_stream', 'f8'), ('heat_exchanger_outlet_temperature_hot_stream', 'f8'),
+    ('heat_exchanger_inlet_temperature_cold_stream', 'f8'), ('heat_exchanger_outlet_temperature_cold_stream', 'f8'))
+
+
+def aligned(offset):
+    """Rounds the byte offset up to the next multiple of ALIGNMENT"""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class CaseFile:
+    """Class for memory-mapped columnar case files of HeatExchanger and HeatExchangerReverse
+
+        The file starts with a fixed header (magic, number of rows, number of columns) and a column table (name, dtype, offset), followed by one contiguous float64 or int8 column per input and output field.
+        Columns are numpy.memmap views, so batch calculations read them without copies and write results back in place, and several processes can share one file.
+
+        Arguments:
+            path {str} -- Path of the case file
+            mode {str} -- r (read only), r+ (read and write in place), or c (copy on write)
+        Properties:
+            number_of_rows {int} -- Number of cases
+            columns {dict} -- Column name -> numpy.memmap
+        """
+
+    def __init__(self, path, mode='r+'):
+        self.path = path
+        with open(path, 'rb') as case_file:
+            magic, self.number_of_rows, number_of_columns = HEADER.unpack(case_file.read(HEADER.size))
+            if magic != MAGIC:
+                raise Exception("Sorry, this is no heat exchanger case file")
+            entries = [COLUMN_ENTRY.unpack(case_file.read(COLUMN_ENTRY.size)) for _ in range(number_of_columns)]
+        self.columns = {}
+        for name, dtype, offset in entries:
+            name = name.rstrip(b'\0').decode()
+            self.columns[name] = np.memmap(path, dtype=DTYPES[dtype.decode()], mode=mode, offset=offset, shape=(self.number_of_rows,))
+
+    @classmethod
+    def create(cls, path, number_of_rows, columns, data=None):
+        """Creates a case file with all columns set to zero (or the given data)
+
+        Args:
+            path (str): Path of the case file
+            number_of_rows (int): Number of cases
+            columns (tuple): (name, dtype) pairs with dtype f8 or i1, e.g. HEAT_EXCHANGER_COLUMNS
+            data (dict, optional): Column name -> values written to the new file. Defaults to None.
+
+        Returns:
+            CaseFile: The new case file opened for reading and writing
+        """
+        offset = aligned(HEADER.size + len(columns) * COLUMN_ENTRY.size)
+        entries = []
+        for name, dtype in columns:
+            if len(name.encode()) > 64 or dtype not in DTYPES:
+                raise Exception("Sorry, column names are limited to 64 bytes and dtypes to f8 or i1")
+            entries.append(COLUMN_ENTRY.pack(name.encode(), dtype.encode(), offset))
+            offset = aligned(offset + number_of_rows * np.dtype(DTYPES[dtype]).itemsize)
+        with open(path, 'wb') as case_file:
+            case_file.write(HEADER.pack(MAGIC, number_of_rows, len(columns)))
+            case_file.write(b''.join(entries))
+            case_file.truncate(offset)
+        case_set = cls(path, 'r+')
+        for name, values in (data or {}).items():
+            if name.startswith('mixer_type'):
+                values = mixer_type_codes(values)
+            case_set.columns[name][:] = values
+        case_set.flush()
+        return case_set
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def rows(self, start=0, stop=None):
+        """View of the rows start...stop of every column, without copies"""
+        return {name: column[start:stop] for name, column in self.columns.items()}
+
+    def flush(self):
+        for column in self.columns.values():
+            column.flush()
+
+
+def run_heat_exchanger(case_file, start=0, stop=None):
+    """Sizes the heat exchangers of the rows start...stop with HeatExchangerBatch and writes the results back in place
+
+    Args:
+        case_file (CaseFile): Case file with the HEAT_EXCHANGER_COLUMNS, opened with mode r+
+        start (int, optional): First row. Defaults to 0.
+        stop (int, optional): End of the rows. Defaults to None (last row).
+    """
+    rows = case_file.rows(start, stop)
+    b = HeatExchangerBatch.from_columns(rows)
+    rows['outlet_temperature_hot_stream'][:] = b.outlet_temperature_hot_stream
+    rows['outlet_temperature_cold_stream'][:] = b.outlet_temperature_cold_stream
+    rows['logarithmic_temperature_difference'][:] = b.logarithmic_temperature_difference
+    rows['area'][:] = b.area
+
+
+def run_heat_exchanger_reverse(case_file, start=0, stop=None, mixer_side='none'):
+    """Calculates the mixer types, mixer fractions and temperatures of the rows start...stop with HeatExchangerReverseBatch and writes them back in place
+
+    Args:
+        case_file (CaseFile): Case file with the HEAT_EXCHANGER_REVERSE_COLUMNS, opened with mode r+
+        start (int, optional): First row. Defaults to 0.
+        stop (int, optional): End of the rows. Defaults to None (last row).
+        mixer_side (str, optional): Side of the mixer, see heat_exchanger_temperature_calculation. Defaults to 'none'.
+    """
+    rows = case_file.rows(start, stop)
+    m = HeatExchangerReverseBatch.from_columns(rows)
+    m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+    rows['mixer_type'][:] = m.mixer_type
+    for name in ('admixer_fraction', 'bypass_fraction', 'heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream', 'heat_exchanger_outlet_temperature_cold_stream'):
+        rows[name][:] = getattr(m, name)
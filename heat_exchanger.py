@@ -1,9 +1,46 @@
-import numpy as np
+import functools
 
+from heat_exchanger_batch import HeatExchangerBatch
+from lmtd import logarithmic_mean_temperature_difference
 
+
+def cached_property(*dependencies):
+    """Property whose value is cached until one of the attributes it depends on is assigned again
+
+    Args:
+        dependencies (str): Names of the input attributes the property is calculated from
+    """
+    def decorator(function):
+        name = function.__name__
+
+        @functools.wraps(function)
+        def getter(self):
+            try:
+                return self._cache[name]
+            except KeyError:
+                value = self._cache[name] = function(self)
+                return value
+        getter.dependencies = frozenset(dependencies)
+        return property(getter)
+    return decorator
+
+
+def track_dependencies(cls):
+    """Class decorator mapping every input attribute to the cached properties that have to be invalidated when it is assigned"""
+    cls._dependents = {}
+    for name, value in vars(cls).items():
+        if isinstance(value, property):
+            for dependency in getattr(value.fget, 'dependencies', ()):
+                cls._dependents.setdefault(dependency, []).append(name)
+    return cls
+
+
+@track_dependencies
 class HeatExchanger:
     """Class for heat exchanger calculation
 
+        Derived properties are cached; assigning an input attribute only invalidates the properties depending on it.
+
         Arguments:
             inlet_temperatures {float} -- List of inlet temperatures (°C) with hot stream [0] and cold stream [1]
             film_heat_transfer_coefficients {float} -- List of film heat transfer coefficients(kW/(m2K) with hot stream [0] and cold stream [1]
@@ -13,6 +50,7 @@ class HeatExchanger:
             mixer_type_cold {string} -- none, bypass, or admixer
             mixer_fraction_hot {float} -- 0...1 ((kg/s)/(kg/s))
             mixer_fraction_cold {float} -- 0...1 ((kg/s)/(kg/s))
+            lmtd_mode {string} -- exact, chen, underwood, or paterson (see lmtd.py)
         Properties:
             inlet_temperature_hot_stream {float} -- inlet temperature hot stream (°C)
             inlet_temperature_cold_stream {float} -- inlet temperature cold stream (°C)
@@ -32,7 +70,9 @@ class HeatExchanger:
             area {float} -- Resulting area (m2)
         """
 
-    def __init__(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, mixer_type_hot='none', mixer_type_cold='none', mixer_fraction_hot=0, mixer_fraction_cold=0):
+    def __init__(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, mixer_type_hot='none', mixer_type_cold='none', mixer_fraction_hot=0, mixer_fraction_cold=0, lmtd_mode='exact'):
+        self._cache = {}
+        self.lmtd_mode = lmtd_mode
         self.mixer_type_hot = mixer_type_hot
         self.mixer_type_cold = mixer_type_cold
         self.mixer_fraction_hot = mixer_fraction_hot
@@ -45,47 +85,57 @@ class HeatExchanger:
         self.heat_capacity_flow_cold_stream = heat_capacity_flows[1]
         self.heat_load = heat_load
 
-    @property
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        for dependent in self._dependents.get(name, ()):
+            self._cache.pop(dependent, None)
+
+    @cached_property('film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream')
     def overall_heat_transfer_coefficient(self):
         return 1 / (1 / self.film_heat_transfer_coefficient_hot_stream + 1 / self.film_heat_transfer_coefficient_cold_stream)
 
-    @property
+    @cached_property('inlet_temperature_hot_stream', 'heat_capacity_flow_hot_stream', 'heat_load', 'mixer_type_hot', 'mixer_fraction_hot')
     def heat_exchanger_inlet_temperature_hot_stream(self):
         return self.heat_exchanger_inlet_temperature_calculation(self.inlet_temperature_hot_stream, self.heat_capacity_flow_hot_stream, self.mixer_type_hot, self.mixer_fraction_hot, 'hot')
 
-    @property
+    @cached_property('inlet_temperature_cold_stream', 'heat_capacity_flow_cold_stream', 'heat_load', 'mixer_type_cold', 'mixer_fraction_cold')
     def heat_exchanger_inlet_temperature_cold_stream(self):
         return self.heat_exchanger_inlet_temperature_calculation(self.inlet_temperature_cold_stream, self.heat_capacity_flow_cold_stream, self.mixer_type_cold, self.mixer_fraction_cold, 'cold')
 
-    @property
+    @cached_property('inlet_temperature_hot_stream', 'heat_capacity_flow_hot_stream', 'heat_load', 'mixer_type_hot', 'mixer_fraction_hot')
     def heat_exchanger_outlet_temperature_hot_stream(self):
         return self.heat_exchanger_outlet_temperature_calculation(self.heat_exchanger_inlet_temperature_hot_stream, self.heat_capacity_flow_hot_stream, self.mixer_type_hot, self.mixer_fraction_hot, 'hot')
 
-    @property
+    @cached_property('inlet_temperature_cold_stream', 'heat_capacity_flow_cold_stream', 'heat_load', 'mixer_type_cold', 'mixer_fraction_cold')
     def heat_exchanger_outlet_temperature_cold_stream(self):
         return self.heat_exchanger_outlet_temperature_calculation(self.heat_exchanger_inlet_temperature_cold_stream, self.heat_capacity_flow_cold_stream, self.mixer_type_cold, self.mixer_fraction_cold, 'cold')
 
-    @property
+    @cached_property('inlet_temperature_hot_stream', 'heat_capacity_flow_hot_stream', 'heat_load')
     def outlet_temperature_hot_stream(self):
         return self.inlet_temperature_hot_stream + self.stream_temperature_difference(self.heat_capacity_flow_hot_stream, 'none', 0, 'hot')
 
-    @property
+    @cached_property('inlet_temperature_cold_stream', 'heat_capacity_flow_cold_stream', 'heat_load')
     def outlet_temperature_cold_stream(self):
         return self.inlet_temperature_cold_stream + self.stream_temperature_difference(self.heat_capacity_flow_cold_stream, 'none', 0, 'cold')
 
-    @property
+    @cached_property('inlet_temperature_hot_stream', 'heat_capacity_flow_hot_stream', 'heat_load', 'mixer_type_hot', 'mixer_fraction_hot', 'inlet_temperature_cold_stream', 'heat_capacity_flow_cold_stream', 'mixer_type_cold', 'mixer_fraction_cold', 'lmtd_mode')
     def logarithmic_temperature_difference(self):
         temperature_difference_a = self.heat_exchanger_outlet_temperature_hot_stream - self.heat_exchanger_inlet_temperature_cold_stream
         temperature_difference_b = self.heat_exchanger_inlet_temperature_hot_stream - self.heat_exchanger_outlet_temperature_cold_stream
-        if temperature_difference_a == temperature_difference_b:
-            return temperature_difference_a
-        else:
-            return (temperature_difference_a - temperature_difference_b) / np.log(temperature_difference_a / temperature_difference_b)
+        return logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, self.lmtd_mode)
 
-    @property
+    @cached_property('film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream', 'inlet_temperature_hot_stream', 'heat_capacity_flow_hot_stream', 'heat_load', 'mixer_type_hot', 'mixer_fraction_hot', 'inlet_temperature_cold_stream', 'heat_capacity_flow_cold_stream', 'mixer_type_cold', 'mixer_fraction_cold', 'lmtd_mode')
     def area(self):
         return self.heat_load / (self.overall_heat_transfer_coefficient * self.logarithmic_temperature_difference)
 
+    def area_gradient(self):
+        """Calculates the partial derivatives of the area with respect to all numeric inputs, see HeatExchangerBatch.area_gradient
+
+        Returns:
+            dict: Input name -> dA/dinput (float)
+        """
+        return {name: float(value) for name, value in HeatExchangerBatch.from_columns(vars(self)).area_gradient().items()}
+
     def heat_exchanger_inlet_temperature_calculation(self, inlet_temperature, heat_capacity_flow, mixer_type, mixer_fraction, stream_type):
         if mixer_type == 'bypass' or mixer_type == 'none':
             return inlet_temperature
@@ -0,0 +1,216 @@
+import numpy as np
+
+from lmtd import logarithmic_mean_temperature_difference, logarithmic_mean_temperature_difference_gradient
+
+MIXER_TYPES = ('none', 'bypass', 'admixer')
+NONE, BYPASS, ADMIXER = range(len(MIXER_TYPES))
+
+
+def mixer_type_codes(mixer_types):
+    """Converts mixer type names (or codes) to an array of integer codes
+
+    Args:
+        mixer_types (str or array): none, bypass, or admixer per row, or the matching codes 0, 1, or 2
+
+    Returns:
+        array: int8 codes with none = 0, bypass = 1 and admixer = 2
+    """
+    mixer_types = np.asarray(mixer_types)
+    if mixer_types.dtype.kind in 'iu':
+        codes = mixer_types.astype(np.int8)
+    else:
+        codes = np.full(mixer_types.shape, -1, dtype=np.int8)
+        for code, name in enumerate(MIXER_TYPES):
+            codes[mixer_types == name] = code
+    if np.any((codes < 0) | (codes >= len(MIXER_TYPES))):
+        raise Exception("Sorry, you've misspelled the mixer type")
+    return codes
+
+
+def mixer_type_names(codes):
+    """Converts integer mixer type codes back to an array of mixer type names"""
+    return np.asarray(MIXER_TYPES)[np.asarray(codes)]
+
+
+class HeatExchangerBatch:
+    """Class for vectorized heat exchanger calculation of many operating cases at once
+
+        Every argument is either a scalar or an array; all arrays are broadcast against each other and every row is one heat exchanger.
+
+        Arguments:
+            inlet_temperatures {array} -- Inlet temperatures (°C) with hot streams [0] and cold streams [1]
+            film_heat_transfer_coefficients {array} -- Film heat transfer coefficients(kW/(m2K) with hot streams [0] and cold streams [1]
+            heat_capacity_flows {array} -- Heat capacity flows (kW/K) with hot streams [0] and cold streams [1]
+            heat_load {array} -- Heat loads (kW)
+            mixer_type_hot {array} -- none, bypass, or admixer per row (names or codes)
+            mixer_type_cold {array} -- none, bypass, or admixer per row (names or codes)
+            mixer_fraction_hot {array} -- 0...1 ((kg/s)/(kg/s))
+            mixer_fraction_cold {array} -- 0...1 ((kg/s)/(kg/s))
+            lmtd_mode {string} -- exact, chen, underwood, or paterson (see lmtd.py)
+        Properties:
+            inlet_temperature_hot_stream {array} -- inlet temperatures hot streams (°C)
+            inlet_temperature_cold_stream {array} -- inlet temperatures cold streams (°C)
+            heat_exchanger_inlet_temperature_hot_stream {array} -- inlet temperatures hot streams in mixer (°C)
+            heat_exchanger_inlet_temperature_cold_stream {array} -- inlet temperatures cold streams in mixer (°C)
+            film_heat_transfer_coefficient_hot_stream {array} -- Film heat transfer coefficients hot streams (kW/(m2K))
+            film_heat_transfer_coefficient_cold_stream {array} -- Film heat transfer coefficients cold streams (kW/(m2K))
+            heat_capacity_flow_hot_stream {array} -- Heat capacity flows hot streams (kW/K)
+            heat_capacity_flow_cold_stream {array} -- Heat capacity flows cold streams (kW/K)
+            heat_load {array} -- Heat loads (kW)
+            mixer_type_hot {array} -- Mixer type codes hot side (none = 0, bypass = 1, admixer = 2)
+            mixer_type_cold {array} -- Mixer type codes cold side (none = 0, bypass = 1, admixer = 2)
+            overall_heat_transfer_coefficient {array} -- Resulting overall heat transfer coefficients (kW/(m2K))
+            outlet_temperature_hot_stream {array} -- Resulting outlet temperatures of hot streams (°C)
+            outlet_temperature_cold_stream {array} -- Resulting outlet temperatures of cold streams (°C)
+            heat_exchanger_outlet_temperature_hot_stream {array} -- Resulting temperatures hot streams out of mixer (°C)
+            heat_exchanger_outlet_temperature_cold_stream {array} -- Resulting temperatures cold streams out of mixer (°C)
+            temperature_difference_a {array} -- Resulting temperature differences at the hot stream outlet (K)
+            temperature_difference_b {array} -- Resulting temperature differences at the hot stream inlet (K)
+            logarithmic_temperature_difference {array} -- Resulting logarithmic temperature differences (K)
+            area {array} -- Resulting areas (m2)
+        """
+
+    def __init__(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, mixer_type_hot='none', mixer_type_cold='none', mixer_fraction_hot=0, mixer_fraction_cold=0, lmtd_mode='exact'):
+        self.lmtd_mode = lmtd_mode
+        self.mixer_type_hot = mixer_type_codes(mixer_type_hot)
+        self.mixer_type_cold = mixer_type_codes(mixer_type_cold)
+        self.mixer_fraction_hot = np.asarray(mixer_fraction_hot, dtype=float)
+        self.mixer_fraction_cold = np.asarray(mixer_fraction_cold, dtype=float)
+        self.inlet_temperature_hot_stream = np.asarray(inlet_temperatures[0], dtype=float)
+        self.inlet_temperature_cold_stream = np.asarray(inlet_temperatures[1], dtype=float)
+        self.film_heat_transfer_coefficient_hot_stream = np.asarray(film_heat_transfer_coefficients[0], dtype=float)
+        self.film_heat_transfer_coefficient_cold_stream = np.asarray(film_heat_transfer_coefficients[1], dtype=float)
+        self.heat_capacity_flow_hot_stream = np.asarray(heat_capacity_flows[0], dtype=float)
+        self.heat_capacity_flow_cold_stream = np.asarray(heat_capacity_flows[1], dtype=float)
+        self.heat_load = np.asarray(heat_load, dtype=float)
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Sets up the batch from flat columns named like the HeatExchanger attributes (inlet_temperature_hot_stream, ..., heat_load, mixer_type_hot, ...); missing mixer columns default to no mixer
+
+        Args:
+            columns (dict or mapping): Column name -> array or scalar
+        """
+        return cls(
+            inlet_temperatures=[columns['inlet_temperature_hot_stream'], columns['inlet_temperature_cold_stream']],
+            film_heat_transfer_coefficients=[columns['film_heat_transfer_coefficient_hot_stream'], columns['film_heat_transfer_coefficient_cold_stream']],
+            heat_capacity_flows=[columns['heat_capacity_flow_hot_stream'], columns['heat_capacity_flow_cold_stream']],
+            heat_load=columns['heat_load'],
+            mixer_type_hot=columns.get('mixer_type_hot', 'none'),
+            mixer_type_cold=columns.get('mixer_type_cold', 'none'),
+            mixer_fraction_hot=columns.get('mixer_fraction_hot', 0),
+            mixer_fraction_cold=columns.get('mixer_fraction_cold', 0),
+            lmtd_mode=columns.get('lmtd_mode', 'exact'))
+
+    @property
+    def overall_heat_transfer_coefficient(self):
+        return 1 / (1 / self.film_heat_transfer_coefficient_hot_stream + 1 / self.film_heat_transfer_coefficient_cold_stream)
+
+    @property
+    def heat_exchanger_inlet_temperature_hot_stream(self):
+        return self.heat_exchanger_inlet_temperature_calculation(self.inlet_temperature_hot_stream, self.heat_capacity_flow_hot_stream, self.mixer_type_hot, self.mixer_fraction_hot, 'hot')
+
+    @property
+    def heat_exchanger_inlet_temperature_cold_stream(self):
+        return self.heat_exchanger_inlet_temperature_calculation(self.inlet_temperature_cold_stream, self.heat_capacity_flow_cold_stream, self.mixer_type_cold, self.mixer_fraction_cold, 'cold')
+
+    @property
+    def heat_exchanger_outlet_temperature_hot_stream(self):
+        return self.heat_exchanger_outlet_temperature_calculation(self.heat_exchanger_inlet_temperature_hot_stream, self.heat_capacity_flow_hot_stream, self.mixer_type_hot, self.mixer_fraction_hot, 'hot')
+
+    @property
+    def heat_exchanger_outlet_temperature_cold_stream(self):
+        return self.heat_exchanger_outlet_temperature_calculation(self.heat_exchanger_inlet_temperature_cold_stream, self.heat_capacity_flow_cold_stream, self.mixer_type_cold, self.mixer_fraction_cold, 'cold')
+
+    @property
+    def outlet_temperature_hot_stream(self):
+        return self.inlet_temperature_hot_stream + self.stream_temperature_difference(self.heat_capacity_flow_hot_stream, NONE, 0, 'hot')
+
+    @property
+    def outlet_temperature_cold_stream(self):
+        return self.inlet_temperature_cold_stream + self.stream_temperature_difference(self.heat_capacity_flow_cold_stream, NONE, 0, 'cold')
+
+    @property
+    def temperature_difference_a(self):
+        return self.heat_exchanger_outlet_temperature_hot_stream - self.heat_exchanger_inlet_temperature_cold_stream
+
+    @property
+    def temperature_difference_b(self):
+        return self.heat_exchanger_inlet_temperature_hot_stream - self.heat_exchanger_outlet_temperature_cold_stream
+
+    @property
+    def logarithmic_temperature_difference(self):
+        heat_exchanger_inlet_temperature_hot_stream = self.heat_exchanger_inlet_temperature_hot_stream
+        heat_exchanger_inlet_temperature_cold_stream = self.heat_exchanger_inlet_temperature_cold_stream
+        temperature_difference_a = self.heat_exchanger_outlet_temperature_calculation(heat_exchanger_inlet_temperature_hot_stream, self.heat_capacity_flow_hot_stream, self.mixer_type_hot, self.mixer_fraction_hot, 'hot') - heat_exchanger_inlet_temperature_cold_stream
+        temperature_difference_b = heat_exchanger_inlet_temperature_hot_stream - self.heat_exchanger_outlet_temperature_calculation(heat_exchanger_inlet_temperature_cold_stream, self.heat_capacity_flow_cold_stream, self.mixer_type_cold, self.mixer_fraction_cold, 'cold')
+        return logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, self.lmtd_mode)
+
+    @property
+    def area(self):
+        return self.heat_load / (self.overall_heat_transfer_coefficient * self.logarithmic_temperature_difference)
+
+    def area_gradient(self):
+        """Calculates the partial derivatives of the areas with respect to all numeric inputs
+
+        With the mixer models both temperature differences are linear in the heat load: dTa = Ti_h - Ti_c - Q * (g_h + k_h + g_c) and dTb = Ti_h - Ti_c - Q * (g_h + g_c + k_c) (see mixer_coefficients), and dA/dx = A * (dQ/dx / Q - dU/dx / U - dLMTD/dx / LMTD) with the LMTD gradient of the LMTD mode.
+
+        Returns:
+            dict: Input name (inlet_temperature_hot_stream, inlet_temperature_cold_stream, film_heat_transfer_coefficient_hot_stream, film_heat_transfer_coefficient_cold_stream, heat_capacity_flow_hot_stream, heat_capacity_flow_cold_stream, heat_load, mixer_fraction_hot, mixer_fraction_cold) -> dA/dinput (arrays)
+        """
+        heat_load = self.heat_load
+        overall_heat_transfer_coefficient = self.overall_heat_transfer_coefficient
+        temperature_difference_a = self.temperature_difference_a
+        temperature_difference_b = self.temperature_difference_b
+        logarithmic_mean = logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, self.lmtd_mode)
+        gradient_a, gradient_b = logarithmic_mean_temperature_difference_gradient(temperature_difference_a, temperature_difference_b, self.lmtd_mode)
+        area = heat_load / (overall_heat_transfer_coefficient * logarithmic_mean)
+        g_h, k_h, dg_h, dk_h = self.mixer_coefficients(self.heat_capacity_flow_hot_stream, self.mixer_type_hot, self.mixer_fraction_hot)
+        g_c, k_c, dg_c, dk_c = self.mixer_coefficients(self.heat_capacity_flow_cold_stream, self.mixer_type_cold, self.mixer_fraction_cold)
+        # Input -> (ddTa/dx, ddTb/dx, dQ/dx / Q - dU/dx / U)
+        derivatives = dict(
+            inlet_temperature_hot_stream=(1, 1, 0),
+            inlet_temperature_cold_stream=(-1, -1, 0),
+            film_heat_transfer_coefficient_hot_stream=(0, 0, -overall_heat_transfer_coefficient / self.film_heat_transfer_coefficient_hot_stream ** 2),
+            film_heat_transfer_coefficient_cold_stream=(0, 0, -overall_heat_transfer_coefficient / self.film_heat_transfer_coefficient_cold_stream ** 2),
+            heat_capacity_flow_hot_stream=(heat_load * (g_h + k_h) / self.heat_capacity_flow_hot_stream, heat_load * g_h / self.heat_capacity_flow_hot_stream, 0),
+            heat_capacity_flow_cold_stream=(heat_load * g_c / self.heat_capacity_flow_cold_stream, heat_load * (g_c + k_c) / self.heat_capacity_flow_cold_stream, 0),
+            heat_load=(-(g_h + k_h + g_c), -(g_h + g_c + k_c), 1 / heat_load),
+            mixer_fraction_hot=(-heat_load * (dg_h + dk_h), -heat_load * dg_h, 0),
+            mixer_fraction_cold=(-heat_load * dg_c, -heat_load * (dg_c + dk_c), 0))
+        shape = np.shape(area)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {name: np.broadcast_to(area * (relative - (gradient_a * difference_a + gradient_b * difference_b) / logarithmic_mean), shape) for name, (difference_a, difference_b, relative) in derivatives.items()}
+
+    def mixer_coefficients(self, heat_capacity_flow, mixer_type, mixer_fraction):
+        """Coefficients of the temperature changes per kW of heat load: the mixer changes the heat exchanger inlet temperature by g * Q and the heat exchanger changes the temperature by k * Q
+
+        Returns:
+            tuple: g, k, dg/df, and dk/df (arrays), g = f / (C * (1 + f)) for admixers and 0 otherwise, k = 1 / (C * flow factor)
+        """
+        admixer = mixer_type == ADMIXER
+        bypass = mixer_type == BYPASS
+        flow_factor = np.where(bypass, 1 - mixer_fraction, np.where(admixer, 1 + mixer_fraction, 1))
+        k = 1 / (heat_capacity_flow * flow_factor)
+        g = np.where(admixer, mixer_fraction * k, 0)
+        dk = np.where(bypass, k / flow_factor, np.where(admixer, -k / flow_factor, 0))
+        dg = np.where(admixer, k / flow_factor, 0)
+        return g, k, dg, dk
+
+    def heat_exchanger_inlet_temperature_calculation(self, inlet_temperature, heat_capacity_flow, mixer_type, mixer_fraction, stream_type):
+        admixer_temperature = (inlet_temperature + (inlet_temperature + self.stream_temperature_difference(heat_capacity_flow, NONE, 0, stream_type)) * mixer_fraction) / (1 + mixer_fraction)
+        return np.where(mixer_type == ADMIXER, admixer_temperature, inlet_temperature)
+
+    def heat_exchanger_outlet_temperature_calculation(self, heat_exchanger_inlet_temperature, heat_capacity_flow, mixer_type, mixer_fraction, stream_type):
+        return heat_exchanger_inlet_temperature + self.stream_temperature_difference(heat_capacity_flow, mixer_type, mixer_fraction, stream_type)
+
+    def stream_temperature_difference(self, heat_capacity_flow, mixer_type, mixer_fraction, stream_type):
+        if stream_type == 'hot':
+            stream_type_sign = -1
+        elif stream_type == 'cold':
+            stream_type_sign = 1
+        else:
+            raise Exception("Sorry,you've misspelled the stream type")
+
+        flow_factor = np.where(mixer_type == BYPASS, 1 - mixer_fraction, np.where(mixer_type == ADMIXER, 1 + mixer_fraction, 1))
+        return stream_type_sign * self.heat_load / (heat_capacity_flow * flow_factor)
@@ -0,0 +1,229 @@
+import math
+
+from lambert_w import lambert_w_minus_one
+from lmtd import SERIES_THRESHOLD, series_expansion
+
+
+def logarithmic_mean(temperature_difference_a, temperature_difference_b):
+    """Exact mode of lmtd.scalar_logarithmic_mean_temperature_difference with math.log, including the series expansion around dTa = dTb and NaN for temperature crosses"""
+    if temperature_difference_a == temperature_difference_b:
+        return temperature_difference_a
+    elif not temperature_difference_a * temperature_difference_b > 0:
+        return math.nan
+    relative_difference = (temperature_difference_a - temperature_difference_b) / (temperature_difference_a + temperature_difference_b)
+    if abs(relative_difference) < SERIES_THRESHOLD:
+        return series_expansion(temperature_difference_a, temperature_difference_b, relative_difference)
+    return (temperature_difference_a - temperature_difference_b) / math.log(temperature_difference_a / temperature_difference_b)
+
+
+class HeatExchangerFast:
+    """Compact scalar variant of HeatExchanger for low single-case latency
+
+        Same arguments and properties as HeatExchanger, but the instance uses __slots__ instead of a __dict__ and the calculation uses plain Python floats and math.log instead of NumPy scalars.
+
+        Arguments:
+            inlet_temperatures {float} -- List of inlet temperatures (°C) with hot stream [0] and cold stream [1]
+            film_heat_transfer_coefficients {float} -- List of film heat transfer coefficients(kW/(m2K) with hot stream [0] and cold stream [1]
+            heat_capacity_flows {float} -- List of heat capacity flows (kW/K) with hot stream [0] and cold stream [1]
+            heat_load {float} -- Heat load (kW)
+            mixer_type_hot {string} -- none, bypass, or admixer
+            mixer_type_cold {string} -- none, bypass, or admixer
+            mixer_fraction_hot {float} -- 0...1 ((kg/s)/(kg/s))
+            mixer_fraction_cold {float} -- 0...1 ((kg/s)/(kg/s))
+        """
+
+    __slots__ = ('mixer_type_hot', 'mixer_type_cold', 'mixer_fraction_hot', 'mixer_fraction_cold', 'inlet_temperature_hot_stream', 'inlet_temperature_cold_stream', 'film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream', 'heat_capacity_flow_hot_stream', 'heat_capacity_flow_cold_stream', 'heat_load')
+
+    def __init__(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, mixer_type_hot='none', mixer_type_cold='none', mixer_fraction_hot=0, mixer_fraction_cold=0):
+        self.mixer_type_hot = mixer_type_hot
+        self.mixer_type_cold = mixer_type_cold
+        self.mixer_fraction_hot = mixer_fraction_hot
+        self.mixer_fraction_cold = mixer_fraction_cold
+        self.inlet_temperature_hot_stream = inlet_temperatures[0]
+        self.inlet_temperature_cold_stream = inlet_temperatures[1]
+        self.film_heat_transfer_coefficient_hot_stream = film_heat_transfer_coefficients[0]
+        self.film_heat_transfer_coefficient_cold_stream = film_heat_transfer_coefficients[1]
+        self.heat_capacity_flow_hot_stream = heat_capacity_flows[0]
+        self.heat_capacity_flow_cold_stream = heat_capacity_flows[1]
+        self.heat_load = heat_load
+
+    @property
+    def overall_heat_transfer_coefficient(self):
+        return 1 / (1 / self.film_heat_transfer_coefficient_hot_stream + 1 / self.film_heat_transfer_coefficient_cold_stream)
+
+    @property
+    def heat_exchanger_inlet_temperature_hot_stream(self):
+        return self.heat_exchanger_inlet_temperature_calculation(self.inlet_temperature_hot_stream, self.heat_capacity_flow_hot_stream, self.mixer_type_hot, self.mixer_fraction_hot, 'hot')
+
+    @property
+    def heat_exchanger_inlet_temperature_cold_stream(self):
+        return self.heat_exchanger_inlet_temperature_calculation(self.inlet_temperature_cold_stream, self.heat_capacity_flow_cold_stream, self.mixer_type_cold, self.mixer_fraction_cold, 'cold')
+
+    @property
+    def heat_exchanger_outlet_temperature_hot_stream(self):
+        return self.heat_exchanger_outlet_temperature_calculation(self.heat_exchanger_inlet_temperature_hot_stream, self.heat_capacity_flow_hot_stream, self.mixer_type_hot, self.mixer_fraction_hot, 'hot')
+
+    @property
+    def heat_exchanger_outlet_temperature_cold_stream(self):
+        return self.heat_exchanger_outlet_temperature_calculation(self.heat_exchanger_inlet_temperature_cold_stream, self.heat_capacity_flow_cold_stream, self.mixer_type_cold, self.mixer_fraction_cold, 'cold')
+
+    @property
+    def outlet_temperature_hot_stream(self):
+        return self.inlet_temperature_hot_stream - self.heat_load / self.heat_capacity_flow_hot_stream
+
+    @property
+    def outlet_temperature_cold_stream(self):
+        return self.inlet_temperature_cold_stream + self.heat_load / self.heat_capacity_flow_cold_stream
+
+    @property
+    def logarithmic_temperature_difference(self):
+        heat_exchanger_inlet_temperature_hot_stream = self.heat_exchanger_inlet_temperature_hot_stream
+        heat_exchanger_inlet_temperature_cold_stream = self.heat_exchanger_inlet_temperature_cold_stream
+        temperature_difference_a = self.heat_exchanger_outlet_temperature_calculation(heat_exchanger_inlet_temperature_hot_stream, self.heat_capacity_flow_hot_stream, self.mixer_type_hot, self.mixer_fraction_hot, 'hot') - heat_exchanger_inlet_temperature_cold_stream
+        temperature_difference_b = heat_exchanger_inlet_temperature_hot_stream - self.heat_exchanger_outlet_temperature_calculation(heat_exchanger_inlet_temperature_cold_stream, self.heat_capacity_flow_cold_stream, self.mixer_type_cold, self.mixer_fraction_cold, 'cold')
+        return logarithmic_mean(temperature_difference_a, temperature_difference_b)
+
+    @property
+    def area(self):
+        return self.heat_load / (self.overall_heat_transfer_coefficient * self.logarithmic_temperature_difference)
+
+    def heat_exchanger_inlet_temperature_calculation(self, inlet_temperature, heat_capacity_flow, mixer_type, mixer_fraction, stream_type):
+        if mixer_type == 'bypass' or mixer_type == 'none':
+            return inlet_temperature
+
+        elif mixer_type == 'admixer':
+            return (inlet_temperature + (inlet_temperature + self.stream_temperature_difference(heat_capacity_flow, 'none', 0, stream_type)) * mixer_fraction) / (1 + mixer_fraction)
+
+        else:
+            raise Exception("Sorry, you've misspelled the mixer type")
+
+    def heat_exchanger_outlet_temperature_calculation(self, heat_exchanger_inlet_temperature, heat_capacity_flow, mixer_type, mixer_fraction, stream_type):
+        return heat_exchanger_inlet_temperature + self.stream_temperature_difference(heat_capacity_flow, mixer_type, mixer_fraction, stream_type)
+
+    def stream_temperature_difference(self, heat_capacity_flow, mixer_type, mixer_fraction, stream_type):
+        if stream_type == 'hot':
+            stream_type_sign = -1
+        elif stream_type == 'cold':
+            stream_type_sign = 1
+        else:
+            raise Exception("Sorry,you've misspelled the stream type")
+
+        if mixer_type == 'none':
+            return stream_type_sign * self.heat_load / heat_capacity_flow
+        elif mixer_type == 'bypass':
+            return stream_type_sign * self.heat_load / (heat_capacity_flow * (1 - mixer_fraction))
+        elif mixer_type == 'admixer':
+            return stream_type_sign * self.heat_load / (heat_capacity_flow * (1 + mixer_fraction))
+        else:
+            raise Exception("Sorry, you've misspelled the mixer type")
+
+
+class HeatExchangerReverseFast():
+    """Compact scalar variant of HeatExchangerReverse for low single-case latency
+
+        Same arguments, properties and heat_exchanger_temperature_calculation as HeatExchangerReverse, but the instance uses __slots__, the calculation uses math instead of NumPy and the Lambert W-function is solved by lambert_w_minus_one instead of scipy.
+
+        Arguments:
+            inlet_temperatures {float} -- List of inlet temperatures (°C) with hot stream [0] and cold stream [1]
+            film_heat_transfer_coefficients {float} -- List of film heat transfer coefficients(kW/(m2K) with hot stream [0] and cold stream [1]
+            heat_capacity_flows {float} -- List of heat capacity flows (kW/K) with hot stream [0] and cold stream [1]
+            heat_load {float} -- Heat load (kW)
+            existent_area {float} -- Area of HEX (m2)
+        """
+
+    __slots__ = ('inlet_temperature_hot_stream', 'inlet_temperature_cold_stream', 'film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream', 'heat_capacity_flow_hot_stream', 'heat_capacity_flow_cold_stream', 'heat_load', 'existent_area', 'heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream', 'heat_exchanger_outlet_temperature_cold_stream', 'admixer_fraction', 'bypass_fraction')
+
+    def __init__(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area):
+        self.inlet_temperature_hot_stream = inlet_temperatures[0]
+        self.inlet_temperature_cold_stream = inlet_temperatures[1]
+        self.film_heat_transfer_coefficient_hot_stream = film_heat_transfer_coefficients[0]
+        self.film_heat_transfer_coefficient_cold_stream = film_heat_transfer_coefficients[1]
+        self.heat_capacity_flow_hot_stream = heat_capacity_flows[0]
+        self.heat_capacity_flow_cold_stream = heat_capacity_flows[1]
+        self.heat_load = heat_load
+        self.existent_area = existent_area
+        self.heat_exchanger_inlet_temperature_hot_stream = None
+        self.heat_exchanger_outlet_temperature_hot_stream = None
+        self.heat_exchanger_inlet_temperature_cold_stream = None
+        self.heat_exchanger_outlet_temperature_cold_stream = None
+        self.admixer_fraction = None
+        self.bypass_fraction = None
+
+    @property
+    def overall_heat_transfer_coefficient(self):
+        return 1 / (1 / self.film_heat_transfer_coefficient_hot_stream + 1 / self.film_heat_transfer_coefficient_cold_stream)
+
+    @property
+    def outlet_temperature_hot_stream(self):
+        return self.inlet_temperature_hot_stream - self.heat_load / self.heat_capacity_flow_hot_stream
+
+    @property
+    def outlet_temperature_cold_stream(self):
+        return self.inlet_temperature_cold_stream + self.heat_load / self.heat_capacity_flow_cold_stream
+
+    @property
+    def area_no_mixer(self):
+        dTa = self.outlet_temperature_hot_stream - self.inlet_temperature_cold_stream
+        dTb = self.inlet_temperature_hot_stream - self.outlet_temperature_cold_stream
+        return self.heat_load / (self.overall_heat_transfer_coefficient * logarithmic_mean(dTa, dTb))
+
+    @property
+    def mixer_type(self):
+        area_no_mixer = self.area_no_mixer
+        if area_no_mixer > self.existent_area:
+            return 'admixer'
+        elif area_no_mixer < self.existent_area:
+            return 'bypass'
+        else:
+            return 'none'
+
+    @property
+    def logarithmic_mean_temperature_difference(self):
+        return self.heat_load / (self.overall_heat_transfer_coefficient * self.existent_area)
+
+    def heat_exchanger_temperature_calculation(self, mixer_side='none'):
+        """Calculates inlet and outlet temperatures of the heat exchanger with wrong area (compensation using bypass or admixer)
+
+        Args:
+            mixer_side (str, optional): Indicates the side of the heat exchanger on which the mixer is incorporated. Defaults to 'none'.
+        """
+        mixer_type = self.mixer_type
+        inlet_temperature_hot_stream = self.inlet_temperature_hot_stream
+        inlet_temperature_cold_stream = self.inlet_temperature_cold_stream
+        outlet_temperature_hot_stream = self.outlet_temperature_hot_stream
+        outlet_temperature_cold_stream = self.outlet_temperature_cold_stream
+        self.heat_exchanger_inlet_temperature_hot_stream = inlet_temperature_hot_stream
+        self.heat_exchanger_outlet_temperature_hot_stream = outlet_temperature_hot_stream
+        self.heat_exchanger_inlet_temperature_cold_stream = inlet_temperature_cold_stream
+        self.heat_exchanger_outlet_temperature_cold_stream = outlet_temperature_cold_stream
+        dT_1 = outlet_temperature_hot_stream - inlet_temperature_cold_stream
+        dT_2 = inlet_temperature_hot_stream - outlet_temperature_cold_stream
+
+        if mixer_type == 'admixer':
+            if mixer_side == 'hot':
+                self.heat_exchanger_inlet_temperature_hot_stream = inlet_temperature_cold_stream + self.unknown_temperature_difference(dT_1)
+                self.admixer_fraction = (inlet_temperature_hot_stream - self.heat_exchanger_inlet_temperature_hot_stream) / (self.heat_exchanger_inlet_temperature_hot_stream - outlet_temperature_hot_stream)
+            else:
+                self.heat_exchanger_inlet_temperature_cold_stream = outlet_temperature_hot_stream - self.unknown_temperature_difference(dT_2)
+                self.admixer_fraction = (inlet_temperature_cold_stream - self.heat_exchanger_inlet_temperature_cold_stream) / (self.heat_exchanger_inlet_temperature_cold_stream - outlet_temperature_cold_stream)
+
+        elif mixer_type == 'bypass':
+            if mixer_side == 'hot':
+                self.heat_exchanger_outlet_temperature_hot_stream = inlet_temperature_cold_stream + self.unknown_temperature_difference(dT_2)
+                self.bypass_fraction = (outlet_temperature_hot_stream - inlet_temperature_hot_stream) / (self.heat_exchanger_outlet_temperature_hot_stream - inlet_temperature_hot_stream)
+            else:
+                self.heat_exchanger_outlet_temperature_cold_stream = inlet_temperature_hot_stream - self.unknown_temperature_difference(dT_1)
+                self.bypass_fraction = (outlet_temperature_cold_stream - inlet_temperature_cold_stream) / (self.heat_exchanger_outlet_temperature_cold_stream - inlet_temperature_cold_stream)
+
+    def unknown_temperature_difference(self, known_temperature_difference):
+        """Calculates the temperature difference at the other end of the heat exchanger reaching the logarithmic mean temperature difference of the existent area
+
+        Args:
+            known_temperature_difference (float): Temperature difference at the end of the heat exchanger unaffected by the mixer (K)
+        """
+        logarithmic_mean_temperature_difference = self.logarithmic_mean_temperature_difference
+        if known_temperature_difference == logarithmic_mean_temperature_difference:
+            return known_temperature_difference
+        dT_LMTD = known_temperature_difference / logarithmic_mean_temperature_difference
+        beta = - lambert_w_minus_one(-dT_LMTD * math.exp(-dT_LMTD)) / dT_LMTD
+        return beta * known_temperature_difference
@@ -1,5 +1,9 @@
 import numpy as np
-from scipy.special import lambertw
+
+from heat_exchanger_batch import mixer_type_names
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch, MixerPlacement, MixerSolution
+from lambert_w import real_lambert_w_minus_one
+from lmtd import logarithmic_mean_temperature_difference
 
 
 class HeatExchangerReverse():
@@ -11,6 +15,7 @@ class HeatExchangerReverse():
             heat_capacity_flows {float} -- List of heat capacity flows (kW/K) with hot stream [0] and cold stream [1]
             heat_load {float} -- Heat load (kW)
             existent_area {float} -- Area of HEX (m2)
+            lmtd_mode {string} -- exact, chen, underwood, or paterson for the area without mixer (see lmtd.py)
         Properties:
             inlet_temperature_hot_stream {float} -- inlet temperature hot stream (°C)
             inlet_temperature_cold_stream {float} -- inlet temperature cold stream (°C)
@@ -33,7 +38,7 @@ class HeatExchangerReverse():
             bypass_fraction {float} -- 0...1 ((kg/s)/(kg/s))
         """
 
-    def __init__(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area):
+    def __init__(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area, lmtd_mode='exact'):
         self.inlet_temperature_hot_stream = inlet_temperatures[0]
         self.inlet_temperature_cold_stream = inlet_temperatures[1]
         self.film_heat_transfer_coefficient_hot_stream = film_heat_transfer_coefficients[0]
@@ -42,6 +47,7 @@ class HeatExchangerReverse():
         self.heat_capacity_flow_cold_stream = heat_capacity_flows[1]
         self.heat_load = heat_load
         self.existent_area = existent_area
+        self.lmtd_mode = lmtd_mode
         self.heat_exchanger_inlet_temperature_hot_stream = None
         self.heat_exchanger_outlet_temperature_hot_stream = None
         self.heat_exchanger_inlet_temperature_cold_stream = None
@@ -65,11 +71,7 @@ class HeatExchangerReverse():
     def area_no_mixer(self):
         dTa = self.outlet_temperature_hot_stream - self.inlet_temperature_cold_stream
         dTb = self.inlet_temperature_hot_stream - self.outlet_temperature_cold_stream
-        if dTa != dTb:
-            logarithmic_mean_temperature_difference = (dTa - dTb) / np.log(dTa/dTb)
-        else:
-            logarithmic_mean_temperature_difference = dTa
-        return self.heat_load / (self.overall_heat_transfer_coefficient * logarithmic_mean_temperature_difference)
+        return self.heat_load / (self.overall_heat_transfer_coefficient * logarithmic_mean_temperature_difference(dTa, dTb, self.lmtd_mode))
 
     @property
     def mixer_type(self):
@@ -102,7 +104,7 @@ class HeatExchangerReverse():
                 dT_1 = self.heat_exchanger_outlet_temperature_hot_stream - self.heat_exchanger_inlet_temperature_cold_stream
                 if dT_1 != self.logarithmic_mean_temperature_difference:
                     dT_LMTD = dT_1 / self.logarithmic_mean_temperature_difference
-                    beta = - lambertw(-dT_LMTD * np.exp(-dT_LMTD), -1).real * 1 / dT_LMTD
+                    beta = - real_lambert_w_minus_one(-dT_LMTD * np.exp(-dT_LMTD)) * 1 / dT_LMTD
                     dT_2 = beta * dT_1
                 else:
                     dT_2 = dT_1
@@ -117,7 +119,7 @@ class HeatExchangerReverse():
                 dT_2 = self.heat_exchanger_inlet_temperature_hot_stream - self.heat_exchanger_outlet_temperature_cold_stream
                 if dT_2 != self.logarithmic_mean_temperature_difference:
                     dT_LMTD = dT_2 / self.logarithmic_mean_temperature_difference
-                    beta = - lambertw(-dT_LMTD * np.exp(-dT_LMTD), -1).real * 1 / dT_LMTD
+                    beta = - real_lambert_w_minus_one(-dT_LMTD * np.exp(-dT_LMTD)) * 1 / dT_LMTD
                     dT_1 = beta * dT_2
 
                 else:
@@ -134,7 +136,7 @@ class HeatExchangerReverse():
                 dT_2 = self.heat_exchanger_inlet_temperature_hot_stream - self.heat_exchanger_outlet_temperature_cold_stream
                 if dT_2 != self.logarithmic_mean_temperature_difference:
                     dT_LMTD = dT_2 / self.logarithmic_mean_temperature_difference
-                    beta = - lambertw(-dT_LMTD * np.exp(-dT_LMTD), -1).real * 1 / dT_LMTD
+                    beta = - real_lambert_w_minus_one(-dT_LMTD * np.exp(-dT_LMTD)) * 1 / dT_LMTD
                     dT_1 = beta * dT_2
 
                 else:
@@ -150,7 +152,7 @@ class HeatExchangerReverse():
                 dT_1 = self.heat_exchanger_outlet_temperature_hot_stream - self.heat_exchanger_inlet_temperature_cold_stream
                 if dT_1 != self.logarithmic_mean_temperature_difference:
                     dT_LMTD = dT_1 / self.logarithmic_mean_temperature_difference
-                    beta = - lambertw(-dT_LMTD * np.exp(-dT_LMTD), -1).real * 1 / dT_LMTD
+                    beta = - real_lambert_w_minus_one(-dT_LMTD * np.exp(-dT_LMTD)) * 1 / dT_LMTD
                     dT_2 = beta * dT_1
                 else:
                     dT_2 = dT_1
@@ -162,6 +164,31 @@ class HeatExchangerReverse():
             self.heat_exchanger_inlet_temperature_cold_stream = self.inlet_temperature_cold_stream
             self.heat_exchanger_outlet_temperature_cold_stream = self.outlet_temperature_cold_stream
 
+    def mixer_fraction_gradient(self, mixer_side='none'):
+        """Runs heat_exchanger_temperature_calculation and calculates the partial derivatives of the mixer fraction with respect to all numeric inputs, see HeatExchangerReverseBatch.mixer_fraction_gradient
+
+        Args:
+            mixer_side (str, optional): Indicates the side of the heat exchanger on which the mixer is incorporated. Defaults to 'none'.
+
+        Returns:
+            dict: Input name -> derivative of admixer_fraction or bypass_fraction (float), NaN without mixer
+        """
+        self.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+        return {name: float(value) for name, value in HeatExchangerReverseBatch.from_columns(vars(self)).mixer_fraction_gradient(mixer_side).items()}
+
+    def both_sides_calculation(self, criterion=None):
+        """Calculates the mixer on the hot and on the cold side with one Lambert W evaluation and chooses the placement, see HeatExchangerReverseBatch.both_sides_calculation
+
+        Args:
+            criterion (callable, optional): MixerSolution -> score, the side with the lower score is chosen. Defaults to None (smallest absolute mixer fraction).
+
+        Returns:
+            MixerPlacement: Mixer type (none, bypass, or admixer), MixerSolution (floats) of the hot and the cold side, chosen side (hot, cold, or none) and MixerSolution of the chosen side
+        """
+        placement = HeatExchangerReverseBatch.from_columns(vars(self)).both_sides_calculation(criterion)
+        hot, cold, best = (MixerSolution(*(float(value) for value in solution)) for solution in (placement.hot, placement.cold, placement.best))
+        return MixerPlacement(str(mixer_type_names(placement.mixer_type)), hot, cold, str(placement.mixer_side), best)
+
     def __repr__(self):
         pass
 
@@ -0,0 +1,272 @@
+import collections
+
+import numpy as np
+
+from heat_exchanger_batch import ADMIXER, BYPASS, NONE
+from lambert_w import lambert_w_derivative, real_lambert_w_minus_one
+from lmtd import logarithmic_mean_temperature_difference
+
+MixerSolution = collections.namedtuple('MixerSolution', ['mixer_fraction', 'heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream', 'heat_exchanger_outlet_temperature_cold_stream'])
+MixerSolution.__doc__ = """Mixer on one side: admixer or bypass fraction (NaN without mixer) and heat exchanger temperatures"""
+MixerPlacement = collections.namedtuple('MixerPlacement', ['mixer_type', 'hot', 'cold', 'mixer_side', 'best'])
+MixerPlacement.__doc__ = """Result of both_sides_calculation: mixer type, MixerSolution of the hot and the cold side, chosen side (hot, cold, or none) and MixerSolution of the chosen side"""
+
+
+def read_only(array):
+    """Read-only view of the array; the array itself, which may be an input of the caller, stays writeable"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class HeatExchangerReverseBatch():
+    """Class for vectorized reversed heat exchanger calculation of many operating cases at once
+
+        Every argument is either a scalar or an array; all arrays are broadcast against each other and every row is one heat exchanger.
+
+        Arguments:
+            inlet_temperatures {array} -- Inlet temperatures (°C) with hot streams [0] and cold streams [1]
+            film_heat_transfer_coefficients {array} -- Film heat transfer coefficients(kW/(m2K) with hot streams [0] and cold streams [1]
+            heat_capacity_flows {array} -- Heat capacity flows (kW/K) with hot streams [0] and cold streams [1]
+            heat_load {array} -- Heat loads (kW)
+            existent_area {array} -- Areas of HEX (m2)
+            lmtd_mode {string} -- exact, chen, underwood, or paterson for the areas without mixer (see lmtd.py)
+        Properties:
+            inlet_temperature_hot_stream {array} -- inlet temperatures hot streams (°C)
+            inlet_temperature_cold_stream {array} -- inlet temperatures cold streams (°C)
+            heat_exchanger_inlet_temperature_hot_stream {array} -- inlet temperatures hot streams in mixer (°C)
+            heat_exchanger_inlet_temperature_cold_stream {array} -- inlet temperatures cold streams in mixer (°C)
+            film_heat_transfer_coefficient_hot_stream {array} -- Film heat transfer coefficients hot streams (kW/(m2K))
+            film_heat_transfer_coefficient_cold_stream {array} -- Film heat transfer coefficients cold streams (kW/(m2K))
+            heat_capacity_flow_hot_stream {array} -- Heat capacity flows hot streams (kW/K)
+            heat_capacity_flow_cold_stream {array} -- Heat capacity flows cold streams (kW/K)
+            heat_load {array} -- Heat loads (kW)
+            overall_heat_transfer_coefficient {array} -- Resulting overall heat transfer coefficients (kW/(m2K))
+            outlet_temperature_hot_stream {array} -- Resulting outlet temperatures of hot streams (°C)
+            outlet_temperature_cold_stream {array} -- Resulting outlet temperatures of cold streams (°C)
+            heat_exchanger_outlet_temperature_hot_stream {array} -- Resulting temperatures hot streams out of mixer (°C)
+            heat_exchanger_outlet_temperature_cold_stream {array} -- Resulting temperatures cold streams out of mixer (°C)
+            logarithmic_temperature_difference {array} -- Resulting logarithmic temperature differences (K)
+            area_no_mixer {array} -- Resulting areas assuming no mixer (m2)
+            mixer_type {array} -- Needed mixer type codes: none = 0, bypass = 1, or admixer = 2
+            no_mixer {array} -- Mask of the rows whose area without mixer equals the existent area
+            equal_temperature_difference {array} -- Mask of the rows whose known temperature difference equals the logarithmic mean (no Lambert W needed)
+            admixer_fraction {array} -- 0...1 ((kg/s)/(kg/s)), NaN for rows without admixer
+            bypass_fraction {array} -- 0...1 ((kg/s)/(kg/s)), NaN for rows without bypass
+        """
+
+    def __init__(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area, lmtd_mode='exact'):
+        self.inlet_temperature_hot_stream = np.asarray(inlet_temperatures[0], dtype=float)
+        self.inlet_temperature_cold_stream = np.asarray(inlet_temperatures[1], dtype=float)
+        self.film_heat_transfer_coefficient_hot_stream = np.asarray(film_heat_transfer_coefficients[0], dtype=float)
+        self.film_heat_transfer_coefficient_cold_stream = np.asarray(film_heat_transfer_coefficients[1], dtype=float)
+        self.heat_capacity_flow_hot_stream = np.asarray(heat_capacity_flows[0], dtype=float)
+        self.heat_capacity_flow_cold_stream = np.asarray(heat_capacity_flows[1], dtype=float)
+        self.heat_load = np.asarray(heat_load, dtype=float)
+        self.existent_area = np.asarray(existent_area, dtype=float)
+        self.lmtd_mode = lmtd_mode
+        self.heat_exchanger_inlet_temperature_hot_stream = None
+        self.heat_exchanger_outlet_temperature_hot_stream = None
+        self.heat_exchanger_inlet_temperature_cold_stream = None
+        self.heat_exchanger_outlet_temperature_cold_stream = None
+        self.equal_temperature_difference = None
+        self.admixer_fraction = None
+        self.bypass_fraction = None
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Sets up the batch from flat columns named like the HeatExchangerReverse attributes (inlet_temperature_hot_stream, ..., heat_load, existent_area)
+
+        Args:
+            columns (dict or mapping): Column name -> array or scalar
+        """
+        return cls(
+            inlet_temperatures=[columns['inlet_temperature_hot_stream'], columns['inlet_temperature_cold_stream']],
+            film_heat_transfer_coefficients=[columns['film_heat_transfer_coefficient_hot_stream'], columns['film_heat_transfer_coefficient_cold_stream']],
+            heat_capacity_flows=[columns['heat_capacity_flow_hot_stream'], columns['heat_capacity_flow_cold_stream']],
+            heat_load=columns['heat_load'],
+            existent_area=columns['existent_area'],
+            lmtd_mode=columns.get('lmtd_mode', 'exact'))
+
+    @property
+    def overall_heat_transfer_coefficient(self):
+        return 1 / (1 / self.film_heat_transfer_coefficient_hot_stream + 1 / self.film_heat_transfer_coefficient_cold_stream)
+
+    @property
+    def outlet_temperature_hot_stream(self):
+        return self.inlet_temperature_hot_stream - self.heat_load / self.heat_capacity_flow_hot_stream
+
+    @property
+    def outlet_temperature_cold_stream(self):
+        return self.inlet_temperature_cold_stream + self.heat_load / self.heat_capacity_flow_cold_stream
+
+    @property
+    def area_no_mixer(self):
+        dTa = self.outlet_temperature_hot_stream - self.inlet_temperature_cold_stream
+        dTb = self.inlet_temperature_hot_stream - self.outlet_temperature_cold_stream
+        return self.heat_load / (self.overall_heat_transfer_coefficient * logarithmic_mean_temperature_difference(dTa, dTb, self.lmtd_mode))
+
+    @property
+    def mixer_type(self):
+        area_no_mixer = self.area_no_mixer
+        # Not enough existing area: add admixer; too much existing area: add bypass; correct existing area: no mixer
+        return np.select([area_no_mixer > self.existent_area, area_no_mixer < self.existent_area], [ADMIXER, BYPASS], NONE).astype(np.int8)
+
+    @property
+    def no_mixer(self):
+        return self.mixer_type == NONE
+
+    @property
+    def logarithmic_mean_temperature_difference(self):
+        return self.heat_load / (self.overall_heat_transfer_coefficient * self.existent_area)
+
+    def heat_exchanger_temperature_calculation(self, mixer_side='none'):
+        """Calculates inlet and outlet temperatures of the heat exchangers with wrong area (compensation using bypass or admixer)
+
+        Args:
+            mixer_side (str or array, optional): Indicates the side of the heat exchanger on which the mixer is incorporated, per row or for all rows. Every side except 'hot' is treated as cold side. Defaults to 'none'.
+        """
+        inlet_temperature_hot_stream, inlet_temperature_cold_stream, outlet_temperature_hot_stream, outlet_temperature_cold_stream, logarithmic_mean_temperature_difference = np.broadcast_arrays(
+            self.inlet_temperature_hot_stream, self.inlet_temperature_cold_stream, self.outlet_temperature_hot_stream, self.outlet_temperature_cold_stream, self.logarithmic_mean_temperature_difference)
+        mixer_type = np.broadcast_to(self.mixer_type, inlet_temperature_hot_stream.shape)
+        hot_side = np.broadcast_to(np.asarray(mixer_side) == 'hot', inlet_temperature_hot_stream.shape)
+        admixer_hot = (mixer_type == ADMIXER) & hot_side
+        admixer_cold = (mixer_type == ADMIXER) & ~hot_side
+        bypass_hot = (mixer_type == BYPASS) & hot_side
+        bypass_cold = (mixer_type == BYPASS) & ~hot_side
+
+        # Admixer hot side and bypass cold side start from dT_1, admixer cold side and bypass hot side from dT_2
+        dT_1 = outlet_temperature_hot_stream - inlet_temperature_cold_stream
+        dT_2 = inlet_temperature_hot_stream - outlet_temperature_cold_stream
+        dT_known = np.where(admixer_hot | bypass_cold, dT_1, dT_2)
+        self.equal_temperature_difference = dT_known == logarithmic_mean_temperature_difference
+        solve = (mixer_type != NONE) & ~self.equal_temperature_difference
+        dT_unknown = dT_known.copy()
+        dT_unknown[solve] = self.temperature_difference_ratio(dT_known[solve] / logarithmic_mean_temperature_difference[solve]) * dT_known[solve]
+
+        self.heat_exchanger_inlet_temperature_hot_stream = np.where(admixer_hot, inlet_temperature_cold_stream + dT_unknown, inlet_temperature_hot_stream)
+        self.heat_exchanger_outlet_temperature_hot_stream = np.where(bypass_hot, inlet_temperature_cold_stream + dT_unknown, outlet_temperature_hot_stream)
+        self.heat_exchanger_inlet_temperature_cold_stream = np.where(admixer_cold, outlet_temperature_hot_stream - dT_unknown, inlet_temperature_cold_stream)
+        self.heat_exchanger_outlet_temperature_cold_stream = np.where(bypass_cold, inlet_temperature_hot_stream - dT_unknown, outlet_temperature_cold_stream)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            admixer_fraction_hot = (inlet_temperature_hot_stream - self.heat_exchanger_inlet_temperature_hot_stream) / (self.heat_exchanger_inlet_temperature_hot_stream - outlet_temperature_hot_stream)
+            admixer_fraction_cold = (inlet_temperature_cold_stream - self.heat_exchanger_inlet_temperature_cold_stream) / (self.heat_exchanger_inlet_temperature_cold_stream - outlet_temperature_cold_stream)
+            bypass_fraction_hot = (outlet_temperature_hot_stream - inlet_temperature_hot_stream) / (self.heat_exchanger_outlet_temperature_hot_stream - inlet_temperature_hot_stream)
+            bypass_fraction_cold = (outlet_temperature_cold_stream - inlet_temperature_cold_stream) / (self.heat_exchanger_outlet_temperature_cold_stream - inlet_temperature_cold_stream)
+        self.admixer_fraction = np.select([admixer_hot, admixer_cold], [admixer_fraction_hot, admixer_fraction_cold], np.nan)
+        self.bypass_fraction = np.select([bypass_hot, bypass_cold], [bypass_fraction_hot, bypass_fraction_cold], np.nan)
+
+    def both_sides_calculation(self, criterion=None):
+        """Calculates the mixer on the hot and on the cold side together and chooses the placement; the instance attributes stay unchanged
+
+        Both placements share the logarithmic mean temperature difference of the existent area; the ratios of both known temperature differences to it go through one Lambert W evaluation.
+
+        Args:
+            criterion (callable, optional): MixerSolution -> score per row (array), the side with the lower score is chosen, NaN scores never. Defaults to None (smallest absolute mixer fraction).
+
+        Returns:
+            MixerPlacement: Both solutions and the chosen placement (read-only arrays), mixer side none for rows without mixer or without score on both sides
+        """
+        inlet_temperature_hot_stream, inlet_temperature_cold_stream, outlet_temperature_hot_stream, outlet_temperature_cold_stream, logarithmic_mean_temperature_difference = np.broadcast_arrays(
+            self.inlet_temperature_hot_stream, self.inlet_temperature_cold_stream, self.outlet_temperature_hot_stream, self.outlet_temperature_cold_stream, self.logarithmic_mean_temperature_difference)
+        mixer_type = np.broadcast_to(self.mixer_type, inlet_temperature_hot_stream.shape)
+        admixer = mixer_type == ADMIXER
+        bypass = mixer_type == BYPASS
+
+        # Unknown temperature differences from dT_1 (admixer hot side, bypass cold side) and from dT_2 (admixer cold side, bypass hot side)
+        dT_known = np.stack([outlet_temperature_hot_stream - inlet_temperature_cold_stream, inlet_temperature_hot_stream - outlet_temperature_cold_stream])
+        logarithmic_mean_temperature_difference = np.broadcast_to(logarithmic_mean_temperature_difference, dT_known.shape)
+        solve = (mixer_type != NONE) & (dT_known != logarithmic_mean_temperature_difference)
+        dT_unknown = dT_known.copy()
+        dT_unknown[solve] = self.temperature_difference_ratio(dT_known[solve] / logarithmic_mean_temperature_difference[solve]) * dT_known[solve]
+        dT_unknown_1, dT_unknown_2 = dT_unknown
+
+        heat_exchanger_inlet_temperature_hot_stream = np.where(admixer, inlet_temperature_cold_stream + dT_unknown_1, inlet_temperature_hot_stream)
+        heat_exchanger_outlet_temperature_hot_stream = np.where(bypass, inlet_temperature_cold_stream + dT_unknown_2, outlet_temperature_hot_stream)
+        heat_exchanger_inlet_temperature_cold_stream = np.where(admixer, outlet_temperature_hot_stream - dT_unknown_2, inlet_temperature_cold_stream)
+        heat_exchanger_outlet_temperature_cold_stream = np.where(bypass, inlet_temperature_hot_stream - dT_unknown_1, outlet_temperature_cold_stream)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mixer_fraction_hot = np.select([admixer, bypass], [(inlet_temperature_hot_stream - heat_exchanger_inlet_temperature_hot_stream) / (heat_exchanger_inlet_temperature_hot_stream - outlet_temperature_hot_stream), (outlet_temperature_hot_stream - inlet_temperature_hot_stream) / (heat_exchanger_outlet_temperature_hot_stream - inlet_temperature_hot_stream)], np.nan)
+            mixer_fraction_cold = np.select([admixer, bypass], [(inlet_temperature_cold_stream - heat_exchanger_inlet_temperature_cold_stream) / (heat_exchanger_inlet_temperature_cold_stream - outlet_temperature_cold_stream), (outlet_temperature_cold_stream - inlet_temperature_cold_stream) / (heat_exchanger_outlet_temperature_cold_stream - inlet_temperature_cold_stream)], np.nan)
+        hot = MixerSolution(mixer_fraction_hot, heat_exchanger_inlet_temperature_hot_stream, heat_exchanger_outlet_temperature_hot_stream, inlet_temperature_cold_stream, outlet_temperature_cold_stream)
+        cold = MixerSolution(mixer_fraction_cold, inlet_temperature_hot_stream, outlet_temperature_hot_stream, heat_exchanger_inlet_temperature_cold_stream, heat_exchanger_outlet_temperature_cold_stream)
+
+        if criterion is None:
+            score_hot, score_cold = np.abs(mixer_fraction_hot), np.abs(mixer_fraction_cold)
+        else:
+            score_hot, score_cold = np.broadcast_to(criterion(hot), mixer_type.shape), np.broadcast_to(criterion(cold), mixer_type.shape)
+        # Comparisons with NaN are False, so a side with NaN score is only chosen if the other side has no score either
+        choose_hot = ((score_hot <= score_cold) | (np.isnan(score_cold) & ~np.isnan(score_hot))) & (mixer_type != NONE)
+        choose_cold = ~choose_hot & ~np.isnan(score_cold) & (mixer_type != NONE)
+        mixer_side = np.select([choose_hot, choose_cold], ['hot', 'cold'], 'none')
+        best = MixerSolution(*(np.where(choose_cold, value_cold, value_hot) for value_hot, value_cold in zip(hot, cold)))
+        return MixerPlacement(read_only(mixer_type), MixerSolution(*map(read_only, hot)), MixerSolution(*map(read_only, cold)), read_only(mixer_side), MixerSolution(*map(read_only, best)))
+
+    def temperature_difference_ratio(self, dT_LMTD):
+        """Ratio of the unknown to the known temperature difference for the ratio dT_LMTD of the known to the logarithmic mean temperature difference, from the Lambert W-function"""
+        return - real_lambert_w_minus_one(-dT_LMTD * np.exp(-dT_LMTD)) * 1 / dT_LMTD
+
+    def temperature_difference_ratio_derivative(self, dT_LMTD):
+        """Derivative of temperature_difference_ratio with respect to ln(dT_LMTD), from the derivative of the Lambert W-function; -2 at dT_LMTD = 1"""
+        z = -dT_LMTD * np.exp(-dT_LMTD)
+        w = real_lambert_w_minus_one(z)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # beta = -W(z) / x with dz/dx = -exp(-x) * (1 - x)
+            derivative = lambert_w_derivative(w, z) * np.exp(-dT_LMTD) * (1 - dT_LMTD) + w / dT_LMTD
+        return np.where(dT_LMTD == 1, -2.0, derivative)
+
+    def mixer_fraction_gradient(self, mixer_side='none'):
+        """Runs heat_exchanger_temperature_calculation and calculates the partial derivatives of the mixer fractions with respect to all numeric inputs
+
+        The unknown temperature difference beta(x) * dT_known with x = dT_known / LMTD changes by (beta + dbeta/dln(x)) * ddT_known - x * dbeta/dln(x) * dLMTD, and the mixer fraction follows from the quotient rule.
+
+        Args:
+            mixer_side (str or array, optional): Side of the mixer, see heat_exchanger_temperature_calculation. Defaults to 'none'.
+
+        Returns:
+            dict: Input name (inlet_temperature_hot_stream, inlet_temperature_cold_stream, film_heat_transfer_coefficient_hot_stream, film_heat_transfer_coefficient_cold_stream, heat_capacity_flow_hot_stream, heat_capacity_flow_cold_stream, heat_load, existent_area) -> derivative of admixer_fraction or bypass_fraction of every row (arrays), NaN for rows without mixer
+        """
+        self.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+        inlet_temperature_hot_stream, inlet_temperature_cold_stream, outlet_temperature_hot_stream, outlet_temperature_cold_stream, logarithmic_mean_temperature_difference, heat_load, heat_capacity_flow_hot_stream, heat_capacity_flow_cold_stream = np.broadcast_arrays(
+            self.inlet_temperature_hot_stream, self.inlet_temperature_cold_stream, self.outlet_temperature_hot_stream, self.outlet_temperature_cold_stream, self.logarithmic_mean_temperature_difference, self.heat_load, self.heat_capacity_flow_hot_stream, self.heat_capacity_flow_cold_stream)
+        shape = inlet_temperature_hot_stream.shape
+        mixer_type = np.broadcast_to(self.mixer_type, shape)
+        hot_side = np.broadcast_to(np.asarray(mixer_side) == 'hot', shape)
+        admixer_hot = (mixer_type == ADMIXER) & hot_side
+        admixer_cold = (mixer_type == ADMIXER) & ~hot_side
+        bypass_hot = (mixer_type == BYPASS) & hot_side
+        bypass_cold = (mixer_type == BYPASS) & ~hot_side
+        known_1 = admixer_hot | bypass_cold
+        dT_known = np.where(known_1, outlet_temperature_hot_stream - inlet_temperature_cold_stream, inlet_temperature_hot_stream - outlet_temperature_cold_stream)
+        dT_LMTD = dT_known / logarithmic_mean_temperature_difference
+        ratio_derivative = self.temperature_difference_ratio_derivative(dT_LMTD)
+        # beta from the temperatures of the heat exchanger, so the gradient matches the ratio used by heat_exchanger_temperature_calculation
+        dT_unknown = np.select([admixer_hot, admixer_cold, bypass_hot, bypass_cold], [self.heat_exchanger_inlet_temperature_hot_stream - inlet_temperature_cold_stream, outlet_temperature_hot_stream - self.heat_exchanger_inlet_temperature_cold_stream, self.heat_exchanger_outlet_temperature_hot_stream - inlet_temperature_cold_stream, inlet_temperature_hot_stream - self.heat_exchanger_outlet_temperature_cold_stream], np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            beta = dT_unknown / dT_known
+            overall_heat_transfer_coefficient = self.overall_heat_transfer_coefficient
+            # Input -> derivatives of Ti_h, Ti_c, To_h, To_c and LMTD
+            derivatives = dict(
+                inlet_temperature_hot_stream=(1, 0, 1, 0, 0),
+                inlet_temperature_cold_stream=(0, 1, 0, 1, 0),
+                film_heat_transfer_coefficient_hot_stream=(0, 0, 0, 0, -logarithmic_mean_temperature_difference * overall_heat_transfer_coefficient / self.film_heat_transfer_coefficient_hot_stream ** 2),
+                film_heat_transfer_coefficient_cold_stream=(0, 0, 0, 0, -logarithmic_mean_temperature_difference * overall_heat_transfer_coefficient / self.film_heat_transfer_coefficient_cold_stream ** 2),
+                heat_capacity_flow_hot_stream=(0, 0, heat_load / heat_capacity_flow_hot_stream ** 2, 0, 0),
+                heat_capacity_flow_cold_stream=(0, 0, 0, -heat_load / heat_capacity_flow_cold_stream ** 2, 0),
+                heat_load=(0, 0, -1 / heat_capacity_flow_hot_stream, 1 / heat_capacity_flow_cold_stream, logarithmic_mean_temperature_difference / heat_load),
+                existent_area=(0, 0, 0, 0, -logarithmic_mean_temperature_difference / self.existent_area))
+            # Mixer fraction = numerator / denominator per mixer type and side
+            numerator = np.select([admixer_hot, admixer_cold, bypass_hot, bypass_cold], [inlet_temperature_hot_stream - self.heat_exchanger_inlet_temperature_hot_stream, inlet_temperature_cold_stream - self.heat_exchanger_inlet_temperature_cold_stream, outlet_temperature_hot_stream - inlet_temperature_hot_stream, outlet_temperature_cold_stream - inlet_temperature_cold_stream], np.nan)
+            denominator = np.select([admixer_hot, admixer_cold, bypass_hot, bypass_cold], [self.heat_exchanger_inlet_temperature_hot_stream - outlet_temperature_hot_stream, self.heat_exchanger_inlet_temperature_cold_stream - outlet_temperature_cold_stream, self.heat_exchanger_outlet_temperature_hot_stream - inlet_temperature_hot_stream, self.heat_exchanger_outlet_temperature_cold_stream - inlet_temperature_cold_stream], np.nan)
+            fraction = numerator / denominator
+            gradient = {}
+            for name, (d_inlet_hot, d_inlet_cold, d_outlet_hot, d_outlet_cold, d_logarithmic_mean) in derivatives.items():
+                d_known = np.where(known_1, d_outlet_hot - d_inlet_cold, d_inlet_hot - d_outlet_cold)
+                d_unknown = (beta + ratio_derivative) * d_known - dT_LMTD * ratio_derivative * d_logarithmic_mean
+                # Derivatives of the calculated heat exchanger temperature: Ti_h = Ti_c + dT_unknown, Ti_c = To_h - dT_unknown, To_h = Ti_c + dT_unknown, To_c = Ti_h - dT_unknown
+                d_temperature = np.select([admixer_hot, admixer_cold, bypass_hot, bypass_cold], [d_inlet_cold + d_unknown, d_outlet_hot - d_unknown, d_inlet_cold + d_unknown, d_inlet_hot - d_unknown], np.nan)
+                d_numerator = np.select([admixer_hot, admixer_cold, bypass_hot, bypass_cold], [d_inlet_hot - d_temperature, d_inlet_cold - d_temperature, d_outlet_hot - d_inlet_hot, d_outlet_cold - d_inlet_cold], np.nan)
+                d_denominator = np.select([admixer_hot, admixer_cold, bypass_hot, bypass_cold], [d_temperature - d_outlet_hot, d_temperature - d_outlet_cold, d_temperature - d_inlet_hot, d_temperature - d_inlet_cold], np.nan)
+                gradient[name] = (d_numerator - fraction * d_denominator) / denominator
+        return gradient
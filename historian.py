@@ -0,0 +1,134 @@
+import contextlib
+import csv
+
+import numpy as np
+
+from heat_exchanger_batch import NONE, mixer_type_names
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+
+INPUT_COLUMNS = ('inlet_temperature_hot_stream', 'inlet_temperature_cold_stream', 'film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream', 'heat_capacity_flow_hot_stream', 'heat_capacity_flow_cold_stream', 'heat_load', 'existent_area')
+OUTPUT_COLUMNS = ('mixer_type', 'admixer_fraction', 'bypass_fraction', 'heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream', 'heat_exchanger_outlet_temperature_cold_stream')
+
+
+def read_chunks(csv_file, column_map=None, fixed=None, passthrough=(), chunk_size=100000, rejected=None):
+    """Reads a historian CSV export in chunks of fixed size, mapping its columns to the HeatExchangerReverse arguments
+
+    Args:
+        csv_file (file): Open text file with a header line
+        column_map (dict, optional): Argument name (see INPUT_COLUMNS) -> CSV column. Defaults to None (CSV columns named like the arguments).
+        fixed (dict, optional): Argument name -> value for arguments that are no CSV column, e.g. existent_area. Defaults to None.
+        passthrough (tuple, optional): CSV columns copied unchanged to the output, e.g. the timestamp. Defaults to ().
+        chunk_size (int, optional): Number of rows per chunk. Defaults to 100000.
+        rejected (callable, optional): Called with (line number, row, reason) for malformed rows. Defaults to None.
+
+    Yields:
+        tuple: Line numbers, CSV rows (lists of strings, for rejecting rows later), passthrough values (list of tuples) and columns (dict argument name -> float array) of one chunk
+    """
+    fixed = dict(fixed or {})
+    column_map = dict(column_map or {name: name for name in INPUT_COLUMNS if name not in fixed})
+    reader = csv.reader(csv_file)
+    header = next(reader)
+    missing = [column for column in list(column_map.values()) + list(passthrough) if column not in header]
+    if missing:
+        raise Exception("Sorry, the CSV file has no column(s) " + ', '.join(missing))
+    value_indices = [header.index(column) for column in column_map.values()]
+    passthrough_indices = [header.index(column) for column in passthrough]
+
+    line_numbers, rows, passthrough_values, values = [], [], [], []
+    for line_number, row in enumerate(reader, start=2):
+        try:
+            row_values = [float(row[index]) for index in value_indices]
+            row_passthrough = tuple(row[index] for index in passthrough_indices)
+        except (IndexError, ValueError) as error:
+            if rejected is not None:
+                rejected(line_number, row, 'malformed: {}'.format(error))
+            continue
+        values.append(row_values)
+        line_numbers.append(line_number)
+        rows.append(row)
+        passthrough_values.append(row_passthrough)
+        if len(values) == chunk_size:
+            yield chunk(line_numbers, rows, passthrough_values, values, column_map, fixed)
+            line_numbers, rows, passthrough_values, values = [], [], [], []
+    if values:
+        yield chunk(line_numbers, rows, passthrough_values, values, column_map, fixed)
+
+
+def chunk(line_numbers, rows, passthrough_values, values, column_map, fixed):
+    """Converts the parsed rows of one chunk to one float array per argument"""
+    values = np.array(values, dtype=float).reshape(len(values), len(column_map))
+    columns = dict(fixed)
+    for index, name in enumerate(column_map):
+        columns[name] = values[:, index]
+    return line_numbers, rows, passthrough_values, columns
+
+
+def reverse_chunk(columns, mixer_side='none'):
+    """Runs the batched mixer type and mixer fraction calculation on one chunk
+
+    Returns:
+        tuple: Output columns (dict name -> array) and mask of the feasible rows
+    """
+    m = HeatExchangerReverseBatch.from_columns(columns)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+        mixer_type = np.broadcast_to(m.mixer_type, m.heat_exchanger_inlet_temperature_hot_stream.shape)
+    outputs = dict(
+        mixer_type=mixer_type_names(mixer_type),
+        admixer_fraction=m.admixer_fraction,
+        bypass_fraction=m.bypass_fraction,
+        heat_exchanger_inlet_temperature_hot_stream=m.heat_exchanger_inlet_temperature_hot_stream,
+        heat_exchanger_outlet_temperature_hot_stream=m.heat_exchanger_outlet_temperature_hot_stream,
+        heat_exchanger_inlet_temperature_cold_stream=m.heat_exchanger_inlet_temperature_cold_stream,
+        heat_exchanger_outlet_temperature_cold_stream=m.heat_exchanger_outlet_temperature_cold_stream)
+    fraction = np.where(np.isnan(m.admixer_fraction), m.bypass_fraction, m.admixer_fraction)
+    # Temperature crosses of the streams give finite but meaningless results
+    no_temperature_cross = (m.outlet_temperature_hot_stream > m.inlet_temperature_cold_stream) & (m.inlet_temperature_hot_stream > m.outlet_temperature_cold_stream)
+    feasible = no_temperature_cross & ((mixer_type == NONE) | np.isfinite(fraction))
+    for name in OUTPUT_COLUMNS[3:]:
+        feasible &= np.isfinite(outputs[name])
+    return outputs, feasible
+
+
+def reverse_pipeline(input_path, output_path, rejected_path=None, column_map=None, fixed=None, passthrough=(), chunk_size=100000, mixer_side='none'):
+    """Streams a historian CSV export through HeatExchangerReverseBatch chunk by chunk, so memory stays constant regardless of the file length
+
+    Malformed rows (missing or non-numeric values) and infeasible rows (temperature cross, no finite mixer fraction or temperatures) do not abort the run but are written to the rejected file with their line number, reason and CSV row.
+
+    Args:
+        input_path (str): Historian CSV export with a header line
+        output_path (str): CSV file for the results: passthrough columns followed by OUTPUT_COLUMNS
+        rejected_path (str, optional): CSV file for rejected rows. Defaults to None (rejected rows are only counted).
+        column_map (dict, optional): Argument name (see INPUT_COLUMNS) -> CSV column. Defaults to None (CSV columns named like the arguments).
+        fixed (dict, optional): Argument name -> value for arguments that are no CSV column. Defaults to None.
+        passthrough (tuple, optional): CSV columns copied unchanged to the output, e.g. the timestamp. Defaults to ().
+        chunk_size (int, optional): Number of rows per chunk. Defaults to 100000.
+        mixer_side (str, optional): Side of the mixer, see heat_exchanger_temperature_calculation. Defaults to 'none'.
+
+    Returns:
+        dict: Number of written, malformed and infeasible rows
+    """
+    counts = dict(written=0, malformed=0, infeasible=0)
+    with contextlib.ExitStack() as stack:
+        input_file = stack.enter_context(open(input_path, newline=''))
+        writer = csv.writer(stack.enter_context(open(output_path, 'w', newline='')))
+        writer.writerow(list(passthrough) + list(OUTPUT_COLUMNS))
+        rejected_writer = None
+        if rejected_path is not None:
+            rejected_writer = csv.writer(stack.enter_context(open(rejected_path, 'w', newline='')))
+            rejected_writer.writerow(['line', 'reason', 'row'])
+
+        def reject(line_number, row, reason):
+            counts['infeasible' if reason == 'infeasible' else 'malformed'] += 1
+            if rejected_writer is not None:
+                rejected_writer.writerow([line_number, reason, ','.join(row)])
+
+        for line_numbers, rows, passthrough_values, columns in read_chunks(input_file, column_map, fixed, passthrough, chunk_size, reject):
+            outputs, feasible = reverse_chunk(columns, mixer_side)
+            for index in np.flatnonzero(~feasible):
+                reject(line_numbers[index], rows[index], 'infeasible')
+            output_columns = [outputs[name][feasible].tolist() for name in OUTPUT_COLUMNS]
+            for position, index in enumerate(np.flatnonzero(feasible)):
+                writer.writerow(list(passthrough_values[index]) + [column[position] for column in output_columns])
+            counts['written'] += len(output_columns[0])
+    return counts
@@ -0,0 +1,91 @@
+import contextlib
+import functools
+import time
+
+import heat_exchanger
+import heat_exchanger_batch
+import heat_exchanger_reverse
+import heat_exchanger_reverse_batch
+
+# Stage -> (owner, attribute) of every function counted in the stage; owners are classes for methods and modules for imported functions
+STAGES = {
+    'stream_temperature_difference': ((heat_exchanger.HeatExchanger, 'stream_temperature_difference'), (heat_exchanger_batch.HeatExchangerBatch, 'stream_temperature_difference')),
+    'heat_exchanger_inlet_temperature_calculation': ((heat_exchanger.HeatExchanger, 'heat_exchanger_inlet_temperature_calculation'), (heat_exchanger_batch.HeatExchangerBatch, 'heat_exchanger_inlet_temperature_calculation')),
+    'heat_exchanger_temperature_calculation': ((heat_exchanger_reverse.HeatExchangerReverse, 'heat_exchanger_temperature_calculation'), (heat_exchanger_reverse_batch.HeatExchangerReverseBatch, 'heat_exchanger_temperature_calculation')),
+    'logarithmic_mean_temperature_difference': ((heat_exchanger, 'logarithmic_mean_temperature_difference'), (heat_exchanger_batch, 'logarithmic_mean_temperature_difference'), (heat_exchanger_reverse, 'logarithmic_mean_temperature_difference'), (heat_exchanger_reverse_batch, 'logarithmic_mean_temperature_difference')),
+    'lambert_w': ((heat_exchanger_reverse, 'real_lambert_w_minus_one'), (heat_exchanger_reverse_batch, 'real_lambert_w_minus_one')),
+}
+
+statistics = {stage: dict(calls=0, seconds=0.0) for stage in STAGES}
+_originals = {}
+
+
+def counted(stage, function):
+    """Wraps the function to count its calls and add its run time to the statistics of the stage"""
+    entry = statistics[stage]
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            entry['seconds'] += time.perf_counter() - start
+            entry['calls'] += 1
+    return wrapper
+
+
+def enable():
+    """Replaces the functions of all stages by counting wrappers
+
+    The classes and modules are only patched while instrumentation is enabled, so disabled instrumentation has no overhead at all. Times are inclusive: the time of the Lambert W function is also part of heat_exchanger_temperature_calculation.
+    """
+    if _originals:
+        return
+    for stage, targets in STAGES.items():
+        for owner, attribute in targets:
+            function = vars(owner)[attribute]
+            _originals[owner, attribute] = function
+            setattr(owner, attribute, counted(stage, function))
+
+
+def disable():
+    """Restores the original functions of all stages; the statistics are kept until reset"""
+    while _originals:
+        (owner, attribute), function = _originals.popitem()
+        setattr(owner, attribute, function)
+
+
+def is_enabled():
+    return bool(_originals)
+
+
+def reset():
+    """Sets all counters and timers to zero"""
+    for entry in statistics.values():
+        entry['calls'] = 0
+        entry['seconds'] = 0.0
+
+
+def snapshot():
+    """Copy of the statistics
+
+    Returns:
+        dict: Stage -> dict of calls (number of calls) and seconds (cumulative time (s))
+    """
+    return {stage: dict(entry) for stage, entry in statistics.items()}
+
+
+@contextlib.contextmanager
+def instrumented():
+    """Context manager enabling instrumentation with reset statistics and disabling it again at the end
+
+    Yields:
+        function: snapshot
+    """
+    reset()
+    enable()
+    try:
+        yield snapshot
+    finally:
+        disable()
@@ -0,0 +1,220 @@
+import math
+
+import numpy as np
+
+BRANCH_POINT = -1 / math.e
+# Arguments this far below -1/e are rounding errors of -x * exp(-x) for x close to 1
+BRANCH_POINT_TOLERANCE = 1e-12
+
+
+def lambert_w_minus_one(z, tolerance=1e-15, maximum_iterations=20):
+    """Calculates the lower real branch W_-1 of the Lambert W-function with Halley's method
+
+    The argument range is the one produced by reversing the logarithmic mean temperature difference, -1/e <= z < 0.
+    Arguments marginally below -1/e (rounding of -x * exp(-x) for x close to 1) return the branch point -1.
+
+    Args:
+        z (float): Argument -1/e...0
+        tolerance (float, optional): Relative step size at which the iteration stops. Defaults to 1e-15.
+        maximum_iterations (int, optional): Maximum number of Halley steps. Defaults to 20.
+
+    Returns:
+        float: W_-1(z) <= -1, NaN outside of the domain
+    """
+    if z <= BRANCH_POINT:
+        return -1.0 if z > BRANCH_POINT - BRANCH_POINT_TOLERANCE else math.nan
+    elif z >= 0:
+        return -math.inf if z == 0 else math.nan
+
+    if z < -0.25:
+        # Series expansion around the branch point
+        p = -math.sqrt(2 * (1 + math.e * z))
+        w = -1 + p - p * p / 3 + 11 / 72 * p * p * p
+    else:
+        # Asymptotic expansion towards zero
+        logarithm_1 = math.log(-z)
+        logarithm_2 = math.log(-logarithm_1)
+        w = logarithm_1 - logarithm_2 + logarithm_2 / logarithm_1
+
+    for _ in range(maximum_iterations):
+        w_plus_one = w + 1
+        if w_plus_one == 0:
+            break
+        exp_w = math.exp(w)
+        residual = w * exp_w - z
+        step = residual / (exp_w * w_plus_one - (w + 2) * residual / (2 * w_plus_one))
+        w -= step
+        if abs(step) <= tolerance * abs(w):
+            break
+    return w
+
+
+def lambert_w_minus_one_array(z, tolerance=1e-15, maximum_iterations=20):
+    """Vectorized counterpart of lambert_w_minus_one, iterating all rows together until every row has converged
+
+    Args:
+        z (array): Arguments -1/e...0
+        tolerance (float, optional): Relative step size at which the iteration stops. Defaults to 1e-15.
+        maximum_iterations (int, optional): Maximum number of Halley steps. Defaults to 20.
+
+    Returns:
+        array: W_-1(z) <= -1, NaN outside of the domain
+    """
+    z = np.asarray(z, dtype=float)
+    w = np.full(z.shape, np.nan)
+    w[(z <= BRANCH_POINT) & (z > BRANCH_POINT - BRANCH_POINT_TOLERANCE)] = -1
+    w[z == 0] = -np.inf
+    inside = (z > BRANCH_POINT) & (z < 0)
+    z_inside = z[inside]
+
+    with np.errstate(invalid='ignore'):
+        p = -np.sqrt(2 * (1 + np.e * z_inside))
+        logarithm_1 = np.log(-z_inside)
+        logarithm_2 = np.log(-logarithm_1)
+    w_inside = np.where(z_inside < -0.25, -1 + p - p * p / 3 + 11 / 72 * p * p * p, logarithm_1 - logarithm_2 + logarithm_2 / logarithm_1)
+
+    active = np.arange(z_inside.size)
+    for _ in range(maximum_iterations):
+        w_active = w_inside[active]
+        w_plus_one = w_active + 1
+        exp_w = np.exp(w_active)
+        residual = w_active * exp_w - z_inside[active]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = residual / (exp_w * w_plus_one - (w_active + 2) * residual / (2 * w_plus_one))
+        step[w_plus_one == 0] = 0
+        w_inside[active] = w_active - step
+        active = active[np.abs(step) > tolerance * np.abs(w_inside[active])]
+        if active.size == 0:
+            break
+
+    w[inside] = w_inside
+    return w
+
+
+def lambert_w_minus_one_into(z, out, workspace, tolerance=1e-15, maximum_iterations=20):
+    """In-place counterpart of real_lambert_w_minus_one: all rows are iterated together in scratch arrays of the workspace, so no array data is allocated
+
+    Only rows outside -1/e...0 (infeasible temperature differences) fall back to real_lambert_w_minus_one.
+
+    Args:
+        z (array): Arguments
+        out (array): One-dimensional array for the result
+        workspace (Workspace): Scratch arrays, see workspace.py
+        tolerance (float, optional): Relative step size at which the iteration stops. Defaults to 1e-15.
+        maximum_iterations (int, optional): Maximum number of Halley steps. Defaults to 20.
+
+    Returns:
+        array: out, real part of W_-1(z)
+    """
+    rows = len(out)
+    first = workspace.buffer('lambert_first', rows)
+    second = workspace.buffer('lambert_second', rows)
+    third = workspace.buffer('lambert_third', rows)
+    fourth = workspace.buffer('lambert_fourth', rows)
+    inside = workspace.buffer('lambert_inside', rows, bool)
+    mask = workspace.buffer('lambert_mask', rows, bool)
+    active = workspace.buffer('lambert_active', rows, bool)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        np.greater(z, BRANCH_POINT, out=inside)
+        np.less(z, 0, out=mask)
+        np.logical_and(inside, mask, out=inside)
+
+        # Series expansion around the branch point -1 + p - p^2 / 3 + 11 / 72 * p^3
+        np.multiply(z, math.e, out=first)
+        np.add(first, 1, out=first)
+        np.multiply(first, 2, out=first)
+        np.sqrt(first, out=first)
+        np.negative(first, out=first)
+        np.multiply(first, 11 / 72, out=out)
+        np.add(out, -1 / 3, out=out)
+        np.multiply(out, first, out=out)
+        np.add(out, 1, out=out)
+        np.multiply(out, first, out=out)
+        np.add(out, -1, out=out)
+        # Asymptotic expansion towards zero
+        np.negative(z, out=first)
+        np.log(first, out=first)
+        np.negative(first, out=second)
+        np.log(second, out=second)
+        np.divide(second, first, out=third)
+        np.subtract(first, second, out=first)
+        np.add(first, third, out=first)
+        np.greater_equal(z, -0.25, out=mask)
+        np.copyto(out, first, where=mask)
+
+        # Rows stop stepping once converged, like the active rows of lambert_w_minus_one_array
+        np.copyto(active, inside)
+        for _ in range(maximum_iterations):
+            # Halley step residual / (exp(w) * (w + 1) - (w + 2) * residual / (2 * (w + 1)))
+            np.exp(out, out=first)
+            np.multiply(out, first, out=second)
+            np.subtract(second, z, out=second)
+            np.add(out, 1, out=third)
+            np.equal(third, 0, out=mask)
+            np.add(out, 2, out=fourth)
+            np.multiply(fourth, second, out=fourth)
+            np.divide(fourth, third, out=fourth)
+            np.multiply(fourth, 0.5, out=fourth)
+            np.multiply(first, third, out=first)
+            np.subtract(first, fourth, out=first)
+            np.divide(second, first, out=second)
+            np.copyto(second, 0, where=mask)
+            np.logical_not(active, out=mask)
+            np.copyto(second, 0, where=mask)
+            np.subtract(out, second, out=out)
+            np.absolute(second, out=second)
+            np.absolute(out, out=first)
+            np.multiply(first, tolerance, out=first)
+            np.greater(second, first, out=mask)
+            np.logical_and(mask, active, out=active)
+            if not active.any():
+                break
+    np.logical_not(inside, out=inside)
+    if inside.any():
+        out[inside] = real_lambert_w_minus_one(np.broadcast_to(z, out.shape)[inside])
+    return out
+
+
+def lambert_w_derivative(w, z):
+    """Derivative dW/dz = W / (z * (1 + W)) of the Lambert W-function from its value w = W(z), valid on every branch
+
+    Args:
+        w (float or array): W(z)
+        z (float or array): Arguments
+
+    Returns:
+        float or array: dW/dz, infinite at the branch point -1/e
+    """
+    return w / (z * (1 + w))
+
+
+def real_lambert_w_minus_one(z):
+    """Drop-in replacement for scipy.special.lambertw(z, -1).real
+
+    Arguments inside -1/e...0 are solved by the built-in Halley solver. Arguments outside (infeasible temperature differences) fall back to scipy, which is only imported then; without scipy they return NaN.
+
+    Args:
+        z (float or array): Arguments
+
+    Returns:
+        float or array: Real part of W_-1(z)
+    """
+    if np.ndim(z) == 0:
+        w = lambert_w_minus_one(float(z))
+        if math.isnan(w):
+            w = float(scipy_lambert_w_minus_one(np.asarray([z], dtype=float))[0])
+        return w
+    w = lambert_w_minus_one_array(z)
+    outside = np.isnan(w)
+    if np.any(outside):
+        w[outside] = scipy_lambert_w_minus_one(np.asarray(z, dtype=float)[outside])
+    return w
+
+
+def scipy_lambert_w_minus_one(z):
+    """Real part of scipy's W_-1 with lazy import of scipy; NaN if scipy is not installed"""
+    try:
+        from scipy.special import lambertw
+    except ImportError:
+        return np.full(np.shape(z), np.nan)
+    return lambertw(z, -1).real
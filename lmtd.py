@@ -0,0 +1,206 @@
+import numpy as np
+
+LMTD_MODES = ('exact', 'chen', 'underwood', 'paterson')
+# Below this relative difference u = (dTa - dTb) / (dTa + dTb) the exact mode uses the series expansion instead of the logarithm
+SERIES_THRESHOLD = 1e-2
+
+
+def logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, mode='exact'):
+    """Calculates the logarithmic mean temperature difference exactly or with a closed-form approximation
+
+    Modes:
+        exact -- (dTa - dTb) / ln(dTa / dTb), switching to the series expansion around dTa = dTb when both are nearly equal
+        chen -- (dTa * dTb * (dTa + dTb) / 2)^(1/3), Chen (1987)
+        underwood -- ((dTa^(1/3) + dTb^(1/3)) / 2)^3, Underwood (1933)
+        paterson -- 2/3 * (dTa * dTb)^(1/2) + 1/3 * (dTa + dTb) / 2, Paterson (1984)
+
+    Args:
+        temperature_difference_a (float or array): Temperature difference at one end of the heat exchanger (K)
+        temperature_difference_b (float or array): Temperature difference at the other end of the heat exchanger (K)
+        mode (str, optional): exact, chen, underwood, or paterson. Defaults to 'exact'.
+
+    Returns:
+        float or array: Logarithmic mean temperature difference (K), NaN for temperature differences with different signs
+    """
+    if mode not in LMTD_MODES:
+        raise Exception("Sorry, you've misspelled the LMTD mode")
+    if np.ndim(temperature_difference_a) == 0 and np.ndim(temperature_difference_b) == 0:
+        return scalar_logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, mode)
+    temperature_difference_a, temperature_difference_b = np.broadcast_arrays(np.asarray(temperature_difference_a, dtype=float), np.asarray(temperature_difference_b, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if mode == 'exact':
+            relative_difference = (temperature_difference_a - temperature_difference_b) / (temperature_difference_a + temperature_difference_b)
+            series = np.abs(relative_difference) < SERIES_THRESHOLD
+            logarithmic_mean = np.where(series, series_expansion(temperature_difference_a, temperature_difference_b, relative_difference), (temperature_difference_a - temperature_difference_b) / np.log(temperature_difference_a / temperature_difference_b))
+        else:
+            logarithmic_mean = approximation(temperature_difference_a, temperature_difference_b, mode)
+    return np.where(temperature_difference_a * temperature_difference_b > 0, logarithmic_mean, np.where(temperature_difference_a == temperature_difference_b, temperature_difference_a, np.nan))
+
+
+def scalar_logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, mode='exact'):
+    """Scalar path of logarithmic_mean_temperature_difference using Python control flow instead of masks"""
+    if temperature_difference_a == temperature_difference_b:
+        return temperature_difference_a
+    elif not temperature_difference_a * temperature_difference_b > 0:
+        return np.nan
+    elif mode == 'exact':
+        relative_difference = (temperature_difference_a - temperature_difference_b) / (temperature_difference_a + temperature_difference_b)
+        if abs(relative_difference) < SERIES_THRESHOLD:
+            return series_expansion(temperature_difference_a, temperature_difference_b, relative_difference)
+        return (temperature_difference_a - temperature_difference_b) / np.log(temperature_difference_a / temperature_difference_b)
+    return approximation(temperature_difference_a, temperature_difference_b, mode)
+
+
+def series_expansion(temperature_difference_a, temperature_difference_b, relative_difference):
+    """Series of the logarithmic mean around dTa = dTb: (dTa + dTb) / 2 * u / artanh(u) with u = (dTa - dTb) / (dTa + dTb)"""
+    u2 = relative_difference * relative_difference
+    return (temperature_difference_a + temperature_difference_b) / 2 * (1 - u2 * (1 / 3 + u2 * (4 / 45 + u2 * 44 / 945)))
+
+
+def approximation(temperature_difference_a, temperature_difference_b, mode):
+    """Closed-form approximations of the logarithmic mean, valid for temperature differences with the same sign"""
+    if mode == 'chen':
+        return np.cbrt(temperature_difference_a * temperature_difference_b * (temperature_difference_a + temperature_difference_b) / 2)
+    elif mode == 'underwood':
+        return ((np.cbrt(temperature_difference_a) + np.cbrt(temperature_difference_b)) / 2) ** 3
+    elif mode == 'paterson':
+        return 2 / 3 * np.sign(temperature_difference_a) * np.sqrt(temperature_difference_a * temperature_difference_b) + (temperature_difference_a + temperature_difference_b) / 6
+    else:
+        raise Exception("Sorry, you've misspelled the LMTD mode")
+
+
+def logarithmic_mean_temperature_difference_gradient(temperature_difference_a, temperature_difference_b, mode='exact'):
+    """Calculates the partial derivatives of the logarithmic mean temperature difference of the LMTD mode
+
+    Exact mode: dLMTD/ddTa = LMTD * (dTa - LMTD) / (dTa * (dTa - dTb)), switching to the derivative of the series expansion when both temperature differences are nearly equal (1/2 each for dTa = dTb)
+
+    Args:
+        temperature_difference_a (float or array): Temperature difference at one end of the heat exchanger (K)
+        temperature_difference_b (float or array): Temperature difference at the other end of the heat exchanger (K)
+        mode (str, optional): exact, chen, underwood, or paterson. Defaults to 'exact'.
+
+    Returns:
+        tuple: dLMTD/ddTa and dLMTD/ddTb (arrays), NaN for temperature differences with different signs
+    """
+    logarithmic_mean = logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, mode)
+    temperature_difference_a, temperature_difference_b, logarithmic_mean = np.broadcast_arrays(np.asarray(temperature_difference_a, dtype=float), np.asarray(temperature_difference_b, dtype=float), np.asarray(logarithmic_mean, dtype=float))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if mode == 'exact':
+            temperature_difference_sum = temperature_difference_a + temperature_difference_b
+            relative_difference = (temperature_difference_a - temperature_difference_b) / temperature_difference_sum
+            u2 = relative_difference * relative_difference
+            # Series (dTa + dTb) / 2 * P(u) with dP/du and du/ddTa = 2 dTb / (dTa + dTb)^2
+            series_factor = 1 - u2 * (1 / 3 + u2 * (4 / 45 + u2 * 44 / 945))
+            series_derivative = -relative_difference * (2 / 3 + u2 * (16 / 45 + u2 * 264 / 945))
+            series = np.abs(relative_difference) < SERIES_THRESHOLD
+            gradient_a = np.where(series, series_factor / 2 + series_derivative * temperature_difference_b / temperature_difference_sum, logarithmic_mean * (temperature_difference_a - logarithmic_mean) / (temperature_difference_a * (temperature_difference_a - temperature_difference_b)))
+            gradient_b = np.where(series, series_factor / 2 - series_derivative * temperature_difference_a / temperature_difference_sum, logarithmic_mean * (temperature_difference_b - logarithmic_mean) / (temperature_difference_b * (temperature_difference_b - temperature_difference_a)))
+        elif mode == 'chen':
+            gradient_a = logarithmic_mean / 3 * (1 / temperature_difference_a + 1 / (temperature_difference_a + temperature_difference_b))
+            gradient_b = logarithmic_mean / 3 * (1 / temperature_difference_b + 1 / (temperature_difference_a + temperature_difference_b))
+        elif mode == 'underwood':
+            cube_root_mean = (np.cbrt(temperature_difference_a) + np.cbrt(temperature_difference_b)) / 2
+            gradient_a = cube_root_mean ** 2 / (2 * np.cbrt(temperature_difference_a) ** 2)
+            gradient_b = cube_root_mean ** 2 / (2 * np.cbrt(temperature_difference_b) ** 2)
+        else:
+            geometric_mean = np.sign(temperature_difference_a) * np.sqrt(temperature_difference_a * temperature_difference_b)
+            gradient_a = temperature_difference_b / (3 * geometric_mean) + 1 / 6
+            gradient_b = temperature_difference_a / (3 * geometric_mean) + 1 / 6
+    defined = np.isfinite(logarithmic_mean)
+    return np.where(defined, gradient_a, np.nan), np.where(defined, gradient_b, np.nan)
+
+
+def logarithmic_mean_temperature_difference_into(temperature_difference_a, temperature_difference_b, out, workspace, mode='exact'):
+    """In-place counterpart of logarithmic_mean_temperature_difference: every step writes into out or into scratch arrays of the workspace, so no array data is allocated
+
+    Args:
+        temperature_difference_a (array): Temperature differences at one end of the heat exchangers (K)
+        temperature_difference_b (array): Temperature differences at the other end of the heat exchangers (K)
+        out (array): One-dimensional array for the result
+        workspace (Workspace): Scratch arrays, see workspace.py
+        mode (str, optional): exact, chen, underwood, or paterson. Defaults to 'exact'.
+
+    Returns:
+        array: out, logarithmic mean temperature differences (K), NaN for temperature differences with different signs
+    """
+    if mode not in LMTD_MODES:
+        raise Exception("Sorry, you've misspelled the LMTD mode")
+    rows = len(out)
+    first = workspace.buffer('lmtd_first', rows)
+    second = workspace.buffer('lmtd_second', rows)
+    mask = workspace.buffer('lmtd_mask', rows, bool)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if mode == 'exact':
+            np.divide(temperature_difference_a, temperature_difference_b, out=first)
+            np.log(first, out=first)
+            np.subtract(temperature_difference_a, temperature_difference_b, out=out)
+            np.divide(out, first, out=out)
+            # Series (dTa + dTb) / 2 * P(u^2) where |u| < SERIES_THRESHOLD
+            np.subtract(temperature_difference_a, temperature_difference_b, out=first)
+            np.add(temperature_difference_a, temperature_difference_b, out=second)
+            np.divide(first, second, out=first)
+            np.multiply(first, first, out=first)
+            np.less(first, SERIES_THRESHOLD ** 2, out=mask)
+            if mask.any():
+                third = workspace.buffer('lmtd_third', rows)
+                np.multiply(first, 44 / 945, out=third)
+                np.add(third, 4 / 45, out=third)
+                np.multiply(third, first, out=third)
+                np.add(third, 1 / 3, out=third)
+                np.multiply(third, first, out=third)
+                np.subtract(1, third, out=third)
+                np.multiply(third, second, out=third)
+                np.multiply(third, 0.5, out=third)
+                np.copyto(out, third, where=mask)
+        elif mode == 'chen':
+            np.add(temperature_difference_a, temperature_difference_b, out=first)
+            np.multiply(first, temperature_difference_a, out=first)
+            np.multiply(first, temperature_difference_b, out=first)
+            np.multiply(first, 0.5, out=first)
+            np.cbrt(first, out=out)
+        elif mode == 'underwood':
+            np.cbrt(temperature_difference_a, out=first)
+            np.cbrt(temperature_difference_b, out=second)
+            np.add(first, second, out=out)
+            np.multiply(out, 0.5, out=out)
+            np.power(out, 3, out=out)
+        else:
+            np.multiply(temperature_difference_a, temperature_difference_b, out=first)
+            np.sqrt(first, out=first)
+            np.sign(temperature_difference_a, out=second)
+            np.multiply(first, second, out=first)
+            np.multiply(first, 2 / 3, out=first)
+            np.add(temperature_difference_a, temperature_difference_b, out=out)
+            np.divide(out, 6, out=out)
+            np.add(out, first, out=out)
+        np.multiply(temperature_difference_a, temperature_difference_b, out=first)
+        np.greater(first, 0, out=mask)
+        np.logical_not(mask, out=mask)
+        np.copyto(out, np.nan, where=mask)
+        np.equal(temperature_difference_a, temperature_difference_b, out=mask)
+        np.copyto(out, temperature_difference_a, where=mask)
+    return out
+
+
+def relative_error(temperature_difference_a, temperature_difference_b, mode):
+    """Relative error of the LMTD mode against the exact logarithmic mean, row by row"""
+    exact = logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b)
+    return logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, mode) / exact - 1
+
+
+def maximum_relative_error(mode, maximum_ratio=100):
+    """Worst-case absolute relative error of the LMTD mode for ratios dTa / dTb between 1 and maximum_ratio
+
+    The relative error only depends on the ratio of the temperature differences, so it is evaluated on a dense grid of ratios.
+
+    Args:
+        mode (str): exact, chen, underwood, or paterson
+        maximum_ratio (float, optional): Largest ratio of the temperature differences. Defaults to 100.
+    """
+    ratios = np.geomspace(1, maximum_ratio, 10001)
+    return float(np.max(np.abs(relative_error(ratios, np.ones_like(ratios), mode))))
+
+
+def maximum_relative_errors(maximum_ratio=100):
+    """Worst-case absolute relative errors of all LMTD modes for ratios dTa / dTb between 1 and maximum_ratio"""
+    return {mode: maximum_relative_error(mode, maximum_ratio) for mode in LMTD_MODES}
@@ -0,0 +1,48 @@
+import numpy as np
+
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+
+
+class MultiPeriodDesign(HeatExchangerReverseBatch):
+    """Class for vectorized multi-period design of heat exchangers: one area for all operating periods and the mixer of every period
+
+        Every argument is either a scalar or an array of N heat exchangers x P periods (period on the last axis); all arrays are broadcast against each other.
+        The area of a heat exchanger is governed by the period with the largest area without mixer; in all other periods the heat exchanger is too large and needs a mixer, which is calculated like in HeatExchangerReverseBatch in the same vectorized pass.
+
+        Arguments:
+            inlet_temperatures {array} -- Inlet temperatures (°C) with hot streams [0] and cold streams [1]
+            film_heat_transfer_coefficients {array} -- Film heat transfer coefficients(kW/(m2K) with hot streams [0] and cold streams [1]
+            heat_capacity_flows {array} -- Heat capacity flows (kW/K) with hot streams [0] and cold streams [1]
+            heat_load {array} -- Heat loads (kW)
+            lmtd_mode {string} -- exact, chen, underwood, or paterson (see lmtd.py)
+        Properties:
+            area {array} -- Resulting area of every heat exchanger (m2), NaN if a period is infeasible
+            governing_period {array} -- Index of the period governing the area of every heat exchanger
+            all properties of HeatExchangerReverseBatch per heat exchanger and period, e.g. mixer_type, admixer_fraction, and bypass_fraction
+        """
+
+    def __init__(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, lmtd_mode='exact'):
+        super().__init__(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, np.nan, lmtd_mode)
+        self.area = None
+        self.governing_period = None
+
+    def design_calculation(self, mixer_side='none'):
+        """Calculates the area of every heat exchanger and the mixers of all periods
+
+        Args:
+            mixer_side (str or array, optional): Side of the mixer for all heat exchangers or per heat exchanger (N), see heat_exchanger_temperature_calculation. Defaults to 'none'.
+
+        Returns:
+            array: Areas (m2)
+        """
+        shape = np.broadcast(self.inlet_temperature_hot_stream, self.inlet_temperature_cold_stream, self.film_heat_transfer_coefficient_hot_stream, self.film_heat_transfer_coefficient_cold_stream, self.heat_capacity_flow_hot_stream, self.heat_capacity_flow_cold_stream, self.heat_load).shape
+        if not shape:
+            raise Exception("Sorry, at least one argument needs a period axis")
+        area_no_mixer = np.broadcast_to(self.area_no_mixer, shape)
+        # argmax returns the first NaN, so an infeasible period governs and gives a NaN area
+        self.governing_period = np.argmax(area_no_mixer, axis=-1)
+        self.area = np.take_along_axis(area_no_mixer, self.governing_period[..., np.newaxis], axis=-1)[..., 0]
+        self.existent_area = self.area[..., np.newaxis]
+        mixer_side = np.asarray(mixer_side)
+        self.heat_exchanger_temperature_calculation(mixer_side=mixer_side[..., np.newaxis] if mixer_side.ndim else mixer_side)
+        return self.area
@@ -0,0 +1,158 @@
+import collections
+
+from heat_exchanger import HeatExchanger
+
+
+class HeatExchangerNetwork:
+    """Class for heat exchanger networks of streams passing through several heat exchangers in series
+
+        Heat exchangers are added in flow direction of their streams: the inlet temperatures of a heat exchanger are the outlet temperatures of the previous heat exchanger on the same stream (or the stream inlet temperature).
+        The network is evaluated in topological order, which is the order of addition. Changing a heat load or a stream only recalculates the heat exchangers downstream of it, changing a mixer only recalculates the heat exchanger itself (mixers do not change the stream outlet temperatures).
+
+        Properties:
+            streams {dict} -- Stream name -> dict of inlet_temperature (°C), heat_capacity_flow (kW/K) and film_heat_transfer_coefficient (kW/(m2K))
+            heat_exchangers {dict} -- Heat exchanger name -> HeatExchanger
+            topological_order {list} -- Heat exchanger names in evaluation order
+            areas {dict} -- Heat exchanger name -> area (m2) of the last evaluation
+            recalculated {list} -- Heat exchanger names recalculated in the last evaluation
+        """
+
+    def __init__(self):
+        self.streams = collections.OrderedDict()
+        self.heat_exchangers = collections.OrderedDict()
+        self.areas = {}
+        self.recalculated = []
+        self._stream_sequences = {}
+        self._stream_names = {}
+        self._upstream = {}
+        self._downstream = {}
+        self._dirty = set()
+
+    def add_stream(self, name, inlet_temperature, heat_capacity_flow, film_heat_transfer_coefficient):
+        """Adds a stream to the network
+
+        Args:
+            name (str): Name of the stream
+            inlet_temperature (float): Inlet temperature (°C)
+            heat_capacity_flow (float): Heat capacity flow (kW/K)
+            film_heat_transfer_coefficient (float): Film heat transfer coefficient (kW/(m2K))
+        """
+        self.streams[name] = dict(inlet_temperature=inlet_temperature, heat_capacity_flow=heat_capacity_flow, film_heat_transfer_coefficient=film_heat_transfer_coefficient)
+        self._stream_sequences[name] = []
+
+    def add_heat_exchanger(self, name, hot_stream, cold_stream, heat_load, mixer_type_hot='none', mixer_type_cold='none', mixer_fraction_hot=0, mixer_fraction_cold=0):
+        """Adds a heat exchanger downstream of all heat exchangers already on its hot and cold stream
+
+        Args:
+            name (str): Name of the heat exchanger
+            hot_stream (str): Name of the hot stream
+            cold_stream (str): Name of the cold stream
+            heat_load (float): Heat load (kW)
+            mixer_type_hot (str, optional): none, bypass, or admixer. Defaults to 'none'.
+            mixer_type_cold (str, optional): none, bypass, or admixer. Defaults to 'none'.
+            mixer_fraction_hot (float, optional): 0...1 ((kg/s)/(kg/s)). Defaults to 0.
+            mixer_fraction_cold (float, optional): 0...1 ((kg/s)/(kg/s)). Defaults to 0.
+        """
+        if name in self.heat_exchangers:
+            raise Exception("Sorry, the heat exchanger name is already used")
+        hot, cold = self.streams[hot_stream], self.streams[cold_stream]
+        self.heat_exchangers[name] = HeatExchanger(
+            inlet_temperatures=[hot['inlet_temperature'], cold['inlet_temperature']],
+            film_heat_transfer_coefficients=[hot['film_heat_transfer_coefficient'], cold['film_heat_transfer_coefficient']],
+            heat_capacity_flows=[hot['heat_capacity_flow'], cold['heat_capacity_flow']],
+            heat_load=heat_load,
+            mixer_type_hot=mixer_type_hot,
+            mixer_type_cold=mixer_type_cold,
+            mixer_fraction_hot=mixer_fraction_hot,
+            mixer_fraction_cold=mixer_fraction_cold)
+        self._stream_names[name] = (hot_stream, cold_stream)
+        self._upstream[name] = {}
+        self._downstream[name] = []
+        for side, stream in (('hot', hot_stream), ('cold', cold_stream)):
+            sequence = self._stream_sequences[stream]
+            if sequence:
+                self._upstream[name][side] = sequence[-1]
+                self._downstream[sequence[-1]].append(name)
+            else:
+                self._upstream[name][side] = None
+            sequence.append(name)
+        self._dirty.add(name)
+
+    @property
+    def topological_order(self):
+        # Heat exchangers are only added downstream of the existing ones, so the order of addition is topological
+        return list(self.heat_exchangers)
+
+    def set_heat_load(self, name, heat_load):
+        """Changes the heat load of a heat exchanger; it and all heat exchangers downstream are recalculated"""
+        self.heat_exchangers[name].heat_load = heat_load
+        self._mark_downstream(name)
+
+    def set_mixer(self, name, side, mixer_type, mixer_fraction):
+        """Changes the mixer on the hot or cold side of a heat exchanger; only the heat exchanger itself is recalculated"""
+        heat_exchanger = self.heat_exchangers[name]
+        if side == 'hot':
+            heat_exchanger.mixer_type_hot = mixer_type
+            heat_exchanger.mixer_fraction_hot = mixer_fraction
+        elif side == 'cold':
+            heat_exchanger.mixer_type_cold = mixer_type
+            heat_exchanger.mixer_fraction_cold = mixer_fraction
+        else:
+            raise Exception("Sorry,you've misspelled the stream type")
+        self._dirty.add(name)
+
+    def set_stream(self, name, inlet_temperature=None, heat_capacity_flow=None, film_heat_transfer_coefficient=None):
+        """Changes the given properties of a stream; all heat exchangers on the stream and downstream are recalculated"""
+        stream = self.streams[name]
+        for key, value in (('inlet_temperature', inlet_temperature), ('heat_capacity_flow', heat_capacity_flow), ('film_heat_transfer_coefficient', film_heat_transfer_coefficient)):
+            if value is not None:
+                stream[key] = value
+        for heat_exchanger in self._stream_sequences[name]:
+            self._mark_downstream(heat_exchanger)
+
+    def _mark_downstream(self, name):
+        pending = [name]
+        marked = set()
+        while pending:
+            name = pending.pop()
+            if name not in marked:
+                marked.add(name)
+                pending.extend(self._downstream[name])
+        self._dirty |= marked
+
+    def evaluate(self):
+        """Recalculates all changed heat exchangers in topological order
+
+        Returns:
+            dict: Copy of the heat exchanger name -> area (m2), so changing it does not change the areas of clean heat exchangers
+        """
+        self.recalculated = [name for name in self.topological_order if name in self._dirty]
+        for name in self.recalculated:
+            heat_exchanger = self.heat_exchangers[name]
+            hot_stream, cold_stream = self._stream_names[name]
+            hot, cold = self.streams[hot_stream], self.streams[cold_stream]
+            upstream_hot, upstream_cold = self._upstream[name]['hot'], self._upstream[name]['cold']
+            heat_exchanger.inlet_temperature_hot_stream = hot['inlet_temperature'] if upstream_hot is None else self.outlet_temperature(upstream_hot, hot_stream)
+            heat_exchanger.inlet_temperature_cold_stream = cold['inlet_temperature'] if upstream_cold is None else self.outlet_temperature(upstream_cold, cold_stream)
+            heat_exchanger.heat_capacity_flow_hot_stream = hot['heat_capacity_flow']
+            heat_exchanger.heat_capacity_flow_cold_stream = cold['heat_capacity_flow']
+            heat_exchanger.film_heat_transfer_coefficient_hot_stream = hot['film_heat_transfer_coefficient']
+            heat_exchanger.film_heat_transfer_coefficient_cold_stream = cold['film_heat_transfer_coefficient']
+            self.areas[name] = heat_exchanger.area
+        self._dirty.clear()
+        return dict(self.areas)
+
+    def outlet_temperature(self, name, stream):
+        """Outlet temperature (°C) of a stream after the given heat exchanger"""
+        heat_exchanger = self.heat_exchangers[name]
+        if self._stream_names[name][0] == stream:
+            return heat_exchanger.outlet_temperature_hot_stream
+        return heat_exchanger.outlet_temperature_cold_stream
+
+    def stream_outlet_temperature(self, stream):
+        """Outlet temperature (°C) of a stream after its last heat exchanger"""
+        sequence = self._stream_sequences[stream]
+        if not sequence:
+            return self.streams[stream]['inlet_temperature']
+        self.evaluate()
+        return self.outlet_temperature(sequence[-1], stream)
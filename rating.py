@@ -0,0 +1,114 @@
+import numpy as np
+
+from heat_exchanger_batch import HeatExchangerBatch
+from lmtd import logarithmic_mean_temperature_difference, logarithmic_mean_temperature_difference_gradient
+
+
+class HeatExchangerRating(HeatExchangerBatch):
+    """Class for vectorized rating of heat exchangers with fixed area: heat loads and outlet temperatures for existing heat exchangers
+
+        The heat load is solved from U * A * LMTD(Q) - Q = 0. With the mixer models of HeatExchangerBatch both temperature differences are linear in the heat load, so the residual is concave with one root between no heat load and the heat load of the temperature cross.
+        heat_load_calculation solves all rows at once with Newton steps, falling back to bisection whenever a step leaves the bracket of the root.
+
+        Arguments:
+            inlet_temperatures {array} -- Inlet temperatures (°C) with hot streams [0] and cold streams [1]
+            film_heat_transfer_coefficients {array} -- Film heat transfer coefficients(kW/(m2K) with hot streams [0] and cold streams [1]
+            heat_capacity_flows {array} -- Heat capacity flows (kW/K) with hot streams [0] and cold streams [1]
+            existent_area {array} -- Areas of HEX (m2)
+            mixer_type_hot {array} -- none, bypass, or admixer per row (names or codes)
+            mixer_type_cold {array} -- none, bypass, or admixer per row (names or codes)
+            mixer_fraction_hot {array} -- 0...1 ((kg/s)/(kg/s))
+            mixer_fraction_cold {array} -- 0...1 ((kg/s)/(kg/s))
+            lmtd_mode {string} -- exact, chen, underwood, or paterson (see lmtd.py)
+        Properties:
+            heat_load {array} -- Resulting heat loads (kW), None before heat_load_calculation
+            converged {array} -- Per row: True if the heat load converged
+            iterations {int} -- Number of iterations of the last heat_load_calculation
+            all properties of HeatExchangerBatch for the resulting heat loads
+        """
+
+    def __init__(self, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, existent_area, mixer_type_hot='none', mixer_type_cold='none', mixer_fraction_hot=0, mixer_fraction_cold=0, lmtd_mode='exact'):
+        super().__init__(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, None, mixer_type_hot, mixer_type_cold, mixer_fraction_hot, mixer_fraction_cold, lmtd_mode)
+        self.existent_area = np.asarray(existent_area, dtype=float)
+        self.heat_load = None
+        self.converged = None
+        self.iterations = 0
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Sets up the rating from flat columns named like the HeatExchanger attributes with existent_area instead of heat_load; missing mixer columns default to no mixer"""
+        return cls(
+            inlet_temperatures=[columns['inlet_temperature_hot_stream'], columns['inlet_temperature_cold_stream']],
+            film_heat_transfer_coefficients=[columns['film_heat_transfer_coefficient_hot_stream'], columns['film_heat_transfer_coefficient_cold_stream']],
+            heat_capacity_flows=[columns['heat_capacity_flow_hot_stream'], columns['heat_capacity_flow_cold_stream']],
+            existent_area=columns['existent_area'],
+            mixer_type_hot=columns.get('mixer_type_hot', 'none'),
+            mixer_type_cold=columns.get('mixer_type_cold', 'none'),
+            mixer_fraction_hot=columns.get('mixer_fraction_hot', 0),
+            mixer_fraction_cold=columns.get('mixer_fraction_cold', 0),
+            lmtd_mode=columns.get('lmtd_mode', 'exact'))
+
+    def temperature_difference_coefficients(self):
+        """Temperature differences at no heat load and their change per kW of heat load: dT(Q) = dT(0) + Q * ddT/dQ with the g and k of mixer_coefficients; the instance is not changed
+
+        Returns:
+            tuple: dTa(0), ddTa/dQ, dTb(0), ddTb/dQ (K, K/kW)
+        """
+        g_h, k_h, _, _ = self.mixer_coefficients(self.heat_capacity_flow_hot_stream, self.mixer_type_hot, self.mixer_fraction_hot)
+        g_c, k_c, _, _ = self.mixer_coefficients(self.heat_capacity_flow_cold_stream, self.mixer_type_cold, self.mixer_fraction_cold)
+        temperature_difference = self.inlet_temperature_hot_stream - self.inlet_temperature_cold_stream
+        return temperature_difference, -(g_h + k_h + g_c), temperature_difference, -(g_h + g_c + k_c)
+
+    def heat_load_calculation(self, heat_load_guess=None, tolerance=1e-10, maximum_iterations=50):
+        """Calculates the heat loads of all rows with safeguarded Newton iteration
+
+        Args:
+            heat_load_guess (array, optional): Starting heat loads (kW), e.g. the heat loads of the previous time step. Defaults to None (heat loads with the arithmetic mean temperature difference).
+            tolerance (float, optional): Relative step size (and residual) at which a row has converged. Defaults to 1e-10.
+            maximum_iterations (int, optional): Maximum number of iterations. Defaults to 50.
+
+        Returns:
+            array: Heat loads (kW), NaN for rows without temperature difference
+        """
+        a0, a1, b0, b1 = self.temperature_difference_coefficients()
+        ua = self.overall_heat_transfer_coefficient * self.existent_area
+        a0, a1, b0, b1, ua = np.broadcast_arrays(*np.atleast_1d(a0, a1, b0, b1, ua))
+        shape = a0.shape
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Bracket: residual is positive without heat load and -Q at the temperature cross, where one temperature difference vanishes
+            lower = np.zeros(shape)
+            upper = np.fmin(np.where(a1 < 0, -a0 / a1, np.inf), np.where(b1 < 0, -b0 / b1, np.inf))
+            feasible = (a0 > 0) & (b0 > 0) & (ua > 0) & np.isfinite(upper)
+            if heat_load_guess is None:
+                heat_load = ua * (a0 + b0) / 2 / (1 - ua * (a1 + b1) / 2)
+            else:
+                heat_load = np.broadcast_to(np.asarray(heat_load_guess, dtype=float), shape).copy()
+            outside = ~((heat_load > lower) & (heat_load < upper))
+            heat_load[outside] = upper[outside] / 2
+            heat_load[~feasible] = np.nan
+            converged = ~feasible
+            active = np.flatnonzero(feasible)
+            self.iterations = 0
+            while active.size and self.iterations < maximum_iterations:
+                self.iterations += 1
+                q = heat_load[active]
+                temperature_difference_a = a0[active] + a1[active] * q
+                temperature_difference_b = b0[active] + b1[active] * q
+                logarithmic_mean = logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, self.lmtd_mode)
+                gradient_a, gradient_b = logarithmic_mean_temperature_difference_gradient(temperature_difference_a, temperature_difference_b, self.lmtd_mode)
+                residual = ua[active] * logarithmic_mean - q
+                derivative = ua[active] * (gradient_a * a1[active] + gradient_b * b1[active]) - 1
+                scale = np.maximum(np.abs(q), 1)
+                solved = np.abs(residual) <= tolerance * scale
+                lower[active] = np.where(residual > 0, q, lower[active])
+                upper[active] = np.where(residual < 0, q, upper[active])
+                newton = q - residual / derivative
+                inside = (newton >= lower[active]) & (newton <= upper[active])
+                new_heat_load = np.where(solved, q, np.where(inside, newton, (lower[active] + upper[active]) / 2))
+                heat_load[active] = new_heat_load
+                done = solved | (np.abs(new_heat_load - q) <= tolerance * scale) | (upper[active] - lower[active] <= tolerance * scale)
+                converged[active[done]] = True
+                active = active[~done]
+        self.heat_load = heat_load
+        self.converged = converged & feasible
+        return heat_load
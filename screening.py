@@ -0,0 +1,173 @@
+import numpy as np
+
+from heat_exchanger_batch import ADMIXER, BYPASS, MIXER_TYPES, HeatExchangerBatch
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+from lambert_w import BRANCH_POINT, BRANCH_POINT_TOLERANCE
+
+NON_FINITE_INPUT = 1
+NON_POSITIVE_HEAT_CAPACITY_FLOW = 2
+NON_POSITIVE_FILM_HEAT_TRANSFER_COEFFICIENT = 4
+NON_POSITIVE_HEAT_LOAD = 8
+UNKNOWN_MIXER_TYPE = 16
+MIXER_FRACTION_OUT_OF_RANGE = 32
+TEMPERATURE_CROSS = 64
+NON_POSITIVE_AREA = 128
+LAMBERT_W_OUT_OF_DOMAIN = 256
+SCREENING_CODES = dict(
+    non_finite_input=NON_FINITE_INPUT,
+    non_positive_heat_capacity_flow=NON_POSITIVE_HEAT_CAPACITY_FLOW,
+    non_positive_film_heat_transfer_coefficient=NON_POSITIVE_FILM_HEAT_TRANSFER_COEFFICIENT,
+    non_positive_heat_load=NON_POSITIVE_HEAT_LOAD,
+    unknown_mixer_type=UNKNOWN_MIXER_TYPE,
+    mixer_fraction_out_of_range=MIXER_FRACTION_OUT_OF_RANGE,
+    temperature_cross=TEMPERATURE_CROSS,
+    non_positive_area=NON_POSITIVE_AREA,
+    lambert_w_out_of_domain=LAMBERT_W_OUT_OF_DOMAIN)
+STREAM_COLUMNS = ('inlet_temperature_hot_stream', 'inlet_temperature_cold_stream', 'film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream', 'heat_capacity_flow_hot_stream', 'heat_capacity_flow_cold_stream', 'heat_load')
+
+
+def stream_codes(columns, shape):
+    """Codes of the inputs shared by the area and the reverse calculation: non-finite values, non-positive heat capacity flows, film heat transfer coefficients and heat loads"""
+    codes = np.zeros(shape, dtype=np.uint16)
+    for name in STREAM_COLUMNS:
+        codes[~np.isfinite(np.broadcast_to(columns[name], shape))] |= NON_FINITE_INPUT
+    for names, code in ((('heat_capacity_flow_hot_stream', 'heat_capacity_flow_cold_stream'), NON_POSITIVE_HEAT_CAPACITY_FLOW), (('film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream'), NON_POSITIVE_FILM_HEAT_TRANSFER_COEFFICIENT), (('heat_load',), NON_POSITIVE_HEAT_LOAD)):
+        for name in names:
+            codes[np.broadcast_to(np.asarray(columns[name]) <= 0, shape)] |= code
+    return codes
+
+
+def mixer_type_codes_or_unknown(mixer_types, shape):
+    """Like heat_exchanger_batch.mixer_type_codes, but misspelled mixer types give -1 instead of an exception"""
+    mixer_types = np.broadcast_to(mixer_types, shape)
+    if mixer_types.dtype.kind in 'iu':
+        return np.where((mixer_types >= 0) & (mixer_types < len(MIXER_TYPES)), mixer_types, -1).astype(np.int8)
+    codes = np.full(shape, -1, dtype=np.int8)
+    for code, name in enumerate(MIXER_TYPES):
+        codes[mixer_types == name] = code
+    return codes
+
+
+def screen_area(columns):
+    """Screens the columns of HeatExchangerBatch.from_columns for rows the area calculation cannot handle, without calculating a logarithm
+
+    With the mixer models both temperature differences are linear in the heat load (see HeatExchangerBatch.area_gradient), so temperature crosses of the heat exchanger with mixer are found with a few multiplications.
+
+    Args:
+        columns (dict or mapping): Column name -> array or scalar
+
+    Returns:
+        array: Bitwise OR of the SCREENING_CODES of every row (uint16), 0 for feasible rows
+    """
+    mixer_fractions = [np.asarray(columns.get('mixer_fraction_' + side, 0), dtype=float) for side in ('hot', 'cold')]
+    shape = np.broadcast(*[np.asarray(columns[name]) for name in STREAM_COLUMNS], *mixer_fractions, np.asarray(columns.get('mixer_type_hot', 'none')), np.asarray(columns.get('mixer_type_cold', 'none'))).shape
+    codes = stream_codes(columns, shape)
+    coefficients = []
+    for side, mixer_fraction in zip(('hot', 'cold'), mixer_fractions):
+        mixer_type = mixer_type_codes_or_unknown(columns.get('mixer_type_' + side, 'none'), shape)
+        codes[mixer_type < 0] |= UNKNOWN_MIXER_TYPE
+        bypass = mixer_type == BYPASS
+        admixer = mixer_type == ADMIXER
+        codes[(bypass | admixer) & ~np.isfinite(mixer_fraction)] |= NON_FINITE_INPUT
+        codes[(bypass & ((mixer_fraction < 0) | (mixer_fraction >= 1))) | (admixer & (mixer_fraction < 0))] |= MIXER_FRACTION_OUT_OF_RANGE
+        # g and k of HeatExchangerBatch.mixer_coefficients
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = 1 / (np.asarray(columns['heat_capacity_flow_' + side + '_stream'], dtype=float) * np.where(bypass, 1 - mixer_fraction, np.where(admixer, 1 + mixer_fraction, 1)))
+            coefficients.append((np.where(admixer, mixer_fraction * k, 0), k))
+    (g_h, k_h), (g_c, k_c) = coefficients
+    temperature_difference = np.asarray(columns['inlet_temperature_hot_stream'], dtype=float) - np.asarray(columns['inlet_temperature_cold_stream'], dtype=float)
+    heat_load = np.asarray(columns['heat_load'], dtype=float)
+    with np.errstate(invalid='ignore'):
+        codes[(temperature_difference - heat_load * (g_h + k_h + g_c) <= 0) | (temperature_difference - heat_load * (g_h + g_c + k_c) <= 0)] |= TEMPERATURE_CROSS
+    return codes
+
+
+def screen_reverse(columns):
+    """Screens the columns of HeatExchangerReverseBatch.from_columns for rows the mixer calculation cannot handle, without calculating the Lambert W-function
+
+    The mixer calculation starts from one of the temperature differences dT of the streams without mixer; the Lambert W-function gets the argument -x * exp(-x) with x = dT / LMTD and LMTD = Q / (U * A). As the side of the mixer is only known after the area calculation, the argument of both temperature differences needs to be within -1/e...0.
+
+    Args:
+        columns (dict or mapping): Column name -> array or scalar
+
+    Returns:
+        array: Bitwise OR of the SCREENING_CODES of every row (uint16), 0 for feasible rows
+    """
+    existent_area = np.asarray(columns['existent_area'], dtype=float)
+    shape = np.broadcast(*[np.asarray(columns[name]) for name in STREAM_COLUMNS], existent_area).shape
+    codes = stream_codes(columns, shape)
+    codes[np.broadcast_to(~np.isfinite(existent_area), shape)] |= NON_FINITE_INPUT
+    codes[np.broadcast_to(existent_area <= 0, shape)] |= NON_POSITIVE_AREA
+    m = HeatExchangerReverseBatch.from_columns(columns)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        temperature_difference_1 = m.outlet_temperature_hot_stream - m.inlet_temperature_cold_stream
+        temperature_difference_2 = m.inlet_temperature_hot_stream - m.outlet_temperature_cold_stream
+        codes[np.broadcast_to((temperature_difference_1 <= 0) | (temperature_difference_2 <= 0), shape)] |= TEMPERATURE_CROSS
+        logarithmic_mean_temperature_difference = m.logarithmic_mean_temperature_difference
+        for temperature_difference in (temperature_difference_1, temperature_difference_2):
+            x = temperature_difference / logarithmic_mean_temperature_difference
+            z = -x * np.exp(-x)
+            codes[np.broadcast_to(~((z > BRANCH_POINT - BRANCH_POINT_TOLERANCE) & (z < 0)), shape)] |= LAMBERT_W_OUT_OF_DOMAIN
+    return codes
+
+
+def code_names(code):
+    """Names of the SCREENING_CODES set in the code of one row"""
+    return [name for name, bit in SCREENING_CODES.items() if code & bit]
+
+
+def code_counts(codes):
+    """Number of rows per screening code
+
+    Returns:
+        dict: feasible (rows without code) and SCREENING_CODES name -> number of rows with this code
+    """
+    codes = np.asarray(codes)
+    counts = dict(feasible=int(np.count_nonzero(codes == 0)))
+    for name, bit in SCREENING_CODES.items():
+        counts[name] = int(np.count_nonzero(codes & bit))
+    return counts
+
+
+def feasible_columns(columns, feasible):
+    """Rows of the feasible mask of all array columns; scalar columns are kept"""
+    return {name: np.broadcast_to(value, feasible.shape)[feasible] if np.ndim(value) else value for name, value in columns.items()}
+
+
+def screened_area(columns):
+    """Areas of HeatExchangerBatch.from_columns, calculated only for the rows passing screen_area
+
+    Returns:
+        tuple: Areas (m2, NaN for screened out rows) and screening codes of every row
+    """
+    codes = screen_area(columns)
+    feasible = codes == 0
+    area = np.full(codes.shape, np.nan)
+    if np.any(feasible):
+        area[feasible] = HeatExchangerBatch.from_columns(feasible_columns(columns, feasible)).area
+    return area, codes
+
+
+def screened_reverse(columns, mixer_side='none'):
+    """Mixer calculation of HeatExchangerReverseBatch.from_columns (see heat_exchanger_temperature_calculation), only for the rows passing screen_reverse
+
+    Args:
+        columns (dict or mapping): Column name -> array or scalar
+        mixer_side (str or array, optional): Side of the mixer for all rows or per row. Defaults to 'none'.
+
+    Returns:
+        tuple: Outputs (dict mixer_type, admixer_fraction, bypass_fraction and the four heat exchanger temperatures -> array; mixer type -1 and NaN for screened out rows) and screening codes of every row
+    """
+    codes = screen_reverse(columns)
+    feasible = codes == 0
+    outputs = dict(mixer_type=np.full(codes.shape, -1, dtype=np.int8))
+    for name in ('admixer_fraction', 'bypass_fraction', 'heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream', 'heat_exchanger_outlet_temperature_cold_stream'):
+        outputs[name] = np.full(codes.shape, np.nan)
+    if np.any(feasible):
+        m = HeatExchangerReverseBatch.from_columns(feasible_columns(columns, feasible))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m.heat_exchanger_temperature_calculation(mixer_side=np.broadcast_to(mixer_side, feasible.shape)[feasible] if np.ndim(mixer_side) else mixer_side)
+        outputs['mixer_type'][feasible] = np.broadcast_to(m.mixer_type, (np.count_nonzero(feasible),))
+        for name in list(outputs)[1:]:
+            outputs[name][feasible] = getattr(m, name)
+    return outputs, codes
@@ -0,0 +1,309 @@
+import argparse
+import asyncio
+import collections
+import json
+import sys
+import time
+
+import numpy as np
+
+from heat_exchanger_batch import NONE, HeatExchangerBatch, mixer_type_names
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+from workspace import AREA_COLUMNS, REVERSE_COLUMNS
+
+MIXER_COLUMNS = ('mixer_type_hot', 'mixer_type_cold', 'mixer_fraction_hot', 'mixer_fraction_cold')
+AREA_OUTPUT_COLUMNS = ('area', 'outlet_temperature_hot_stream', 'outlet_temperature_cold_stream', 'logarithmic_temperature_difference')
+MAXIMUM_BATCH_SIZE = 1024
+LATENCY = 0.002
+
+
+def area_outputs(columns):
+    """Areas and outlet temperatures of HeatExchangerBatch for the columns of one group of requests"""
+    m = HeatExchangerBatch.from_columns(columns)
+    return {name: getattr(m, name) for name in AREA_OUTPUT_COLUMNS}
+
+
+def reverse_outputs(columns, mixer_side):
+    """Mixer types, mixer fractions and heat exchanger temperatures of HeatExchangerReverseBatch for the columns of one group of requests, feasible is False for temperature crosses and rows without finite mixer fraction or temperatures"""
+    m = HeatExchangerReverseBatch.from_columns(columns)
+    m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+    mixer_type = np.broadcast_to(m.mixer_type, m.heat_exchanger_inlet_temperature_hot_stream.shape)
+    outputs = dict(mixer_type=mixer_type_names(mixer_type), admixer_fraction=m.admixer_fraction, bypass_fraction=m.bypass_fraction)
+    temperatures = {name: getattr(m, name) for name in ('heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream', 'heat_exchanger_outlet_temperature_cold_stream')}
+    outputs.update(temperatures)
+    fraction = np.where(np.isnan(m.admixer_fraction), m.bypass_fraction, m.admixer_fraction)
+    feasible = (m.outlet_temperature_hot_stream > m.inlet_temperature_cold_stream) & (m.inlet_temperature_hot_stream > m.outlet_temperature_cold_stream) & ((mixer_type == NONE) | np.isfinite(fraction))
+    for values in temperatures.values():
+        feasible &= np.isfinite(values)
+    outputs['feasible'] = feasible
+    return outputs
+
+
+def evaluate_group(requests, calculation, mixer_side, lmtd_mode):
+    """Evaluates requests of the same calculation, mixer side and LMTD mode as one batch
+
+    Returns:
+        list: Result (dict output name -> value, None for NaN) per request
+    """
+    if calculation == 'area':
+        names = AREA_COLUMNS + tuple(name for name in MIXER_COLUMNS if any(name in request for request in requests))
+        defaults = dict(mixer_type_hot='none', mixer_type_cold='none', mixer_fraction_hot=0, mixer_fraction_cold=0)
+    elif calculation == 'reverse':
+        names = REVERSE_COLUMNS
+        defaults = {}
+    else:
+        raise Exception("Sorry, the calculation needs to be area or reverse")
+    columns = {name: np.asarray([request.get(name, defaults[name]) if name in defaults else request[name] for request in requests], dtype=None if name.startswith('mixer_type') else float) for name in names}
+    columns['lmtd_mode'] = lmtd_mode
+    with np.errstate(divide='ignore', invalid='ignore'):
+        outputs = area_outputs(columns) if calculation == 'area' else reverse_outputs(columns, mixer_side)
+    output_columns = {name: np.broadcast_to(values, (len(requests),)).tolist() for name, values in outputs.items()}
+    # NaN is no valid JSON, like the scalar classes missing values are None
+    return [{name: None if isinstance(values[index], float) and values[index] != values[index] else values[index] for name, values in output_columns.items()} for index in range(len(requests))]
+
+
+def evaluate_requests(requests):
+    """Evaluates a batch of single requests with the vectorized classes, one batch per calculation, mixer side and LMTD mode
+
+    If a group fails, e.g. because of a misspelled mixer type, its requests are evaluated one by one so only the faulty requests get an error.
+
+    Args:
+        requests (list): Requests (dict) with calculation (area or reverse, default area), the columns of HeatExchangerBatch.from_columns or HeatExchangerReverseBatch.from_columns and optionally mixer_side and lmtd_mode
+
+    Returns:
+        list: Response per request: dict with id and result, or id and error
+    """
+    responses = [None] * len(requests)
+    groups = collections.defaultdict(list)
+    for index, request in enumerate(requests):
+        groups[request.get('calculation', 'area'), request.get('mixer_side', 'none'), request.get('lmtd_mode', 'exact')].append(index)
+    for key, indices in groups.items():
+        try:
+            results = evaluate_group([requests[index] for index in indices], *key)
+        except Exception as error:
+            if len(indices) > 1:
+                for index in indices:
+                    responses[index] = evaluate_requests([requests[index]])[0]
+            else:
+                responses[indices[0]] = dict(id=requests[indices[0]].get('id'), error='{}: {}'.format(type(error).__name__, error))
+            continue
+        for index, result in zip(indices, results):
+            responses[index] = dict(id=requests[index].get('id'), result=result)
+    return responses
+
+
+class MicroBatcher:
+    """Class for grouping single requests arriving within a short time into one vectorized evaluation
+
+        The first request of a batch waits at most latency seconds for more requests; the batch is evaluated as soon as it has maximum_batch_size requests or the latency has passed. The evaluation runs in a worker thread, so the event loop keeps accepting requests, which queue up for the next batch while a batch is evaluated.
+
+        Arguments:
+            evaluate {function} -- List of requests -> list of responses, e.g. evaluate_requests
+            maximum_batch_size {int} -- Largest number of requests per batch
+            latency {float} -- Longest wait (s) of the first request of a batch for more requests
+            executor {Executor} -- Executor of the evaluation, None for the default thread pool of the event loop
+        Properties:
+            metrics {dict} -- Current queue depth and counters, see metrics
+        """
+
+    def __init__(self, evaluate=evaluate_requests, maximum_batch_size=MAXIMUM_BATCH_SIZE, latency=LATENCY, executor=None):
+        if maximum_batch_size < 1 or latency < 0:
+            raise Exception("Sorry, the batch size needs to be positive and the latency must not be negative")
+        self.evaluate = evaluate
+        self.maximum_batch_size = maximum_batch_size
+        self.latency = latency
+        self.executor = executor
+        self.queue = None
+        self._task = None
+        self._filled = None
+        self._missing = maximum_batch_size
+        self.requests = 0
+        self.batches = 0
+        self.maximum_queue_depth = 0
+        self.evaluation_seconds = 0.0
+        self.batch_sizes = collections.Counter()
+
+    async def start(self):
+        """Starts collecting batches in the running event loop"""
+        if self._task is None:
+            self.queue = asyncio.Queue()
+            self._filled = asyncio.Event()
+            self._task = asyncio.ensure_future(self._collect())
+
+    async def stop(self):
+        """Stops collecting batches; waiting requests are cancelled"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            while not self.queue.empty():
+                self.queue.get_nowait()[1].cancel()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exception):
+        await self.stop()
+
+    async def submit(self, request):
+        """Queues a single request and waits for its response"""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((request, future))
+        self.maximum_queue_depth = max(self.maximum_queue_depth, self.queue.qsize())
+        if self.queue.qsize() >= self._missing:
+            self._filled.set()
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.latency
+            while True:
+                while len(batch) < self.maximum_batch_size and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                timeout = deadline - loop.time()
+                if len(batch) == self.maximum_batch_size or timeout <= 0:
+                    break
+                # submit wakes the collector as soon as the batch can be filled
+                self._missing = self.maximum_batch_size - len(batch)
+                self._filled.clear()
+                try:
+                    await asyncio.wait_for(self._filled.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            batch = [(request, future) for request, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                responses = await loop.run_in_executor(self.executor, self.evaluate, [request for request, _ in batch])
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            finally:
+                self.evaluation_seconds += time.perf_counter() - start
+                self.requests += len(batch)
+                self.batches += 1
+                self.batch_sizes[len(batch)] += 1
+            for (_, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+
+    @property
+    def metrics(self):
+        """Queue depth and batch statistics
+
+        Returns:
+            dict: queue_depth (waiting requests), maximum_queue_depth, requests and batches (evaluated), mean_batch_size, largest_batch_size, batch_sizes (batch size -> number of batches) and evaluation_seconds (cumulative time of the evaluations)
+        """
+        return dict(
+            queue_depth=self.queue.qsize() if self.queue is not None else 0,
+            maximum_queue_depth=self.maximum_queue_depth,
+            requests=self.requests,
+            batches=self.batches,
+            mean_batch_size=self.requests / self.batches if self.batches else 0.0,
+            largest_batch_size=max(self.batch_sizes, default=0),
+            batch_sizes={str(size): count for size, count in sorted(self.batch_sizes.items())},
+            evaluation_seconds=self.evaluation_seconds)
+
+
+async def handle_connection(batcher, reader, writer):
+    """Answers the JSON lines of one connection; every line is a request and gets one response line with the id of the request, in the order of completion
+
+    A request with calculation metrics is answered at once with the metrics of the batcher. If the evaluation of a batch raises, its requests get an error response and the connection stays open.
+    At most maximum_batch_size requests of the connection are in flight and every response waits until the transport buffer has drained, so a client that sends faster than it reads is slowed down instead of filling the memory of the server.
+    """
+    pending = set()
+    in_flight = asyncio.Semaphore(batcher.maximum_batch_size)
+    writing = asyncio.Lock()
+
+    async def answer(line):
+        try:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Sorry, a request needs to be a JSON object")
+            except ValueError as error:
+                response = dict(id=None, error=str(error))
+            else:
+                if request.get('calculation') == 'metrics':
+                    response = dict(id=request.get('id'), result=batcher.metrics)
+                else:
+                    try:
+                        response = await batcher.submit(request)
+                    except Exception as error:
+                        # A failed batch only fails its requests, the connection keeps serving
+                        response = dict(id=request.get('id'), error='{}: {}'.format(type(error).__name__, error))
+            async with writing:
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        finally:
+            in_flight.release()
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                # No more lines are read while the connection has the maximum number of requests in flight
+                await in_flight.acquire()
+                task = asyncio.ensure_future(answer(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+    except ConnectionError:
+        pass
+    finally:
+        for task in pending:
+            task.cancel()
+        writer.close()
+
+
+async def start_server(batcher, host='127.0.0.1', port=8765, path=None):
+    """Starts the JSON lines server on a TCP port or, if path is given, on a Unix socket
+
+    Returns:
+        Server: asyncio server
+    """
+    await batcher.start()
+
+    def connection(reader, writer):
+        return handle_connection(batcher, reader, writer)
+    if path is not None:
+        return await asyncio.start_unix_server(connection, path)
+    return await asyncio.start_server(connection, host, port)
+
+
+async def serve(host='127.0.0.1', port=8765, path=None, maximum_batch_size=MAXIMUM_BATCH_SIZE, latency=LATENCY):
+    async with MicroBatcher(maximum_batch_size=maximum_batch_size, latency=latency) as batcher:
+        server = await start_server(batcher, host, port, path)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calculation service: JSON lines requests of single heat exchangers evaluated in micro-batches')
+    parser.add_argument('--host', default='127.0.0.1', help='host of the TCP server (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=8765, help='port of the TCP server (default: %(default)s)')
+    parser.add_argument('--unix', help='path of a Unix socket instead of the TCP server')
+    parser.add_argument('--maximum-batch-size', type=int, default=MAXIMUM_BATCH_SIZE, help='largest number of requests per batch (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=LATENCY, help='longest wait (s) of a request for more requests (default: %(default)s)')
+    arguments = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, arguments.unix, arguments.maximum_batch_size, arguments.latency))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
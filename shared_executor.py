@@ -0,0 +1,278 @@
+import concurrent.futures
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from heat_exchanger_batch import mixer_type_codes
+from workspace import AREA_COLUMNS, REVERSE_COLUMNS, REVERSE_OUTPUTS, Workspace, area_into, number_of_rows, reverse_into
+
+CHUNK_SIZE = 65536
+
+# Next chunk index shared by all workers of an executor, set by initialize
+counter = None
+# Workspace of the worker process, reused by all chunks
+worker_workspace = None
+
+
+class SharedArrays:
+    """Class for NumPy arrays in multiprocessing.shared_memory blocks, which worker processes map without copying or pickling
+
+        Columns created here (or copied in once with put) are passed to the SharedMemoryExecutor by name of their block only. The blocks are released with close or at the end of a with statement; arrays of the blocks must not be used afterwards.
+
+        Properties:
+            nbytes {int} -- Memory of all blocks (bytes)
+        """
+
+    def __init__(self):
+        self._blocks = []
+        self._arrays = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+    def create(self, shape, dtype=float):
+        """New uninitialized array in its own shared memory block"""
+        shape = tuple(np.atleast_1d(shape))
+        dtype = np.dtype(dtype)
+        block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self._blocks.append(block)
+        array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        self._arrays[id(array)] = (array, (block.name, shape, dtype.str))
+        return array
+
+    def put(self, values):
+        """Copy of the values in a new shared array"""
+        values = np.asarray(values)
+        array = self.create(values.shape, values.dtype)
+        array[...] = values
+        return array
+
+    def descriptor(self, array):
+        """Block name, shape and dtype of an array created by this instance, None for other arrays"""
+        entry = self._arrays.get(id(array))
+        return entry[1] if entry is not None and entry[0] is array else None
+
+    @property
+    def nbytes(self):
+        return sum(block.size for block in self._blocks)
+
+    def close(self):
+        """Releases all blocks"""
+        self._arrays.clear()
+        release(self._blocks)
+        for block in self._blocks:
+            block.unlink()
+        self._blocks = []
+
+
+def release(blocks):
+    """Closes the mappings of the blocks; a mapping still used by an array is closed when the last array is gone"""
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            pass
+
+
+def attach(descriptors):
+    """Maps the shared arrays of the descriptors (name -> block name, shape, dtype)
+
+    Returns:
+        tuple: Arrays (dict name -> array) and the blocks, to be closed after all arrays are released
+    """
+    arrays, blocks = {}, []
+    for name, (block_name, shape, dtype) in descriptors.items():
+        # Only the creating process unlinks the block
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return arrays, blocks
+
+
+def initialize(shared_counter):
+    global counter
+    counter = shared_counter
+
+
+def process_chunks(calculation, inputs, scalars, outputs, rows, chunk_size, mixer_side='none'):
+    """Worker loop: takes the next chunk index from the shared counter until all rows are done and calculates the chunk in place into the shared outputs
+
+    Chunks are not assigned in advance, so a worker that is done with a cheap chunk takes the next one and chunks of uneven cost balance out across the workers.
+
+    Args:
+        calculation (str): area (area_into) or reverse (reverse_into)
+        inputs (dict): Column name -> descriptor of the shared input array
+        scalars (dict): Column name -> value for columns of all rows
+        outputs (dict): Output name -> descriptor of the shared output array
+        rows (int): Number of rows
+        chunk_size (int): Number of rows per chunk
+        mixer_side (str, optional): Side of the mixer for reverse, None for the shared input column mixer_side. Defaults to 'none'.
+
+    Returns:
+        dict: Status of the worker: pid, chunks, rows and seconds (busy time)
+    """
+    global worker_workspace
+    if worker_workspace is None or worker_workspace.size < chunk_size:
+        worker_workspace = Workspace(chunk_size)
+    status = dict(pid=os.getpid(), chunks=0, rows=0, seconds=0.0)
+    input_arrays, input_blocks = attach(inputs)
+    output_arrays, output_blocks = attach(outputs)
+    chunk = None
+    try:
+        start_time = time.perf_counter()
+        while True:
+            with counter.get_lock():
+                index = counter.value
+                counter.value += 1
+            start = index * chunk_size
+            if start >= rows:
+                break
+            stop = min(start + chunk_size, rows)
+            chunk = dict(scalars)
+            chunk.update((name, array[start:stop]) for name, array in input_arrays.items())
+            if calculation == 'area':
+                area_into(chunk, worker_workspace, output_arrays['area'][start:stop])
+            else:
+                reverse_into(chunk, worker_workspace, chunk.pop('mixer_side', mixer_side), {name: array[start:stop] for name, array in output_arrays.items()})
+            status['chunks'] += 1
+            status['rows'] += stop - start
+        status['seconds'] = time.perf_counter() - start_time
+    finally:
+        del chunk, input_arrays, output_arrays
+        release(input_blocks + output_blocks)
+    return status
+
+
+class SharedMemoryExecutor:
+    """Class for calculating very large batches of heat exchangers on all cores without copying the columns to the workers
+
+        Input and output columns live in shared memory blocks (see SharedArrays) mapped by every worker process; the workers take chunks of rows from a shared counter, calculate them in place with the functions of workspace.py and return nothing but a status.
+        Columns that are not arrays of the SharedArrays passed to area or reverse are copied to temporary shared memory blocks, mixer type names are converted to int8 codes.
+
+        Arguments:
+            processes {int} -- Number of worker processes, 1 calculates in the calling process
+            chunk_size {int} -- Number of rows per chunk
+        Properties:
+            statuses {list} -- Status (dict pid, chunks, rows, seconds) of every worker of the last calculation
+        """
+
+    def __init__(self, processes=None, chunk_size=CHUNK_SIZE):
+        self.processes = processes or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.statuses = []
+        self._counter = multiprocessing.Value('q', 0)
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.shutdown()
+
+    def shutdown(self):
+        """Stops the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def run(self, calculation, inputs, scalars, outputs, rows, mixer_side='none'):
+        """Calculates all chunks with the worker processes, see process_chunks
+
+        Returns:
+            list: Status of every worker
+        """
+        with self._counter.get_lock():
+            self._counter.value = 0
+        arguments = (calculation, inputs, scalars, outputs, rows, self.chunk_size, mixer_side)
+        if self.processes == 1:
+            initialize(self._counter)
+            self.statuses = [process_chunks(*arguments)]
+        else:
+            if self._pool is None:
+                self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.processes, initializer=initialize, initargs=(self._counter,))
+            futures = [self._pool.submit(process_chunks, *arguments) for _ in range(self.processes)]
+            self.statuses = [future.result() for future in futures]
+        return self.statuses
+
+    def share_columns(self, columns, shared, temporary):
+        """Splits the columns into descriptors of shared arrays and scalars; arrays not owned by shared are copied to temporary
+
+        Returns:
+            tuple: Column name -> descriptor (see SharedArrays.descriptor) and column name -> scalar
+        """
+        inputs, scalars = {}, {}
+        for name, value in columns.items():
+            if isinstance(value, str) or np.ndim(value) == 0:
+                scalars[name] = value
+                continue
+            descriptor = shared.descriptor(value) if shared is not None else None
+            if descriptor is None:
+                if name.startswith('mixer_type'):
+                    value = mixer_type_codes(value)
+                descriptor = temporary.descriptor(temporary.put(value))
+            inputs[name] = descriptor
+        return inputs, scalars
+
+    def area(self, columns, shared=None, out=None):
+        """Areas of HeatExchangerBatch.from_columns, see workspace.area_into
+
+        Args:
+            columns (dict): One-dimensional columns or scalars named like in HeatExchangerBatch.from_columns
+            shared (SharedArrays, optional): Owner of shared input columns and out. Defaults to None.
+            out (array, optional): Array for the areas, written by the workers if it is a shared array. Defaults to None (new array).
+
+        Returns:
+            array: Areas (m2)
+        """
+        rows = number_of_rows(columns, AREA_COLUMNS)
+        with SharedArrays() as temporary:
+            inputs, scalars = self.share_columns(columns, shared, temporary)
+            descriptor = shared.descriptor(out) if shared is not None and out is not None else None
+            area = None if descriptor else temporary.create(rows)
+            self.run('area', inputs, scalars, dict(area=descriptor or temporary.descriptor(area)), rows)
+            if descriptor:
+                return out
+            if out is None:
+                return area.copy()
+            out[...] = area
+            return out
+
+    def reverse(self, columns, mixer_side='none', shared=None, out=None):
+        """Mixer types, mixer fractions and heat exchanger temperatures of HeatExchangerReverseBatch.from_columns, see workspace.reverse_into
+
+        Args:
+            columns (dict): One-dimensional columns or scalars named like in HeatExchangerReverseBatch.from_columns
+            mixer_side (str or array, optional): Side of the mixer for all rows or per row. Defaults to 'none'.
+            shared (SharedArrays, optional): Owner of shared input columns and outputs. Defaults to None.
+            out (dict, optional): Output name (see REVERSE_OUTPUTS) -> array for the results, written by the workers if it is a shared array. Defaults to None (new arrays).
+
+        Returns:
+            dict: Output name -> array
+        """
+        rows = number_of_rows(columns, REVERSE_COLUMNS)
+        out = dict(out or {})
+        if not isinstance(mixer_side, str):
+            # Per row mixer sides are a shared input column
+            columns = dict(columns, mixer_side=np.broadcast_to(mixer_side, (rows,)))
+        with SharedArrays() as temporary:
+            inputs, scalars = self.share_columns(columns, shared, temporary)
+            outputs, temporary_outputs = {}, {}
+            for name, dtype in REVERSE_OUTPUTS:
+                descriptor = shared.descriptor(out.get(name)) if shared is not None else None
+                if descriptor is None:
+                    temporary_outputs[name] = temporary.create(rows, dtype)
+                    descriptor = temporary.descriptor(temporary_outputs[name])
+                outputs[name] = descriptor
+            self.run('reverse', inputs, scalars, outputs, rows, mixer_side if isinstance(mixer_side, str) else None)
+            for name, array in temporary_outputs.items():
+                if name in out:
+                    out[name][...] = array
+                else:
+                    out[name] = array.copy()
+            return out
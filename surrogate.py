@@ -0,0 +1,158 @@
+import math
+
+import numpy as np
+
+from heat_exchanger_fast import HeatExchangerReverseFast
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+from lambert_w import lambert_w_minus_one, real_lambert_w_minus_one
+
+ENVELOPE_COLUMNS = ('inlet_temperature_hot_stream', 'inlet_temperature_cold_stream', 'film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream', 'heat_capacity_flow_hot_stream', 'heat_capacity_flow_cold_stream', 'heat_load', 'existent_area')
+
+
+def exact_temperature_difference_ratio(dT_LMTD):
+    """Ratio beta of the unknown to the known temperature difference of the reverse calculation and its derivative dbeta/dln(dT_LMTD)
+
+    beta = -W_-1(-x * exp(-x)) / x with x = dT_LMTD, the ratio of the known to the logarithmic mean temperature difference; at x = 1 beta = 1 with derivative -2.
+
+    Returns:
+        tuple: beta and dbeta/dln(x) (arrays)
+    """
+    x = np.asarray(dT_LMTD, dtype=float)
+    w = real_lambert_w_minus_one(-x * np.exp(-x))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # dW/dz = W / (z * (1 + W)) gives dbeta/dx = W / x^2 * (W + x) / (1 + W)
+        return np.where(x == 1, 1.0, -w / x), np.where(x == 1, -2.0, w / x * (w + x) / (1 + w))
+
+
+def minimum_temperature_difference_ratio(envelope):
+    """Smallest ratio of the known to the logarithmic mean temperature difference in the envelope
+
+    dT_LMTD = U * A * (Ti_h - Ti_c - Q / C) / Q for both known temperature differences grows with U, A, Ti_h, C and falls with Ti_c and Q, so the minimum lies at a corner of the envelope.
+    """
+    overall_heat_transfer_coefficient = 1 / (1 / envelope['film_heat_transfer_coefficient_hot_stream'][0] + 1 / envelope['film_heat_transfer_coefficient_cold_stream'][0])
+    heat_capacity_flow = min(envelope['heat_capacity_flow_hot_stream'][0], envelope['heat_capacity_flow_cold_stream'][0])
+    heat_load = envelope['heat_load'][1]
+    known_temperature_difference = envelope['inlet_temperature_hot_stream'][0] - envelope['inlet_temperature_cold_stream'][1] - heat_load / heat_capacity_flow
+    if not known_temperature_difference > 0:
+        raise Exception("Sorry, the envelope includes temperature crosses")
+    return overall_heat_transfer_coefficient * envelope['existent_area'][0] * known_temperature_difference / heat_load
+
+
+class TemperatureDifferenceRatioSurrogate:
+    """Class for precomputed interpolation of the reverse heat exchanger calculation within an envelope of operating cases
+
+        The reverse calculation reduces exactly to one dimensionless function: the ratio beta of the unknown to the known temperature difference only depends on the ratio dT_LMTD of the known to the logarithmic mean temperature difference (see exact_temperature_difference_ratio); all temperatures and mixer fractions follow from beta in closed form.
+        beta is tabulated with its derivative on a regular grid of ln(dT_LMTD) between the smallest ratio of the envelope and 1 and interpolated with cubic Hermite polynomials.
+        Ratios outside the table fall back to the Lambert W-function.
+
+        Arguments:
+            minimum_ratio {float} -- Smallest tabulated dT_LMTD, 0...1
+            points {int} -- Number of grid points
+        Properties:
+            maximum_error {float} -- Largest relative error of beta at three points within every grid interval
+        """
+
+    def __init__(self, minimum_ratio, points):
+        self.minimum_ratio = minimum_ratio
+        self.points = points
+        self.lower = math.log(minimum_ratio)
+        self.step = -self.lower / (points - 1)
+        ratio = np.exp(np.linspace(self.lower, 0, points))
+        ratio[-1] = 1
+        self.beta, self.derivative = exact_temperature_difference_ratio(ratio)
+        # Python lists for the scalar interpolation, indexing NumPy arrays with Python scalars is slow
+        self._beta, self._derivative = self.beta.tolist(), self.derivative.tolist()
+        positions = (np.arange(points - 1)[:, np.newaxis] + np.array([0.25, 0.5, 0.75])).ravel()
+        ratio = np.exp(self.lower + positions * self.step)
+        self.maximum_error = float(np.max(np.abs(self.temperature_difference_ratio(ratio) / exact_temperature_difference_ratio(ratio)[0] - 1)))
+
+    @classmethod
+    def build(cls, envelope, tolerance=1e-9, points=65, maximum_points=2**16 + 1):
+        """Tabulates beta for all cases of the envelope, doubling the grid resolution until the tolerance is met
+
+        Args:
+            envelope (dict): Column name (see ENVELOPE_COLUMNS) -> (minimum, maximum), or a value for fixed columns
+            tolerance (float, optional): Maximum relative error of beta. Defaults to 1e-9.
+            points (int, optional): Grid points to start with. Defaults to 65.
+            maximum_points (int, optional): Largest number of grid points. Defaults to 65537.
+
+        Returns:
+            TemperatureDifferenceRatioSurrogate: The validated surrogate
+        """
+        envelope = {name: tuple(float(value) for value in np.broadcast_to(np.asarray(envelope[name], dtype=float), (2,))) for name in ENVELOPE_COLUMNS}
+        minimum_ratio = minimum_temperature_difference_ratio(envelope)
+        if not minimum_ratio < 1:
+            # All ratios of the envelope are above 1, where W_-1 only has the trivial solution
+            minimum_ratio = 0.5
+        while True:
+            surrogate = cls(minimum_ratio, points)
+            if surrogate.maximum_error <= tolerance:
+                return surrogate
+            points = 2 * points - 1
+            if points > maximum_points:
+                raise Exception("Sorry, the surrogate does not reach the tolerance with the maximum number of grid points")
+
+    def temperature_difference_ratio(self, dT_LMTD):
+        """Interpolated beta for an array of ratios dT_LMTD, exact outside the table"""
+        dT_LMTD = np.asarray(dT_LMTD, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position = (np.log(dT_LMTD) - self.lower) / self.step
+        inside = (position >= 0) & (position <= self.points - 1)
+        index = np.clip(np.floor(np.where(inside, position, 0)), 0, self.points - 2).astype(np.intp)
+        s = position - index
+        t = 1 - s
+        beta = (1 + 2 * s) * t * t * self.beta[index] + s * s * (3 - 2 * s) * self.beta[index + 1] + self.step * s * t * (t * self.derivative[index] - s * self.derivative[index + 1])
+        if not inside.all():
+            beta = np.where(inside, beta, np.nan)
+            beta[~inside] = exact_temperature_difference_ratio(dT_LMTD[~inside])[0]
+        return beta
+
+    def scalar_temperature_difference_ratio(self, dT_LMTD):
+        """Interpolated beta for one ratio dT_LMTD with Python floats, exact outside the table"""
+        if dT_LMTD > 0:
+            position = (math.log(dT_LMTD) - self.lower) / self.step
+            if 0 <= position <= self.points - 1:
+                index = int(position)
+                if index == self.points - 1:
+                    index -= 1
+                s = position - index
+                t = 1 - s
+                return (1 + 2 * s) * t * t * self._beta[index] + s * s * (3 - 2 * s) * self._beta[index + 1] + self.step * s * t * (t * self._derivative[index] - s * self._derivative[index + 1])
+        return - lambert_w_minus_one(-dT_LMTD * math.exp(-dT_LMTD)) / dT_LMTD
+
+
+class HeatExchangerReverseSurrogateBatch(HeatExchangerReverseBatch):
+    """HeatExchangerReverseBatch with beta interpolated by a TemperatureDifferenceRatioSurrogate instead of the Lambert W-function
+
+        Arguments:
+            surrogate {TemperatureDifferenceRatioSurrogate} -- Surrogate of the envelope
+            all arguments of HeatExchangerReverseBatch
+        """
+
+    def __init__(self, surrogate, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area, lmtd_mode='exact'):
+        super().__init__(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area, lmtd_mode)
+        self.surrogate = surrogate
+
+    def temperature_difference_ratio(self, dT_LMTD):
+        return self.surrogate.temperature_difference_ratio(dT_LMTD)
+
+
+class HeatExchangerReverseSurrogateFast(HeatExchangerReverseFast):
+    """HeatExchangerReverseFast with beta interpolated by a TemperatureDifferenceRatioSurrogate instead of the Lambert W-function
+
+        Arguments:
+            surrogate {TemperatureDifferenceRatioSurrogate} -- Surrogate of the envelope
+            all arguments of HeatExchangerReverseFast
+        """
+
+    __slots__ = ('surrogate',)
+
+    def __init__(self, surrogate, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area):
+        super().__init__(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area)
+        self.surrogate = surrogate
+
+    def unknown_temperature_difference(self, known_temperature_difference):
+        logarithmic_mean_temperature_difference = self.logarithmic_mean_temperature_difference
+        if known_temperature_difference == logarithmic_mean_temperature_difference:
+            return known_temperature_difference
+        return self.surrogate.scalar_temperature_difference_ratio(known_temperature_difference / logarithmic_mean_temperature_difference) * known_temperature_difference
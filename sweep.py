@@ -0,0 +1,129 @@
+import collections
+import concurrent.futures
+import functools
+import os
+
+import numpy as np
+
+from heat_exchanger_batch import ADMIXER, BYPASS, HeatExchangerBatch
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+
+SweepResult = collections.namedtuple('SweepResult', ['axes', 'values'])
+SweepResult.__doc__ = """Labelled result of a sweep: axes maps every axis name to its values in order, values has one dimension per axis"""
+MIXER_DTYPE = np.dtype([('mixer_type', np.int8), ('mixer_fraction', float)])
+
+
+def area_evaluation(columns):
+    """Evaluation of a sweep returning the areas of HeatExchangerBatch"""
+    return HeatExchangerBatch.from_columns(columns).area
+
+
+def mixer_fraction_evaluation(columns, mixer_side='none'):
+    """Evaluation of a sweep returning records (MIXER_DTYPE) of the mixer type codes and the admixer or bypass fractions of HeatExchangerReverseBatch, NaN fractions for rows without mixer"""
+    m = HeatExchangerReverseBatch.from_columns(columns)
+    m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+    mixer_type = np.broadcast_to(m.mixer_type, m.heat_exchanger_inlet_temperature_hot_stream.shape)
+    records = np.empty(mixer_type.shape, dtype=MIXER_DTYPE)
+    records['mixer_type'] = mixer_type
+    records['mixer_fraction'] = np.select([mixer_type == ADMIXER, mixer_type == BYPASS], [m.admixer_fraction, m.bypass_fraction], np.nan)
+    return records
+
+
+def evaluate_chunk(evaluation, axes, fixed, start, stop):
+    """Evaluates the rows start...stop of the flattened Cartesian product of the axes"""
+    shape = tuple(len(values) for values in axes.values())
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    columns = dict(fixed)
+    for (name, values), index in zip(axes.items(), indices):
+        columns[name] = values[index]
+    return start, np.broadcast_to(evaluation(columns), (stop - start,))
+
+
+def sweep(evaluation, axes, fixed=None, chunk_size=100000, processes=None, progress=None, out=None, dtype=float):
+    """Evaluates a calculation over the Cartesian product of the axes, chunk by chunk across a process pool
+
+    The Cartesian product is never built as a whole: every chunk creates only its own rows from the axis values. At most two chunks per process are in flight, so memory stays bounded by the chunk size and the result array, which can be a memory-mapped file for grids larger than RAM.
+
+    Args:
+        evaluation (callable): Picklable function mapping a dict of columns to one result per row, e.g. area_evaluation
+        axes (dict): Axis name -> 1D values, in the order of the result dimensions
+        fixed (dict, optional): Column name -> value for all inputs that are not swept. Defaults to None.
+        chunk_size (int, optional): Number of rows evaluated per chunk. Defaults to 100000.
+        processes (int, optional): Number of worker processes, 1 evaluates in the calling process. Defaults to None (number of CPUs).
+        progress (callable, optional): Called with (evaluated rows, total rows) after every chunk. Defaults to None.
+        out (array or str, optional): C-contiguous result array with the shape of the grid or path of a .npy file created as memory map. Defaults to None.
+        dtype (dtype, optional): Type of the results of the evaluation for a new result array, e.g. MIXER_DTYPE. Defaults to float.
+
+    Returns:
+        SweepResult: Axes and result values with one dimension per axis
+    """
+    axes = collections.OrderedDict((name, np.asarray(values)) for name, values in axes.items())
+    fixed = dict(fixed or {})
+    shape = tuple(len(values) for values in axes.values())
+    total = int(np.prod(shape))
+    if out is None:
+        out = np.empty(shape, dtype)
+    elif isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=shape)
+    elif not out.flags.c_contiguous:
+        # reshape would silently write the results into a copy
+        raise Exception("Sorry, the result array needs to be C-contiguous")
+    flat = out.reshape(-1)
+    chunks = ((start, min(start + chunk_size, total)) for start in range(0, total, chunk_size))
+    evaluated = 0
+
+    def store(start, values):
+        nonlocal evaluated
+        flat[start:start + len(values)] = values
+        evaluated += len(values)
+        if progress is not None:
+            progress(evaluated, total)
+
+    if processes == 1:
+        for start, stop in chunks:
+            store(*evaluate_chunk(evaluation, axes, fixed, start, stop))
+    else:
+        processes = processes or os.cpu_count()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+            maximum_in_flight = 2 * processes
+            in_flight = set()
+            for start, stop in chunks:
+                in_flight.add(executor.submit(evaluate_chunk, evaluation, axes, fixed, start, stop))
+                if len(in_flight) >= maximum_in_flight:
+                    done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        store(*future.result())
+            for future in concurrent.futures.as_completed(in_flight):
+                store(*future.result())
+    if isinstance(out, np.memmap):
+        out.flush()
+    return SweepResult(axes, out)
+
+
+def heat_exchanger_sweep(axes, fixed, **options):
+    """Sweeps the area of HeatExchanger, e.g. over heat load x mixer fraction x film heat transfer coefficient
+
+    Args:
+        axes (dict): Axis name -> values, with names of the HeatExchanger attributes (e.g. heat_load, mixer_fraction_hot)
+        fixed (dict): Attribute name -> value for all attributes that are not swept
+        options: Keyword arguments of sweep
+
+    Returns:
+        SweepResult: Areas (m2) with one dimension per axis
+    """
+    return sweep(area_evaluation, axes, fixed, **options)
+
+
+def heat_exchanger_reverse_sweep(axes, fixed, mixer_side='none', **options):
+    """Sweeps the mixer type and mixer fraction of HeatExchangerReverse, e.g. over existent area x heat load
+
+    Args:
+        axes (dict): Axis name -> values, with names of the HeatExchangerReverse attributes (e.g. existent_area, heat_load)
+        fixed (dict): Attribute name -> value for all attributes that are not swept
+        mixer_side (str, optional): Side of the mixer, see heat_exchanger_temperature_calculation. Defaults to 'none'.
+        options: Keyword arguments of sweep
+
+    Returns:
+        SweepResult: Records (MIXER_DTYPE) with one dimension per axis: mixer type codes (none = 0, bypass = 1, admixer = 2) and admixer or bypass fractions ((kg/s)/(kg/s)), NaN where no mixer is needed
+    """
+    return sweep(functools.partial(mixer_fraction_evaluation, mixer_side=mixer_side), axes, fixed, dtype=MIXER_DTYPE, **options)
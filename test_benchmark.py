@@ -0,0 +1,64 @@
+import json
+import tracemalloc
+
+from benchmark import MIXERS, batch_benchmarks, compare, heat_exchanger_benchmarks, heat_exchanger_reverse_benchmarks, load, main, run, run_memory, save, workspace_benchmarks
+
+
+def test_benchmark_names():
+    assert len(heat_exchanger_benchmarks()) == len(MIXERS)
+    assert sorted(heat_exchanger_reverse_benchmarks()) == ['heat_exchanger_reverse_admixer_cold', 'heat_exchanger_reverse_admixer_hot', 'heat_exchanger_reverse_bypass_cold', 'heat_exchanger_reverse_bypass_hot']
+
+
+
+def test_batch_benchmarks_allocate_when_selected():
+    tracemalloc.start()
+    try:
+        setups = dict(batch_benchmarks((10**7,)), **workspace_benchmarks((10**7,)))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(setups) == 4
+    assert peak < 10**6
+
+
+def test_run():
+    results = run(batch_rows=(1000,), modules=('lmtd',), select='batch_1000', repeat=1)
+    assert sorted(results) == ['heat_exchanger_batch_1000', 'heat_exchanger_reverse_batch_1000']
+    assert all(seconds > 0 for seconds in results.values())
+    assert list(run(batch_rows=(), modules=('lmtd',), select='import', repeat=1)) == ['import_lmtd']
+    assert sorted(run(batch_rows=(1000,), modules=(), select='workspace', repeat=1)) == ['workspace_area_1000', 'workspace_reverse_1000']
+
+
+def test_run_memory():
+    memory = run_memory(batch_rows=(10000,))
+    assert sorted(memory) == ['heat_exchanger_batch_10000', 'heat_exchanger_reverse_batch_10000', 'workspace_area_10000', 'workspace_reverse_10000']
+    # The batch classes keep several row arrays, the in-place functions not even one
+    assert memory['heat_exchanger_reverse_batch_10000']['peak_row_arrays'] > 5
+    assert memory['workspace_area_10000']['peak_row_arrays'] < 1
+    assert memory['workspace_reverse_10000']['peak_row_arrays'] < 1
+
+
+def test_save_and_compare(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    save(dict(a=1.0, b=2.0), path, dict(a=dict(peak_bytes=8, peak_row_arrays=1.0)))
+    assert load(path) == dict(a=1.0, b=2.0)
+    rows, regressions = compare(load(path), dict(a=1.2, b=3.0, c=1.0), threshold=0.25)
+    assert [name for name, _, _, _ in rows] == ['a', 'b']
+    assert regressions == ['b']
+
+
+def test_main_fails_on_regression(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    with open(path, 'w') as json_file:
+        json.dump(dict(results=dict(heat_exchanger_batch_1000=1e-12)), json_file)
+    assert main(['--maximum-rows', '1000', '--select', 'heat_exchanger_batch_1000', '--repeat', '1', '--compare', path]) == 1
+    with open(path, 'w') as json_file:
+        json.dump(dict(results=dict(heat_exchanger_batch_1000=1e3)), json_file)
+    assert main(['--maximum-rows', '1000', '--select', 'heat_exchanger_batch_1000', '--repeat', '1', '--compare', path]) == 0
+
+
+def test_main_memory_flag(capsys):
+    assert main(['--maximum-rows', '1000', '--select', 'workspace_area', '--repeat', '1']) == 0
+    assert 'row arrays' not in capsys.readouterr().out
+    assert main(['--maximum-rows', '1000', '--select', 'workspace_area', '--repeat', '1', '--memory']) == 0
+    assert 'row arrays' in capsys.readouterr().out
@@ -0,0 +1,66 @@
+import concurrent.futures
+
+import pytest
+
+from cache import QuantizedCache
+from heat_exchanger import HeatExchanger
+from heat_exchanger_reverse import HeatExchangerReverse
+
+inlet_temperatures = [80.0, 20.0]
+film_heat_transfer_coefficients = [1, 1]
+heat_capacity_flows = [5, 4]
+heat_load = 50
+area = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load).area
+
+
+def test_heat_exchanger():
+    cache = QuantizedCache()
+    result = cache.heat_exchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, 'bypass', 'none', 0.2)
+    assert abs(result.area - HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, 'bypass', 'none', 0.2).area) <= 10e-10
+    assert cache.heat_exchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, 'bypass', 'none', 0.2) is result
+    # Without tolerances nearly equal operating points and other mixers are different entries
+    cache.heat_exchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load + 1e-9, 'bypass', 'none', 0.2)
+    cache.heat_exchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, 'admixer', 'none', 0.2)
+    assert cache.statistics() == dict(size=3, maximum_size=4096, hits=1, misses=3, evictions=0, hit_rate=0.25)
+
+
+def test_heat_exchanger_reverse():
+    cache = QuantizedCache(tolerances=dict(inlet_temperature_hot_stream=0.1, heat_load=0.5))
+    for mixer_side in ['hot', 'cold']:
+        result = cache.heat_exchanger_reverse([80.02, 20.0], film_heat_transfer_coefficients, heat_capacity_flows, 40.1, area, mixer_side)
+        # Calculated at the quantized operating point
+        m = HeatExchangerReverse([80.0, 20.0], film_heat_transfer_coefficients, heat_capacity_flows, 40, area)
+        m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+        assert result.mixer_type == m.mixer_type == 'bypass'
+        assert abs(result.bypass_fraction - m.bypass_fraction) <= 10e-10
+        assert result.admixer_fraction is None
+        assert cache.heat_exchanger_reverse([79.98, 20.0], film_heat_transfer_coefficients, heat_capacity_flows, 39.9, area, mixer_side) is result
+    assert cache.hits == 2 and cache.misses == 2
+
+
+def test_eviction():
+    cache = QuantizedCache(maximum_size=2)
+    for load in [40, 50, 40, 60]:
+        cache.heat_exchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, load)
+    # 50 was the least recently used
+    assert len(cache) == 2 and cache.evictions == 1
+    cache.heat_exchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 40)
+    assert cache.hits == 2
+    cache.heat_exchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 50)
+    assert cache.misses == 4
+    cache.clear()
+    assert len(cache) == 0 and cache.statistics()['hits'] == 0
+    with pytest.raises(Exception):
+        QuantizedCache(tolerances=dict(heat_lod=1))
+
+
+def test_threads():
+    cache = QuantizedCache(maximum_size=50, tolerances=dict(heat_load=1))
+    loads = [30 + (index % 40) + 0.1 * (index % 3) for index in range(2000)]
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        areas = list(executor.map(lambda load: cache.heat_exchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, load).area, loads))
+    for load, result in zip(loads, areas):
+        assert abs(result - HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, round(load)).area) <= 10e-10
+    statistics = cache.statistics()
+    assert statistics['hits'] + statistics['misses'] == 2000
+    assert statistics['size'] == 40
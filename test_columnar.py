@@ -0,0 +1,85 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from columnar import HEAT_EXCHANGER_COLUMNS, HEAT_EXCHANGER_REVERSE_COLUMNS, CaseFile, run_heat_exchanger, run_heat_exchanger_reverse
+from heat_exchanger import HeatExchanger
+from heat_exchanger_batch import ADMIXER, BYPASS, NONE
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+
+number_of_rows = 101
+heat_loads = np.linspace(50, 100, number_of_rows)
+
+
+def setup_heat_exchanger_file(path):
+    """Setup a case file of heat exchangers with a bypass on every second hot side"""
+    return CaseFile.create(path, number_of_rows, HEAT_EXCHANGER_COLUMNS, dict(
+        inlet_temperature_hot_stream=80.0,
+        inlet_temperature_cold_stream=20.0,
+        film_heat_transfer_coefficient_hot_stream=1,
+        film_heat_transfer_coefficient_cold_stream=1,
+        heat_capacity_flow_hot_stream=5,
+        heat_capacity_flow_cold_stream=4,
+        heat_load=heat_loads,
+        mixer_type_hot=np.where(np.arange(number_of_rows) % 2 == 0, 'none', 'bypass'),
+        mixer_fraction_hot=0.2))
+
+
+def run_rows(path, start, stop):
+    run_heat_exchanger(CaseFile(str(path)), start, stop)
+
+
+def test_create_and_open(tmp_path):
+    setup_heat_exchanger_file(str(tmp_path / 'cases.hex'))
+    c = CaseFile(str(tmp_path / 'cases.hex'), mode='r')
+    assert c.number_of_rows == number_of_rows
+    assert [name for name, _ in HEAT_EXCHANGER_COLUMNS] == list(c.columns)
+    assert c['mixer_type_hot'].dtype == np.int8
+    assert list(c['mixer_type_hot'][:3]) == [NONE, BYPASS, NONE]
+    assert np.array_equal(c['heat_load'], heat_loads)
+    assert all(column.offset % 64 == 0 for column in c.columns.values())
+
+
+def test_run_heat_exchanger_in_place(tmp_path):
+    path = tmp_path / 'cases.hex'
+    setup_heat_exchanger_file(str(path))
+    # Two worker processes share the file and write disjoint row ranges in place
+    processes = [multiprocessing.Process(target=run_rows, args=(path, start, stop)) for start, stop in ((0, 50), (50, None))]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    c = CaseFile(str(path), mode='r')
+    h = HeatExchanger([80.0, 20.0], [1, 1], [5, 4], heat_loads[77], mixer_type_hot='bypass', mixer_fraction_hot=0.2)
+    assert abs(c['area'][77] - h.area) <= 10e-10
+    assert abs(c['logarithmic_temperature_difference'][77] - h.logarithmic_temperature_difference) <= 10e-10
+    assert c['outlet_temperature_cold_stream'][10] == 20 + heat_loads[10] / 4
+    assert np.all(np.isfinite(c['area']))
+
+
+def test_run_heat_exchanger_reverse_in_place(tmp_path):
+    existent_area = HeatExchanger([80.0, 20.0], [1, 1], [5, 4], 75).area
+    c = CaseFile.create(str(tmp_path / 'reverse.hex'), number_of_rows, HEAT_EXCHANGER_REVERSE_COLUMNS, dict(
+        inlet_temperature_hot_stream=80.0,
+        inlet_temperature_cold_stream=20.0,
+        film_heat_transfer_coefficient_hot_stream=1,
+        film_heat_transfer_coefficient_cold_stream=1,
+        heat_capacity_flow_hot_stream=5,
+        heat_capacity_flow_cold_stream=4,
+        heat_load=heat_loads,
+        existent_area=existent_area))
+    run_heat_exchanger_reverse(c, mixer_side='cold')
+    c.flush()
+    m = HeatExchangerReverseBatch([80.0, 20.0], [1, 1], [5, 4], heat_loads, existent_area)
+    m.heat_exchanger_temperature_calculation(mixer_side='cold')
+    assert c['mixer_type'][0] == BYPASS and c['mixer_type'][-1] == ADMIXER
+    assert np.array_equal(c['admixer_fraction'], m.admixer_fraction, equal_nan=True)
+    assert np.array_equal(c['heat_exchanger_inlet_temperature_cold_stream'], m.heat_exchanger_inlet_temperature_cold_stream)
+
+
+def test_no_case_file(tmp_path):
+    path = tmp_path / 'no.hex'
+    path.write_bytes(b'\0' * 128)
+    with pytest.raises(Exception, match="Sorry, this is no heat exchanger case file"):
+        CaseFile(str(path))
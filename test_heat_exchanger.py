@@ -206,3 +206,58 @@ def test_heat_exchanger_temperatures_admixer_hot_side_bypass_cold_side():
             temperature_difference_a - temperature_difference_b) / np.log(temperature_difference_a / temperature_difference_b)
     assert abs(logarithmic_temperature_difference -
                m.logarithmic_temperature_difference) <= 10e-10
+
+
+def test_cached_properties():
+    m = setup_model()
+    m.mixer_type_hot = 'admixer'
+    m.mixer_fraction_hot = 0.2
+    calls = []
+    stream_temperature_difference = m.stream_temperature_difference
+
+    def counted_stream_temperature_difference(*args):
+        calls.append(args)
+        return stream_temperature_difference(*args)
+    m.stream_temperature_difference = counted_stream_temperature_difference
+    area = m.area
+    number_of_calls = len(calls)
+    assert m.area == area
+    assert m.logarithmic_temperature_difference == m.logarithmic_temperature_difference
+    assert len(calls) == number_of_calls
+
+
+def test_cache_invalidation():
+    m = setup_model()
+    area = m.area
+    outlet_temperature_hot_stream = m.outlet_temperature_hot_stream
+    m.film_heat_transfer_coefficient_hot_stream = 2
+    assert 'outlet_temperature_hot_stream' in m._cache
+    assert 'area' not in m._cache
+    assert m.area < area
+    m.heat_load = 50
+    assert m.outlet_temperature_hot_stream != outlet_temperature_hot_stream
+    assert m.outlet_temperature_hot_stream == inlet_temperatures[0] - 50 / heat_capacity_flows[0]
+    outlet_temperature_cold_stream = m.outlet_temperature_cold_stream
+    m.mixer_type_cold = 'bypass'
+    m.mixer_fraction_cold = 0.2
+    assert m.outlet_temperature_cold_stream == outlet_temperature_cold_stream
+    assert 'outlet_temperature_cold_stream' in m._cache
+    assert m.heat_exchanger_outlet_temperature_cold_stream == inlet_temperatures[1] + 50 / (heat_capacity_flows[1] * (1 - 0.2))
+
+
+def test_area_gradient():
+    m = setup_model()
+    m.mixer_type_hot = 'bypass'
+    m.mixer_fraction_hot = 0.2
+    gradient = m.area_gradient()
+    step = 1e-6
+    m.heat_load = heat_load + step
+    area_plus = m.area
+    m.heat_load = heat_load - step
+    assert abs(gradient['heat_load'] - (area_plus - m.area) / (2 * step)) <= 1e-6
+    m.heat_load = heat_load
+    m.mixer_fraction_hot = 0.2 + step
+    area_plus = m.area
+    m.mixer_fraction_hot = 0.2 - step
+    assert abs(gradient['mixer_fraction_hot'] - (area_plus - m.area) / (2 * step)) <= 1e-6
+    assert gradient['mixer_fraction_cold'] == 0
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_batch import HeatExchangerBatch, mixer_type_codes, mixer_type_names
+
+inlet_temperatures = [80.0, 20.0]
+film_heat_transfer_coefficients = [1, 1]
+heat_capacity_flows = [5, 2.5]
+heat_load = 50
+mixer_types = ['none', 'bypass', 'admixer']
+
+
+def setup_cases():
+    """Setup one row per combination of mixer types plus one row with equal temperature differences"""
+    rows = [(hot, cold) for hot in mixer_types for cold in mixer_types]
+    mixer_type_hot = [hot for hot, _ in rows] + ['none']
+    mixer_type_cold = [cold for _, cold in rows] + ['none']
+    n = len(mixer_type_hot)
+    mixer_fraction_hot = np.full(n, 0.2)
+    mixer_fraction_cold = np.full(n, 0.3)
+    heat_capacity_flow_hot_stream = np.full(n, heat_capacity_flows[0], dtype=float)
+    heat_capacity_flow_cold_stream = np.full(n, heat_capacity_flows[1], dtype=float)
+    heat_capacity_flow_hot_stream[-1] = heat_capacity_flow_cold_stream[-1] = 20
+    return dict(
+        inlet_temperatures=[np.full(n, inlet_temperatures[0]), np.full(n, inlet_temperatures[1])],
+        film_heat_transfer_coefficients=[np.full(n, film_heat_transfer_coefficients[0]), np.full(n, film_heat_transfer_coefficients[1])],
+        heat_capacity_flows=[heat_capacity_flow_hot_stream, heat_capacity_flow_cold_stream],
+        heat_load=np.full(n, heat_load),
+        mixer_type_hot=mixer_type_hot,
+        mixer_type_cold=mixer_type_cold,
+        mixer_fraction_hot=mixer_fraction_hot,
+        mixer_fraction_cold=mixer_fraction_cold)
+
+
+def setup_heat_exchangers(cases):
+    """Setup one scalar heat exchanger per row of the cases"""
+    return [HeatExchanger(
+        inlet_temperatures=[cases['inlet_temperatures'][0][i], cases['inlet_temperatures'][1][i]],
+        film_heat_transfer_coefficients=[cases['film_heat_transfer_coefficients'][0][i], cases['film_heat_transfer_coefficients'][1][i]],
+        heat_capacity_flows=[cases['heat_capacity_flows'][0][i], cases['heat_capacity_flows'][1][i]],
+        heat_load=cases['heat_load'][i],
+        mixer_type_hot=cases['mixer_type_hot'][i],
+        mixer_type_cold=cases['mixer_type_cold'][i],
+        mixer_fraction_hot=cases['mixer_fraction_hot'][i],
+        mixer_fraction_cold=cases['mixer_fraction_cold'][i]) for i in range(len(cases['heat_load']))]
+
+
+def test_batch_matches_heat_exchanger():
+    cases = setup_cases()
+    b = HeatExchangerBatch(**cases)
+    for i, h in enumerate(setup_heat_exchangers(cases)):
+        assert abs(b.outlet_temperature_hot_stream[i] - h.outlet_temperature_hot_stream) <= 10e-10
+        assert abs(b.outlet_temperature_cold_stream[i] - h.outlet_temperature_cold_stream) <= 10e-10
+        assert abs(b.heat_exchanger_inlet_temperature_hot_stream[i] - h.heat_exchanger_inlet_temperature_hot_stream) <= 10e-10
+        assert abs(b.heat_exchanger_outlet_temperature_cold_stream[i] - h.heat_exchanger_outlet_temperature_cold_stream) <= 10e-10
+        assert abs(b.logarithmic_temperature_difference[i] - h.logarithmic_temperature_difference) <= 10e-10
+        assert abs(b.area[i] - h.area) <= 10e-10
+
+
+def test_equal_temperature_differences():
+    b = HeatExchangerBatch(**setup_cases())
+    assert b.logarithmic_temperature_difference[-1] == b.inlet_temperature_hot_stream[-1] - b.outlet_temperature_cold_stream[-1]
+    assert np.all(np.isfinite(b.area))
+
+
+def test_broadcasting_scalars():
+    b = HeatExchangerBatch(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, [25, 50], mixer_type_hot='bypass', mixer_fraction_hot=0.2)
+    h = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 50, mixer_type_hot='bypass', mixer_fraction_hot=0.2)
+    assert b.area.shape == (2,)
+    assert abs(b.area[1] - h.area) <= 10e-10
+
+
+def test_mixer_type_codes():
+    codes = mixer_type_codes(['none', 'bypass', 'admixer'])
+    assert list(codes) == [0, 1, 2]
+    assert list(mixer_type_names(codes)) == ['none', 'bypass', 'admixer']
+    assert list(mixer_type_codes([2, 0])) == [2, 0]
+    with pytest.raises(Exception):
+        mixer_type_codes(['bypas'])
+
+
+def test_area_gradient():
+    cases = setup_cases()
+    columns = dict(
+        inlet_temperature_hot_stream=cases['inlet_temperatures'][0],
+        inlet_temperature_cold_stream=cases['inlet_temperatures'][1],
+        film_heat_transfer_coefficient_hot_stream=cases['film_heat_transfer_coefficients'][0],
+        film_heat_transfer_coefficient_cold_stream=cases['film_heat_transfer_coefficients'][1],
+        heat_capacity_flow_hot_stream=cases['heat_capacity_flows'][0],
+        heat_capacity_flow_cold_stream=cases['heat_capacity_flows'][1],
+        heat_load=cases['heat_load'],
+        mixer_type_hot=cases['mixer_type_hot'],
+        mixer_type_cold=cases['mixer_type_cold'],
+        mixer_fraction_hot=cases['mixer_fraction_hot'],
+        mixer_fraction_cold=cases['mixer_fraction_cold'])
+    for lmtd_mode in ['exact', 'chen']:
+        columns['lmtd_mode'] = lmtd_mode
+        gradient = HeatExchangerBatch.from_columns(columns).area_gradient()
+        for name, derivative in gradient.items():
+            step = 1e-6 * np.maximum(np.abs(columns[name]), 1)
+            finite_difference = (HeatExchangerBatch.from_columns(dict(columns, **{name: columns[name] + step})).area - HeatExchangerBatch.from_columns(dict(columns, **{name: columns[name] - step})).area) / (2 * step)
+            assert np.allclose(derivative, finite_difference, rtol=1e-6, atol=1e-8)
@@ -0,0 +1,90 @@
+import math
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_fast import HeatExchangerFast, HeatExchangerReverseFast
+from heat_exchanger_reverse import HeatExchangerReverse
+
+inlet_temperatures = [80.0, 20.0]
+film_heat_transfer_coefficients = [1, 1]
+heat_capacity_flows = [5, 4]
+heat_load = 50
+mixer_types = ['none', 'bypass', 'admixer']
+properties = ['overall_heat_transfer_coefficient', 'outlet_temperature_hot_stream', 'outlet_temperature_cold_stream', 'heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream',
+              'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_cold_stream', 'logarithmic_temperature_difference', 'area']
+temperatures = ['heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream', 'heat_exchanger_outlet_temperature_cold_stream']
+
+
+def relative_difference(a, b):
+    return abs(a - b) / max(abs(b), 1)
+
+
+def test_heat_exchanger_fast():
+    for mixer_type_hot in mixer_types:
+        for mixer_type_cold in mixer_types:
+            arguments = dict(
+                inlet_temperatures=inlet_temperatures,
+                film_heat_transfer_coefficients=film_heat_transfer_coefficients,
+                heat_capacity_flows=heat_capacity_flows,
+                heat_load=heat_load,
+                mixer_type_hot=mixer_type_hot,
+                mixer_type_cold=mixer_type_cold,
+                mixer_fraction_hot=0.2,
+                mixer_fraction_cold=0.3)
+            m = HeatExchangerFast(**arguments)
+            h = HeatExchanger(**arguments)
+            for name in properties:
+                assert relative_difference(getattr(m, name), getattr(h, name)) <= 1e-12
+            assert type(m.area) is float
+
+
+def test_heat_exchanger_fast_slots():
+    m = HeatExchangerFast(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load)
+    assert not hasattr(m, '__dict__')
+    m.heat_capacity_flow_hot_stream = 20
+    m.heat_capacity_flow_cold_stream = 20
+    assert m.logarithmic_temperature_difference == m.inlet_temperature_hot_stream - m.outlet_temperature_cold_stream
+
+
+def test_heat_exchanger_reverse_fast():
+    existent_area = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 100).area
+    for heat_load in [80, 90, 100, 110, 120]:
+        for mixer_side in ['hot', 'cold']:
+            m = HeatExchangerReverseFast(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area)
+            r = HeatExchangerReverse(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area)
+            m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+            r.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+            assert m.mixer_type == r.mixer_type
+            assert relative_difference(m.area_no_mixer, r.area_no_mixer) <= 1e-12
+            for name in temperatures:
+                assert relative_difference(getattr(m, name), getattr(r, name)) <= 1e-12
+            for name in ['admixer_fraction', 'bypass_fraction']:
+                if getattr(r, name) is None:
+                    assert getattr(m, name) is None
+                else:
+                    assert relative_difference(getattr(m, name), getattr(r, name)) <= 1e-12
+
+
+def test_temperature_cross():
+    existent_area = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 100).area
+    for heat_load in [250, 300]:
+        m = HeatExchangerFast(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load)
+        h = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load)
+        assert math.isnan(m.logarithmic_temperature_difference) and math.isnan(m.area) and math.isnan(h.area)
+        m = HeatExchangerReverseFast(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area)
+        r = HeatExchangerReverse(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area)
+        assert math.isnan(m.area_no_mixer) and math.isnan(r.area_no_mixer)
+        assert m.mixer_type == r.mixer_type
+
+
+def test_nearly_equal_temperature_differences():
+    # Heat capacity flows with dTa / dTb = 1 +- 1e-4 and closer, where the exact mode switches to the series expansion
+    for heat_capacity_flow_hot_stream in [4 - 1e-7, 4 + 1e-7, 4 * (1 - 2e-6), 4 * (1 + 2e-6), 4.04]:
+        for heat_load in [40, 45, 50, 55, 60]:
+            heat_capacity_flows = [heat_capacity_flow_hot_stream, 4]
+            for mixer_type_hot in mixer_types:
+                m = HeatExchangerFast(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, mixer_type_hot=mixer_type_hot, mixer_fraction_hot=1e-6)
+                h = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, mixer_type_hot=mixer_type_hot, mixer_fraction_hot=1e-6)
+                assert relative_difference(m.area, h.area) <= 1e-12
+            m = HeatExchangerReverseFast(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, 10)
+            r = HeatExchangerReverse(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, 10)
+            assert relative_difference(m.area_no_mixer, r.area_no_mixer) <= 1e-12
@@ -92,3 +92,32 @@ def test_lambertw():
     LMTD = (dTa - dTb) / np.log(dTa / dTb)
     UA = heat_load / LMTD
     assert UA == 175
+
+
+def test_mixer_fraction_gradient():
+    m, h = setup_model()
+    m.existent_area = 1.01 * h.area
+    gradient = m.mixer_fraction_gradient(mixer_side='hot')
+    bypass_fraction = m.bypass_fraction
+    step = 1e-6
+    m.existent_area += step
+    m.heat_exchanger_temperature_calculation(mixer_side='hot')
+    assert abs(gradient['existent_area'] - (m.bypass_fraction - bypass_fraction) / step) <= 1e-4 * abs(gradient['existent_area'])
+    assert set(gradient) == {'inlet_temperature_hot_stream', 'inlet_temperature_cold_stream', 'film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream', 'heat_capacity_flow_hot_stream', 'heat_capacity_flow_cold_stream', 'heat_load', 'existent_area'}
+
+
+def test_both_sides_calculation():
+    _, h = setup_model()
+    for existent_area in [0.9 * h.area, 1.01 * h.area]:
+        m = HeatExchangerReverse(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area)
+        placement = m.both_sides_calculation()
+        assert placement.mixer_type == m.mixer_type != 'none'
+        for side in ['hot', 'cold']:
+            m.heat_exchanger_temperature_calculation(mixer_side=side)
+            solution = getattr(placement, side)
+            assert abs(solution.mixer_fraction - (m.admixer_fraction if m.mixer_type == 'admixer' else m.bypass_fraction)) <= 10e-10
+            assert abs(solution.heat_exchanger_inlet_temperature_hot_stream - m.heat_exchanger_inlet_temperature_hot_stream) <= 10e-10
+            assert abs(solution.heat_exchanger_outlet_temperature_cold_stream - m.heat_exchanger_outlet_temperature_cold_stream) <= 10e-10
+        assert placement.mixer_side == ('hot' if abs(placement.hot.mixer_fraction) <= abs(placement.cold.mixer_fraction) else 'cold')
+        assert placement.best == getattr(placement, placement.mixer_side)
+        assert m.both_sides_calculation(lambda solution: -abs(solution.mixer_fraction)).mixer_side != placement.mixer_side
@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_batch import ADMIXER, BYPASS, NONE
+from heat_exchanger_reverse import HeatExchangerReverse
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+
+inlet_temperatures = [80.0, 20.0]
+film_heat_transfer_coefficients = [1, 1]
+heat_capacity_flows = [5, 4]
+heat_loads = np.array([90, 100, 110, 95, 105])
+
+
+def setup_model():
+    """Setup coefficients for testing the batched reversed heat exchanger class"""
+    existent_area = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 100).area
+    return HeatExchangerReverseBatch(
+        inlet_temperatures=inlet_temperatures,
+        film_heat_transfer_coefficients=film_heat_transfer_coefficients,
+        heat_capacity_flows=heat_capacity_flows,
+        heat_load=heat_loads,
+        existent_area=existent_area), existent_area
+
+
+def test_mixer_type():
+    m, _ = setup_model()
+    assert list(m.mixer_type) == [BYPASS, NONE, ADMIXER, BYPASS, ADMIXER]
+    assert list(m.no_mixer) == [False, True, False, False, False]
+
+
+def test_batch_matches_heat_exchanger_reverse():
+    for mixer_side in ['hot', 'cold']:
+        m, existent_area = setup_model()
+        m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+        for i, heat_load in enumerate(heat_loads):
+            r = HeatExchangerReverse(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area)
+            r.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+            assert abs(m.heat_exchanger_inlet_temperature_hot_stream[i] - r.heat_exchanger_inlet_temperature_hot_stream) <= 10e-10
+            assert abs(m.heat_exchanger_outlet_temperature_hot_stream[i] - r.heat_exchanger_outlet_temperature_hot_stream) <= 10e-10
+            assert abs(m.heat_exchanger_inlet_temperature_cold_stream[i] - r.heat_exchanger_inlet_temperature_cold_stream) <= 10e-10
+            assert abs(m.heat_exchanger_outlet_temperature_cold_stream[i] - r.heat_exchanger_outlet_temperature_cold_stream) <= 10e-10
+            if r.admixer_fraction is None:
+                assert np.isnan(m.admixer_fraction[i])
+            else:
+                assert abs(m.admixer_fraction[i] - r.admixer_fraction) <= 10e-10
+            if r.bypass_fraction is None:
+                assert np.isnan(m.bypass_fraction[i])
+            else:
+                assert abs(m.bypass_fraction[i] - r.bypass_fraction) <= 10e-10
+
+
+def test_mixer_side_per_row():
+    m, _ = setup_model()
+    m.heat_exchanger_temperature_calculation(mixer_side=np.array(['hot', 'hot', 'cold', 'cold', 'hot']))
+    hot, _ = setup_model()
+    hot.heat_exchanger_temperature_calculation(mixer_side='hot')
+    cold, _ = setup_model()
+    cold.heat_exchanger_temperature_calculation(mixer_side='cold')
+    assert m.bypass_fraction[0] == hot.bypass_fraction[0]
+    assert m.bypass_fraction[3] == cold.bypass_fraction[3]
+    assert m.admixer_fraction[2] == cold.admixer_fraction[2]
+    assert m.admixer_fraction[4] == hot.admixer_fraction[4]
+
+
+def test_both_sides_calculation():
+    m, _ = setup_model()
+    calls = []
+    temperature_difference_ratio = m.temperature_difference_ratio
+    m.temperature_difference_ratio = lambda dT_LMTD: calls.append(dT_LMTD) or temperature_difference_ratio(dT_LMTD)
+    placement = m.both_sides_calculation()
+    # One Lambert W evaluation for the rows with mixer on both sides
+    assert len(calls) == 1 and len(calls[0]) == 8
+    assert m.admixer_fraction is None
+    assert list(placement.mixer_type) == [BYPASS, NONE, ADMIXER, BYPASS, ADMIXER]
+    for side, solution in (('hot', placement.hot), ('cold', placement.cold)):
+        r, _ = setup_model()
+        r.heat_exchanger_temperature_calculation(mixer_side=side)
+        assert np.allclose(solution.mixer_fraction, np.where(np.isnan(r.admixer_fraction), r.bypass_fraction, r.admixer_fraction), rtol=1e-12, equal_nan=True)
+        for name in solution._fields[1:]:
+            assert np.allclose(getattr(solution, name), getattr(r, name), rtol=1e-12)
+    smaller_hot = np.abs(placement.hot.mixer_fraction) <= np.abs(placement.cold.mixer_fraction)
+    assert placement.mixer_side.tolist() == np.where(placement.mixer_type == NONE, 'none', np.where(smaller_hot, 'hot', 'cold')).tolist()
+    assert np.array_equal(placement.best.mixer_fraction, np.where(placement.mixer_side == 'cold', placement.cold.mixer_fraction, placement.hot.mixer_fraction), equal_nan=True)
+    assert np.array_equal(placement.best.heat_exchanger_outlet_temperature_cold_stream, np.where(placement.mixer_side == 'cold', placement.cold.heat_exchanger_outlet_temperature_cold_stream, placement.hot.heat_exchanger_outlet_temperature_cold_stream))
+    # User criterion: lowest heat exchanger inlet temperature of the hot stream
+    placement = m.both_sides_calculation(lambda solution: solution.heat_exchanger_inlet_temperature_hot_stream)
+    assert placement.mixer_side.tolist() == ['hot', 'none', 'hot', 'hot', 'hot']
+    with pytest.raises(ValueError):
+        placement.best.mixer_fraction[0] = 0
+    with pytest.raises(AttributeError):
+        placement.mixer_side = 'cold'
+    # Inputs of the caller passed through unchanged stay writeable
+    inlet_temperature_cold_stream = np.full(len(heat_loads), inlet_temperatures[1])
+    r = HeatExchangerReverseBatch([inlet_temperatures[0], inlet_temperature_cold_stream], film_heat_transfer_coefficients, heat_capacity_flows, heat_loads, m.existent_area)
+    placement = r.both_sides_calculation()
+    assert placement.hot.heat_exchanger_inlet_temperature_cold_stream.base is not None
+    inlet_temperature_cold_stream[0] = 21.0
+    r.inlet_temperature_cold_stream[1] = 21.0
+    with pytest.raises(ValueError):
+        placement.hot.heat_exchanger_inlet_temperature_cold_stream[0] = 0
+
+
+def test_mixer_fraction_gradient():
+    _, existent_area = setup_model()
+    columns = dict(
+        inlet_temperature_hot_stream=inlet_temperatures[0],
+        inlet_temperature_cold_stream=inlet_temperatures[1],
+        film_heat_transfer_coefficient_hot_stream=film_heat_transfer_coefficients[0],
+        film_heat_transfer_coefficient_cold_stream=film_heat_transfer_coefficients[1],
+        heat_capacity_flow_hot_stream=np.array([5, 5, 5, 2, 2]),
+        heat_capacity_flow_cold_stream=heat_capacity_flows[1],
+        heat_load=heat_loads,
+        existent_area=existent_area * np.array([1, 1, 1, 1.1, 1.01]))
+
+    def mixer_fraction(columns, mixer_side):
+        m = HeatExchangerReverseBatch.from_columns(columns)
+        m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+        return np.where(np.isnan(m.admixer_fraction), m.bypass_fraction, m.admixer_fraction)
+
+    for mixer_side in ['hot', 'cold']:
+        m = HeatExchangerReverseBatch.from_columns(columns)
+        gradient = m.mixer_fraction_gradient(mixer_side)
+        mixer = m.mixer_type != NONE
+        assert np.array_equal(np.isnan(gradient['heat_load']), ~mixer)
+        for name, derivative in gradient.items():
+            step = 1e-6 * np.maximum(np.abs(columns[name]), 1)
+            finite_difference = (mixer_fraction(dict(columns, **{name: columns[name] + step}), mixer_side) - mixer_fraction(dict(columns, **{name: columns[name] - step}), mixer_side)) / (2 * step)
+            assert np.allclose(derivative[mixer], finite_difference[mixer], rtol=1e-5, atol=1e-7)
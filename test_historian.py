@@ -0,0 +1,73 @@
+import csv
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_reverse import HeatExchangerReverse
+from historian import reverse_pipeline
+
+existent_area = HeatExchanger([80.0, 20.0], [1, 1], [5, 4], 100).area
+column_map = dict(
+    inlet_temperature_hot_stream='TI_H',
+    inlet_temperature_cold_stream='TI_C',
+    heat_capacity_flow_hot_stream='CP_H',
+    heat_capacity_flow_cold_stream='CP_C',
+    heat_load='Q')
+fixed = dict(film_heat_transfer_coefficient_hot_stream=1, film_heat_transfer_coefficient_cold_stream=1, existent_area=existent_area)
+rows = [
+    ['2020-01-01 00:00', '80', '20', '5', '4', '90'],
+    ['2020-01-01 00:01', '80', '20', '5', '4', '110'],
+    ['2020-01-01 00:02', '80', 'bad', '5', '4', '110'],
+    ['2020-01-01 00:03', '80', '20', '5'],
+    ['2020-01-01 00:04', '80', '20', '5', '4', '100'],
+    ['2020-01-01 00:05', '30', '20', '5', '4', '100'],
+    ['2020-01-01 00:06', '81', '20', '5', '4', '95']]
+
+
+def setup_files(tmp_path):
+    """Setup a historian export with two malformed and one infeasible row"""
+    input_path = tmp_path / 'historian.csv'
+    with open(input_path, 'w', newline='') as input_file:
+        writer = csv.writer(input_file)
+        writer.writerow(['timestamp', 'TI_H', 'TI_C', 'CP_H', 'CP_C', 'Q'])
+        writer.writerows(rows)
+    return str(input_path), str(tmp_path / 'results.csv'), str(tmp_path / 'rejected.csv')
+
+
+def test_reverse_pipeline(tmp_path):
+    input_path, output_path, rejected_path = setup_files(tmp_path)
+    counts = reverse_pipeline(input_path, output_path, rejected_path, column_map=column_map, fixed=fixed, passthrough=('timestamp',), chunk_size=2, mixer_side='hot')
+    assert counts == dict(written=4, malformed=2, infeasible=1)
+    with open(output_path, newline='') as output_file:
+        results = list(csv.DictReader(output_file))
+    assert [result['timestamp'] for result in results] == ['2020-01-01 00:00', '2020-01-01 00:01', '2020-01-01 00:04', '2020-01-01 00:06']
+    assert [result['mixer_type'] for result in results] == ['bypass', 'admixer', 'none', 'bypass']
+    r = HeatExchangerReverse([81.0, 20.0], [1, 1], [5, 4], 95, existent_area)
+    r.heat_exchanger_temperature_calculation(mixer_side='hot')
+    assert float(results[3]['bypass_fraction']) == r.bypass_fraction
+    assert float(results[3]['heat_exchanger_outlet_temperature_hot_stream']) == r.heat_exchanger_outlet_temperature_hot_stream
+    with open(rejected_path, newline='') as rejected_file:
+        rejected = list(csv.DictReader(rejected_file))
+    assert [row['line'] for row in rejected] == ['4', '5', '7']
+    assert rejected[2]['reason'] == 'infeasible'
+    # Malformed and infeasible rows are rejected with the same fields: line, reason and the CSV row
+    assert [row['row'] for row in rejected] == [','.join(rows[index]) for index in (2, 3, 5)]
+
+
+def test_truncated_passthrough(tmp_path):
+    input_path, output_path, rejected_path = tmp_path / 'historian.csv', str(tmp_path / 'results.csv'), str(tmp_path / 'rejected.csv')
+    with open(input_path, 'w', newline='') as input_file:
+        writer = csv.writer(input_file)
+        writer.writerow(['TI_H', 'TI_C', 'CP_H', 'CP_C', 'Q', 'timestamp'])
+        writer.writerows([row[1:] + row[:1] for row in rows[:2]])
+        # Row cut short before the timestamp in the last column
+        writer.writerow(['80', '20', '5', '4', '100'])
+        writer.writerow(rows[6][1:] + rows[6][:1])
+    counts = reverse_pipeline(str(input_path), output_path, rejected_path, column_map=column_map, fixed=fixed, passthrough=('timestamp',), chunk_size=2, mixer_side='hot')
+    assert counts == dict(written=3, malformed=1, infeasible=0)
+    with open(output_path, newline='') as output_file:
+        results = list(csv.DictReader(output_file))
+    assert [result['timestamp'] for result in results] == ['2020-01-01 00:00', '2020-01-01 00:01', '2020-01-01 00:06']
+    assert [result['mixer_type'] for result in results] == ['bypass', 'admixer', 'bypass']
+    with open(rejected_path, newline='') as rejected_file:
+        rejected = list(csv.DictReader(rejected_file))
+    assert [row['line'] for row in rejected] == ['4']
+    assert rejected[0]['reason'].startswith('malformed')
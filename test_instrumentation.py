@@ -0,0 +1,52 @@
+import numpy as np
+
+import instrumentation
+from heat_exchanger import HeatExchanger
+from heat_exchanger_batch import HeatExchangerBatch
+from heat_exchanger_reverse import HeatExchangerReverse
+
+inlet_temperatures = [80.0, 20.0]
+film_heat_transfer_coefficients = [1, 1]
+heat_capacity_flows = [5, 4]
+heat_load = 100
+
+
+def test_disabled_has_no_wrappers():
+    originals = {(owner, attribute): vars(owner)[attribute] for targets in instrumentation.STAGES.values() for owner, attribute in targets}
+    with instrumentation.instrumented():
+        assert instrumentation.is_enabled()
+        assert all(vars(owner)[attribute] is not function for (owner, attribute), function in originals.items())
+    assert not instrumentation.is_enabled()
+    assert all(vars(owner)[attribute] is function for (owner, attribute), function in originals.items())
+
+
+def test_heat_exchanger_counters():
+    with instrumentation.instrumented() as snapshot:
+        h = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, mixer_type_hot='admixer', mixer_fraction_hot=0.2)
+        area = h.area
+        statistics = snapshot()
+    assert area == HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, mixer_type_hot='admixer', mixer_fraction_hot=0.2).area
+    assert statistics['logarithmic_mean_temperature_difference']['calls'] == 1
+    assert statistics['heat_exchanger_inlet_temperature_calculation']['calls'] == 2
+    assert statistics['stream_temperature_difference']['calls'] > 0
+    assert statistics['lambert_w']['calls'] == 0
+    assert all(entry['seconds'] >= 0 for entry in statistics.values())
+
+
+def test_reverse_and_batch_counters():
+    area = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load).area
+    with instrumentation.instrumented() as snapshot:
+        HeatExchangerReverse(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, 1.2 * area).heat_exchanger_temperature_calculation(mixer_side='hot')
+        HeatExchangerBatch(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, np.linspace(50, 100, 10)).area
+        statistics = snapshot()
+    assert statistics['heat_exchanger_temperature_calculation']['calls'] == 1
+    assert statistics['lambert_w']['calls'] == 1
+    assert statistics['logarithmic_mean_temperature_difference']['calls'] >= 2
+    assert statistics['heat_exchanger_temperature_calculation']['seconds'] >= statistics['lambert_w']['seconds']
+
+
+def test_reset():
+    with instrumentation.instrumented() as snapshot:
+        HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load).area
+        instrumentation.reset()
+        assert all(entry == dict(calls=0, seconds=0.0) for entry in snapshot().values())
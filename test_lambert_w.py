@@ -0,0 +1,79 @@
+import math
+import subprocess
+import sys
+
+import numpy as np
+from scipy.special import lambertw
+
+from lambert_w import BRANCH_POINT, lambert_w_derivative, lambert_w_minus_one, lambert_w_minus_one_into, lambert_w_minus_one_array, real_lambert_w_minus_one
+from workspace import Workspace
+
+
+def test_lambert_w_minus_one():
+    # Range of dT / LMTD produced by the reverse calculation, away from the branch point where scipy loses accuracy
+    x = np.concatenate([np.linspace(1e-3, 0.99, 1000), np.logspace(-12, -3, 50)])
+    z = -x * np.exp(-x)
+    for value, expected in zip(z, lambertw(z, -1).real):
+        assert abs(lambert_w_minus_one(value) - expected) <= 1e-13 * abs(expected)
+
+
+def test_lambert_w_minus_one_inverse():
+    for x in [1e-9, 0.1, 0.5, 0.9, 0.999999]:
+        z = -x * math.exp(-x)
+        w = lambert_w_minus_one(z)
+        assert w <= -1
+        assert abs(w * math.exp(w) - z) <= 1e-15
+
+
+def test_lambert_w_minus_one_domain():
+    assert lambert_w_minus_one(BRANCH_POINT) == -1
+    assert lambert_w_minus_one(0) == -math.inf
+    assert math.isnan(lambert_w_minus_one(0.1))
+    assert math.isnan(lambert_w_minus_one(-0.5))
+
+
+def test_lambert_w_minus_one_array():
+    x = np.concatenate([np.linspace(1e-3, 0.99, 1000), np.logspace(-12, -3, 50)])
+    z = -x * np.exp(-x)
+    w = lambert_w_minus_one_array(z)
+    expected = lambertw(z, -1).real
+    assert np.all(np.abs(w - expected) <= 1e-13 * np.abs(expected))
+    assert np.allclose(w, [lambert_w_minus_one(value) for value in z], rtol=1e-14, atol=0)
+
+
+def test_real_lambert_w_minus_one_fallback():
+    z = np.array([-0.2, 0.1, -0.5])
+    w = real_lambert_w_minus_one(z)
+    assert np.all(np.abs(w - lambertw(z, -1).real) <= 1e-13 * np.abs(w))
+    assert real_lambert_w_minus_one(0.1) == lambertw(0.1, -1).real
+
+
+def test_reverse_calculation_does_not_import_scipy():
+    code = 'import sys, heat_exchanger_reverse, heat_exchanger_reverse_batch; print("scipy" in sys.modules)'
+    assert subprocess.check_output([sys.executable, '-c', code], text=True).strip() == 'False'
+
+
+def test_lambert_w_derivative():
+    for x in [1e-6, 0.1, 0.5, 0.9]:
+        z = -x * math.exp(-x)
+        step = 1e-9 * abs(z)
+        finite_difference = (lambert_w_minus_one(z + step) - lambert_w_minus_one(z - step)) / (2 * step)
+        assert abs(lambert_w_derivative(lambert_w_minus_one(z), z) / finite_difference - 1) <= 1e-5
+
+
+def test_lambert_w_minus_one_into():
+    x = np.concatenate([np.linspace(1e-3, 0.99, 1000), np.logspace(-12, -3, 50)])
+    z = np.concatenate([-x * np.exp(-x), [BRANCH_POINT, 0, 0.1]])
+    out = np.empty(len(z))
+    expected = real_lambert_w_minus_one(z)
+    assert lambert_w_minus_one_into(z, out, Workspace(len(z))) is out
+    assert np.allclose(out, expected, rtol=1e-13, equal_nan=True)
+
+
+def test_lambert_w_minus_one_into_converges_every_row():
+    # Rows of the grid need different numbers of Halley steps
+    x = np.logspace(-8, 3, 2000)
+    z = -x * np.exp(-x)
+    out = np.empty(len(z))
+    lambert_w_minus_one_into(z, out, Workspace(len(z)))
+    assert np.allclose(out, lambert_w_minus_one_array(z), rtol=1e-14, atol=0)
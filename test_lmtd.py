@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_batch import HeatExchangerBatch
+from heat_exchanger_reverse import HeatExchangerReverse
+from lmtd import LMTD_MODES, logarithmic_mean_temperature_difference, logarithmic_mean_temperature_difference_gradient, logarithmic_mean_temperature_difference_into, maximum_relative_error, maximum_relative_errors, relative_error
+from workspace import Workspace
+
+temperature_difference_a = np.array([10.0, 60.0, 30.0, 40.0, 40.0 + 1e-9, -5.0])
+temperature_difference_b = np.array([10.0, 20.0, 35.0, 4.0, 40.0, 5.0])
+
+
+def test_exact():
+    logarithmic_mean = logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b)
+    expected = (temperature_difference_a[1:4] - temperature_difference_b[1:4]) / np.log(temperature_difference_a[1:4] / temperature_difference_b[1:4])
+    assert logarithmic_mean[0] == 10
+    assert np.all(np.abs(logarithmic_mean[1:4] - expected) <= 1e-12 * expected)
+    assert abs(logarithmic_mean[4] - (40 + 0.5e-9)) <= 1e-12
+    assert np.isnan(logarithmic_mean[5])
+
+
+def test_series_expansion():
+    # The exact form loses digits for nearly equal temperature differences, the series stays accurate
+    for relative_difference in [1e-3, 1e-6, 1e-10]:
+        a = 50 * (1 + relative_difference)
+        b = 50 * (1 - relative_difference)
+        expected = 50 * (1 - relative_difference ** 2 / 3)
+        assert abs(logarithmic_mean_temperature_difference(a, b) - expected) <= 1e-13 * expected
+
+
+def test_scalar_matches_array():
+    for mode in LMTD_MODES:
+        logarithmic_mean = logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, mode)
+        for a, b, expected in zip(temperature_difference_a, temperature_difference_b, logarithmic_mean):
+            assert logarithmic_mean_temperature_difference(a, b, mode) == pytest.approx(expected, rel=1e-14, nan_ok=True)
+
+
+def test_approximations():
+    # Chen (1987) example: dTa = 60 K and dTb = 20 K
+    assert abs(logarithmic_mean_temperature_difference(60.0, 20.0, 'chen') - (60 * 20 * 40) ** (1 / 3)) <= 1e-12
+    assert abs(logarithmic_mean_temperature_difference(60.0, 20.0, 'underwood') - ((60 ** (1 / 3) + 20 ** (1 / 3)) / 2) ** 3) <= 1e-12
+    assert abs(logarithmic_mean_temperature_difference(60.0, 20.0, 'paterson') - (2 / 3 * (60 * 20) ** 0.5 + 40 / 3)) <= 1e-12
+    for mode in LMTD_MODES:
+        assert np.all(np.abs(relative_error(temperature_difference_a[:5], temperature_difference_b[:5], mode)) <= maximum_relative_error(mode, 10))
+    with pytest.raises(Exception):
+        logarithmic_mean_temperature_difference(60.0, 20.0, 'chn')
+
+
+def test_maximum_relative_errors():
+    errors = maximum_relative_errors(maximum_ratio=10)
+    assert errors['exact'] == 0
+    assert errors['underwood'] < errors['paterson'] < errors['chen'] < 0.03
+
+
+def test_lmtd_mode_heat_exchanger():
+    arguments = ([80.0, 20.0], [1, 1], [5, 4], 100)
+    h = HeatExchanger(*arguments, lmtd_mode='underwood')
+    exact = HeatExchanger(*arguments)
+    b = HeatExchangerBatch(*arguments, lmtd_mode='underwood')
+    r = HeatExchangerReverse(*arguments, existent_area=exact.area, lmtd_mode='underwood')
+    assert h.area != exact.area
+    assert abs(h.area / exact.area - 1) <= maximum_relative_error('underwood', 10)
+    assert abs(b.area - h.area) <= 1e-12
+    assert r.area_no_mixer == h.area
+    area = h.area
+    h.lmtd_mode = 'exact'
+    assert h.area == exact.area != area
+
+
+def test_gradient():
+    step = 1e-6
+    for mode in LMTD_MODES:
+        gradient_a, gradient_b = logarithmic_mean_temperature_difference_gradient(temperature_difference_a, temperature_difference_b, mode)
+        numeric_a = (logarithmic_mean_temperature_difference(temperature_difference_a + step, temperature_difference_b, mode) - logarithmic_mean_temperature_difference(temperature_difference_a - step, temperature_difference_b, mode)) / (2 * step)
+        numeric_b = (logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b + step, mode) - logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b - step, mode)) / (2 * step)
+        assert np.allclose(gradient_a[1:5], numeric_a[1:5], atol=1e-7)
+        assert np.allclose(gradient_b[1:5], numeric_b[1:5], atol=1e-7)
+        assert gradient_a[0] == pytest.approx(0.5) and gradient_b[0] == pytest.approx(0.5)
+        assert np.isnan(gradient_a[5]) and np.isnan(gradient_b[5])
+
+
+def test_into():
+    workspace = Workspace(1000)
+    temperature_difference_a = np.concatenate((np.geomspace(0.1, 100, 997), [5, -1, 0]))
+    temperature_difference_b = np.concatenate((np.full(997, 10.0), [5, 2, 0]))
+    out = np.empty(1000)
+    for mode in LMTD_MODES:
+        expected = logarithmic_mean_temperature_difference(temperature_difference_a, temperature_difference_b, mode)
+        assert logarithmic_mean_temperature_difference_into(temperature_difference_a, temperature_difference_b, out, workspace, mode) is out
+        assert np.array_equal(np.isnan(out), np.isnan(expected))
+        with np.errstate(invalid='ignore'):
+            assert np.nanmax(np.abs(out / expected - 1)) <= 1e-14
@@ -0,0 +1,52 @@
+import numpy as np
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_batch import BYPASS, NONE
+from heat_exchanger_reverse import HeatExchangerReverse
+from multi_period import MultiPeriodDesign
+
+film_heat_transfer_coefficients = [1, 1]
+heat_capacity_flows = [5, 4]
+# Two heat exchangers x three periods
+inlet_temperatures_hot = np.array([[80.0, 90.0, 85.0], [120.0, 110.0, 100.0]])
+inlet_temperatures_cold = np.array([[20.0], [30.0]])
+heat_loads = np.array([[100, 60, 80], [150, 90, 200]])
+
+
+def setup_model():
+    """Setup the multi-period design of two heat exchangers over three periods"""
+    return MultiPeriodDesign([inlet_temperatures_hot, inlet_temperatures_cold], film_heat_transfer_coefficients, heat_capacity_flows, heat_loads)
+
+
+def test_area():
+    m = setup_model()
+    area = m.design_calculation(mixer_side='hot')
+    for exchanger in range(2):
+        areas = [HeatExchanger([inlet_temperatures_hot[exchanger, period], inlet_temperatures_cold[exchanger, 0]], film_heat_transfer_coefficients, heat_capacity_flows, heat_loads[exchanger, period]).area for period in range(3)]
+        assert abs(area[exchanger] - max(areas)) <= 10e-10
+        assert m.governing_period[exchanger] == int(np.argmax(areas))
+
+
+def test_mixers():
+    m = setup_model()
+    m.design_calculation(mixer_side=np.array(['hot', 'cold']))
+    assert m.mixer_type.shape == (2, 3)
+    for exchanger, mixer_side in enumerate(['hot', 'cold']):
+        for period in range(3):
+            if period == m.governing_period[exchanger]:
+                assert m.mixer_type[exchanger, period] == NONE
+                assert np.isnan(m.bypass_fraction[exchanger, period])
+                continue
+            assert m.mixer_type[exchanger, period] == BYPASS
+            r = HeatExchangerReverse([inlet_temperatures_hot[exchanger, period], inlet_temperatures_cold[exchanger, 0]], film_heat_transfer_coefficients, heat_capacity_flows, heat_loads[exchanger, period], m.area[exchanger])
+            r.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+            assert abs(m.bypass_fraction[exchanger, period] - r.bypass_fraction) <= 10e-10
+            assert abs(m.heat_exchanger_outlet_temperature_hot_stream[exchanger, period] - r.heat_exchanger_outlet_temperature_hot_stream) <= 10e-10
+            assert abs(m.heat_exchanger_outlet_temperature_cold_stream[exchanger, period] - r.heat_exchanger_outlet_temperature_cold_stream) <= 10e-10
+
+
+def test_infeasible_period():
+    m = MultiPeriodDesign([[80.0, 40.0], 20.0], film_heat_transfer_coefficients, heat_capacity_flows, 100)
+    with np.errstate(invalid='ignore'):
+        area = m.design_calculation()
+    assert np.isnan(area) and m.governing_period == 1
@@ -0,0 +1,63 @@
+from heat_exchanger import HeatExchanger
+from network import HeatExchangerNetwork
+
+
+def setup_model():
+    """Setup a network of two hot and two cold streams: H1 passes E1 and E2, C1 passes E1 and E3, H2 passes E3, C2 passes E2"""
+    n = HeatExchangerNetwork()
+    n.add_stream('H1', 150.0, 10, 1)
+    n.add_stream('H2', 120.0, 8, 1)
+    n.add_stream('C1', 20.0, 12, 1)
+    n.add_stream('C2', 40.0, 6, 1)
+    n.add_heat_exchanger('E1', 'H1', 'C1', 300)
+    n.add_heat_exchanger('E2', 'H1', 'C2', 200, mixer_type_hot='bypass', mixer_fraction_hot=0.1)
+    n.add_heat_exchanger('E3', 'H2', 'C1', 150)
+    return n
+
+
+def test_evaluate():
+    n = setup_model()
+    areas = n.evaluate()
+    assert n.topological_order == ['E1', 'E2', 'E3']
+    e1 = HeatExchanger([150.0, 20.0], [1, 1], [10, 12], 300)
+    e2 = HeatExchanger([e1.outlet_temperature_hot_stream, 40.0], [1, 1], [10, 6], 200, mixer_type_hot='bypass', mixer_fraction_hot=0.1)
+    e3 = HeatExchanger([120.0, e1.outlet_temperature_cold_stream], [1, 1], [8, 12], 150)
+    assert areas == {'E1': e1.area, 'E2': e2.area, 'E3': e3.area}
+    assert n.stream_outlet_temperature('H1') == 150 - 500 / 10
+    assert n.stream_outlet_temperature('C1') == e3.outlet_temperature_cold_stream
+
+
+def test_incremental_evaluation():
+    n = setup_model()
+    n.evaluate()
+    assert n.recalculated == ['E1', 'E2', 'E3']
+    n.evaluate()
+    assert n.recalculated == []
+    n.set_mixer('E2', 'hot', 'admixer', 0.2)
+    n.evaluate()
+    assert n.recalculated == ['E2']
+    n.set_heat_load('E3', 100)
+    n.evaluate()
+    assert n.recalculated == ['E3']
+    n.set_heat_load('E1', 250)
+    areas = n.evaluate()
+    assert n.recalculated == ['E1', 'E2', 'E3']
+    e1 = HeatExchanger([150.0, 20.0], [1, 1], [10, 12], 250)
+    e3 = HeatExchanger([120.0, e1.outlet_temperature_cold_stream], [1, 1], [8, 12], 100)
+    assert areas['E3'] == e3.area
+    n.set_stream('C2', inlet_temperature=30.0)
+    n.evaluate()
+    assert n.recalculated == ['E2']
+    # Changing the result does not change the state of the network
+    areas = n.evaluate()
+    areas['E1'] = 0
+    assert n.evaluate()['E1'] == n.areas['E1'] == e1.area
+
+
+def test_mixer_and_heat_load_change():
+    n = setup_model()
+    n.evaluate()
+    n.set_mixer('E1', 'cold', 'bypass', 0.1)
+    n.set_heat_load('E1', 250)
+    n.evaluate()
+    assert n.recalculated == ['E1', 'E2', 'E3']
@@ -0,0 +1,66 @@
+import numpy as np
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_batch import HeatExchangerBatch
+from rating import HeatExchangerRating
+
+inlet_temperatures = [80.0, 20.0]
+film_heat_transfer_coefficients = [1, 1]
+heat_capacity_flows = [5, 4]
+heat_loads = np.linspace(10, 150, 15)
+mixers = [('none', 'none', 0, 0), ('bypass', 'none', 0.2, 0), ('none', 'bypass', 0, 0.2), ('admixer', 'none', 0.2, 0), ('none', 'admixer', 0, 0.2), ('bypass', 'admixer', 0.1, 0.3)]
+
+
+def test_heat_load_calculation():
+    for mixer_type_hot, mixer_type_cold, mixer_fraction_hot, mixer_fraction_cold in mixers:
+        for lmtd_mode in ['exact', 'chen', 'underwood', 'paterson']:
+            area = HeatExchangerBatch(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_loads, mixer_type_hot, mixer_type_cold, mixer_fraction_hot, mixer_fraction_cold, lmtd_mode).area
+            rows = np.isfinite(area)
+            r = HeatExchangerRating(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, area[rows], mixer_type_hot, mixer_type_cold, mixer_fraction_hot, mixer_fraction_cold, lmtd_mode)
+            heat_load = r.heat_load_calculation()
+            assert np.all(r.converged)
+            assert np.allclose(heat_load, heat_loads[rows], rtol=1e-9)
+            assert np.allclose(r.area, area[rows], rtol=1e-9)
+
+
+def test_temperature_difference_coefficients():
+    for mixer_type_hot, mixer_type_cold, mixer_fraction_hot, mixer_fraction_cold in mixers:
+        r = HeatExchangerRating(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 10, mixer_type_hot, mixer_type_cold, mixer_fraction_hot, mixer_fraction_cold)
+        a0, a1, b0, b1 = r.temperature_difference_coefficients()
+        assert r.heat_load is None
+        h = HeatExchangerBatch(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_loads, mixer_type_hot, mixer_type_cold, mixer_fraction_hot, mixer_fraction_cold)
+        assert np.allclose(a0 + a1 * heat_loads, h.temperature_difference_a, rtol=1e-12)
+        assert np.allclose(b0 + b1 * heat_loads, h.temperature_difference_b, rtol=1e-12)
+
+
+def test_outlet_temperatures():
+    h = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 100, mixer_type_hot='bypass', mixer_fraction_hot=0.2)
+    r = HeatExchangerRating(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, h.area, mixer_type_hot='bypass', mixer_fraction_hot=0.2)
+    r.heat_load_calculation()
+    assert abs(r.outlet_temperature_hot_stream - h.outlet_temperature_hot_stream) <= 10e-8
+    assert abs(r.heat_exchanger_outlet_temperature_hot_stream - h.heat_exchanger_outlet_temperature_hot_stream) <= 10e-8
+    assert abs(r.outlet_temperature_cold_stream - h.outlet_temperature_cold_stream) <= 10e-8
+
+
+def test_warm_start():
+    areas = np.linspace(5, 40, 1000)
+    r = HeatExchangerRating(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, areas)
+    heat_load = r.heat_load_calculation()
+    cold_iterations = r.iterations
+    r.heat_load_calculation(heat_load_guess=heat_load)
+    assert r.iterations == 1
+    # Next time step: slightly fouled heat exchangers
+    r.existent_area = areas * 0.999
+    r.heat_load_calculation(heat_load_guess=heat_load)
+    assert np.all(r.converged)
+    assert r.iterations < cold_iterations
+    # Guesses outside the bracket are replaced
+    r.heat_load_calculation(heat_load_guess=1e6)
+    assert np.all(r.converged)
+
+
+def test_infeasible_rows():
+    r = HeatExchangerRating([[80.0, 20.0], [20.0, 80.0]], film_heat_transfer_coefficients, heat_capacity_flows, [10, 10])
+    heat_load = r.heat_load_calculation()
+    assert np.isfinite(heat_load[0]) and r.converged[0]
+    assert np.isnan(heat_load[1]) and not r.converged[1]
@@ -0,0 +1,46 @@
+import numpy as np
+
+from heat_exchanger_batch import HeatExchangerBatch
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+from screening import LAMBERT_W_OUT_OF_DOMAIN, MIXER_FRACTION_OUT_OF_RANGE, NON_FINITE_INPUT, NON_POSITIVE_AREA, NON_POSITIVE_HEAT_CAPACITY_FLOW, NON_POSITIVE_HEAT_LOAD, TEMPERATURE_CROSS, UNKNOWN_MIXER_TYPE, code_counts, code_names, screen_area, screen_reverse, screened_area, screened_reverse
+
+columns = dict(inlet_temperature_hot_stream=80.0, inlet_temperature_cold_stream=20.0, film_heat_transfer_coefficient_hot_stream=1.0, film_heat_transfer_coefficient_cold_stream=1.0, heat_capacity_flow_hot_stream=np.array([5, 5, 5, 5, -5, 5, 5, 5, 5]), heat_capacity_flow_cold_stream=4.0, heat_load=np.array([50, 50, 50, 50, 50, 0, np.nan, 500, 50]))
+
+
+def test_screen_area():
+    area_columns = dict(columns, mixer_type_hot=['bypass', 'admixer', 'bypass', 'bypaas', 'none', 'none', 'none', 'none', 'admixer'], mixer_fraction_hot=[0.2, 0.2, 1.0, 0.2, 0.2, 0.2, 0.2, 0.2, 30])
+    codes = screen_area(area_columns)
+    assert codes.tolist() == [0, 0, MIXER_FRACTION_OUT_OF_RANGE | TEMPERATURE_CROSS, UNKNOWN_MIXER_TYPE, NON_POSITIVE_HEAT_CAPACITY_FLOW, NON_POSITIVE_HEAT_LOAD, NON_FINITE_INPUT, TEMPERATURE_CROSS, 0]
+    assert code_names(codes[4]) == ['non_positive_heat_capacity_flow']
+    assert code_names(codes[2] | codes[3]) == ['unknown_mixer_type', 'mixer_fraction_out_of_range', 'temperature_cross']
+    counts = code_counts(codes)
+    assert counts['feasible'] == 3 and counts['temperature_cross'] == 2 and counts['lambert_w_out_of_domain'] == 0
+    # Every feasible row has a finite area, every temperature cross a NaN area
+    area, codes = screened_area(area_columns)
+    assert np.array_equal(np.isfinite(area), codes == 0)
+    assert np.allclose(area[:2], HeatExchangerBatch.from_columns(dict(area_columns, mixer_type_hot=['bypass', 'admixer'], mixer_fraction_hot=0.2, heat_capacity_flow_hot_stream=5.0, heat_load=50.0)).area)
+
+
+def test_screen_random_rows():
+    rng = np.random.default_rng(3)
+    rows = 10000
+    area_columns = dict(inlet_temperature_hot_stream=rng.uniform(40, 100, rows), inlet_temperature_cold_stream=rng.uniform(10, 50, rows), film_heat_transfer_coefficient_hot_stream=1.0, film_heat_transfer_coefficient_cold_stream=1.0, heat_capacity_flow_hot_stream=rng.uniform(1, 6, rows), heat_capacity_flow_cold_stream=4.0, heat_load=rng.uniform(10, 100, rows), mixer_type_hot=rng.integers(0, 3, rows), mixer_type_cold=rng.integers(0, 3, rows), mixer_fraction_hot=rng.uniform(0, 0.5, rows), mixer_fraction_cold=rng.uniform(0, 0.5, rows))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        area = HeatExchangerBatch.from_columns(area_columns).area
+    feasible = screen_area(area_columns) == 0
+    assert 0 < np.count_nonzero(feasible) < rows
+    assert np.all(np.isfinite(area[feasible]) & (area[feasible] > 0))
+    assert not np.any(np.isfinite(area[~feasible]) & (area[~feasible] > 0))
+
+
+def test_screen_reverse():
+    reverse_columns = dict(columns, existent_area=np.array([3.5, 5, 0, np.inf, 3.5, 3.5, 3.5, 3.5, 3.5]))
+    codes = screen_reverse(reverse_columns)
+    assert codes.tolist() == [0, 0, NON_POSITIVE_AREA | LAMBERT_W_OUT_OF_DOMAIN, NON_FINITE_INPUT | LAMBERT_W_OUT_OF_DOMAIN, NON_POSITIVE_HEAT_CAPACITY_FLOW, NON_POSITIVE_HEAT_LOAD | LAMBERT_W_OUT_OF_DOMAIN, NON_FINITE_INPUT | LAMBERT_W_OUT_OF_DOMAIN, TEMPERATURE_CROSS | LAMBERT_W_OUT_OF_DOMAIN, 0]
+    outputs, codes = screened_reverse(reverse_columns, mixer_side=np.array(['hot', 'cold'] * 4 + ['hot']))
+    m = HeatExchangerReverseBatch.from_columns(dict(reverse_columns, heat_capacity_flow_hot_stream=5.0, heat_load=50.0, existent_area=np.array([3.5, 5, 3.5])))
+    m.heat_exchanger_temperature_calculation(mixer_side=np.array(['hot', 'cold', 'hot']))
+    assert outputs['mixer_type'].tolist() == [m.mixer_type[0], m.mixer_type[1], -1, -1, -1, -1, -1, -1, m.mixer_type[2]]
+    for name in ('admixer_fraction', 'bypass_fraction', 'heat_exchanger_outlet_temperature_cold_stream'):
+        assert np.allclose(outputs[name][[0, 1, 8]], getattr(m, name), equal_nan=True)
+        assert np.all(np.isnan(outputs[name][2:8]))
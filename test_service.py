@@ -0,0 +1,134 @@
+import asyncio
+import json
+import time
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_reverse import HeatExchangerReverse
+from service import MicroBatcher, evaluate_requests, start_server
+
+inlet_temperatures = [80.0, 20.0]
+film_heat_transfer_coefficients = [1, 1]
+heat_capacity_flows = [5, 4]
+area = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 50).area
+case = dict(
+    inlet_temperature_hot_stream=80.0,
+    inlet_temperature_cold_stream=20.0,
+    film_heat_transfer_coefficient_hot_stream=1,
+    film_heat_transfer_coefficient_cold_stream=1,
+    heat_capacity_flow_hot_stream=5,
+    heat_capacity_flow_cold_stream=4)
+
+
+def area_request(index, heat_load, **arguments):
+    return dict(case, id=index, calculation='area', heat_load=heat_load, **arguments)
+
+
+def reverse_request(index, heat_load, mixer_side):
+    return dict(case, id=index, calculation='reverse', heat_load=heat_load, existent_area=area, mixer_side=mixer_side)
+
+
+def test_evaluate_requests():
+    requests = [area_request(0, 50), area_request(1, 60, mixer_type_hot='bypass', mixer_fraction_hot=0.2), reverse_request(2, 40, 'cold'), area_request(3, 50, mixer_type_hot='bipass'), reverse_request(4, 60, 'hot'), dict(id=5, calculation='area')]
+    responses = evaluate_requests(requests)
+    assert [response['id'] for response in responses] == list(range(6))
+    assert abs(responses[0]['result']['area'] - area) <= 10e-10
+    assert abs(responses[1]['result']['area'] - HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 60, 'bypass', 'none', 0.2).area) <= 10e-10
+    for index, heat_load, mixer_side in [(2, 40, 'cold'), (4, 60, 'hot')]:
+        m = HeatExchangerReverse(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, area)
+        m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+        result = responses[index]['result']
+        assert result['mixer_type'] == m.mixer_type
+        assert result['feasible']
+        for fraction in ['admixer_fraction', 'bypass_fraction']:
+            if getattr(m, fraction) is None:
+                assert result[fraction] is None
+            else:
+                assert abs(result[fraction] - getattr(m, fraction)) <= 10e-10
+    # Faulty requests only fail themselves
+    assert 'mixer type' in responses[3]['error']
+    assert responses[5]['error'].startswith('KeyError')
+
+
+def test_micro_batcher():
+    async def run():
+        async with MicroBatcher(maximum_batch_size=16, latency=0.05) as batcher:
+            responses = await asyncio.gather(*(batcher.submit(area_request(index, 25 + index)) for index in range(40)))
+            return responses, batcher.metrics
+
+    responses, metrics = asyncio.run(run())
+    for index, response in enumerate(responses):
+        assert response['id'] == index
+        assert abs(response['result']['area'] - HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 25 + index).area) <= 10e-10
+    assert metrics['requests'] == 40
+    assert metrics['batches'] == 3
+    assert metrics['largest_batch_size'] == 16
+    assert metrics['batch_sizes'] == {'8': 1, '16': 2}
+    assert metrics['maximum_queue_depth'] == 40
+    assert metrics['queue_depth'] == 0
+
+
+def test_server():
+    async def run():
+        async with MicroBatcher(latency=0.01) as batcher:
+            server = await start_server(batcher, port=0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                lines = [json.dumps(area_request(index, 40 + index)) for index in range(10)] + ['not json', json.dumps(dict(id='metrics', calculation='metrics'))]
+                writer.write(('\n'.join(lines) + '\n').encode())
+                await writer.drain()
+                responses = [json.loads(await reader.readline()) for _ in lines]
+                writer.close()
+                return responses
+
+    responses = {response['id']: response for response in asyncio.run(run())}
+    for index in range(10):
+        assert abs(responses[index]['result']['area'] - HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, 40 + index).area) <= 10e-10
+    assert 'error' in responses[None]
+    assert 'queue_depth' in responses['metrics']['result']
+
+
+def test_server_evaluation_error():
+    def evaluate(requests):
+        if any(request.get('fail') for request in requests):
+            raise RuntimeError('evaluation failed')
+        return evaluate_requests(requests)
+
+    async def run():
+        async with MicroBatcher(evaluate=evaluate, latency=0.01) as batcher:
+            server = await start_server(batcher, port=0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                responses = []
+                for request in [area_request(0, 50, fail=True), area_request(1, 50)]:
+                    writer.write(json.dumps(request).encode() + b'\n')
+                    await writer.drain()
+                    responses.append(json.loads(await asyncio.wait_for(reader.readline(), 5)))
+                writer.close()
+                return responses
+
+    failed, answered = asyncio.run(run())
+    assert failed == dict(id=0, error='RuntimeError: evaluation failed')
+    assert answered['id'] == 1
+    assert abs(answered['result']['area'] - area) <= 10e-10
+
+
+def test_server_limits_requests_in_flight():
+    def evaluate(requests):
+        time.sleep(0.01)
+        return evaluate_requests(requests)
+
+    async def run():
+        async with MicroBatcher(evaluate=evaluate, maximum_batch_size=2, latency=0.001) as batcher:
+            server = await start_server(batcher, port=0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+                # All requests are pipelined at once
+                writer.write(''.join(json.dumps(area_request(index, 40 + index)) + '\n' for index in range(20)).encode())
+                await writer.drain()
+                responses = [json.loads(await asyncio.wait_for(reader.readline(), 5)) for _ in range(20)]
+                writer.close()
+                return responses, batcher.metrics
+
+    responses, metrics = asyncio.run(run())
+    assert sorted(response['id'] for response in responses) == list(range(20))
+    assert metrics['maximum_queue_depth'] <= 2
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from heat_exchanger_batch import HeatExchangerBatch
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+from shared_executor import SharedArrays, SharedMemoryExecutor
+
+rows = 5000
+rng = np.random.default_rng(4)
+columns = dict(
+    inlet_temperature_hot_stream=rng.uniform(60, 100, rows),
+    inlet_temperature_cold_stream=20.0,
+    film_heat_transfer_coefficient_hot_stream=rng.uniform(0.5, 2, rows),
+    film_heat_transfer_coefficient_cold_stream=1.0,
+    heat_capacity_flow_hot_stream=rng.uniform(3, 6, rows),
+    heat_capacity_flow_cold_stream=4.0,
+    heat_load=rng.uniform(20, 60, rows),
+    mixer_type_hot=rng.choice(['none', 'bypass', 'admixer'], rows),
+    mixer_fraction_hot=0.2,
+    existent_area=rng.uniform(1, 6, rows))
+
+
+def test_area():
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = HeatExchangerBatch.from_columns(columns).area
+    with SharedMemoryExecutor(processes=2, chunk_size=1000) as executor:
+        area = executor.area(columns)
+        assert np.allclose(area, expected, rtol=1e-12, equal_nan=True)
+        assert sum(status['rows'] for status in executor.statuses) == rows
+        assert sum(status['chunks'] for status in executor.statuses) == 5
+        # Columns and result in shared memory are used in place
+        with SharedArrays() as shared:
+            shared_columns = dict(columns, heat_load=shared.put(columns['heat_load']), mixer_type_hot=shared.put(np.zeros(rows, dtype=np.int8)))
+            out = shared.create(rows)
+            assert executor.area(shared_columns, shared, out) is out
+            assert np.allclose(out, HeatExchangerBatch.from_columns(dict(columns, mixer_type_hot='none')).area, rtol=1e-12)
+            del out, shared_columns
+    serial = SharedMemoryExecutor(processes=1, chunk_size=999)
+    assert np.array_equal(serial.area(columns), area, equal_nan=True)
+    assert serial.statuses[0]['chunks'] == 6
+
+
+def test_reverse():
+    reverse_columns = {name: value for name, value in columns.items() if not name.startswith('mixer')}
+    mixer_side = rng.choice(['hot', 'cold'], rows)
+    m = HeatExchangerReverseBatch.from_columns(reverse_columns)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+    with SharedMemoryExecutor(processes=2, chunk_size=1024) as executor:
+        for side in (mixer_side, 'hot'):
+            outputs = executor.reverse(reverse_columns, side, out=dict(bypass_fraction=np.empty(rows)))
+            if side is mixer_side:
+                assert np.array_equal(outputs['mixer_type'], m.mixer_type)
+                well_conditioned = np.abs(m.heat_exchanger_outlet_temperature_cold_stream) < 1e3
+                assert np.allclose(outputs['heat_exchanger_outlet_temperature_cold_stream'][well_conditioned], m.heat_exchanger_outlet_temperature_cold_stream[well_conditioned], rtol=1e-9)
+                assert np.array_equal(np.isnan(outputs['bypass_fraction']), np.isnan(m.bypass_fraction))
+        assert sum(status['rows'] for status in executor.statuses) == rows
+
+
+def test_errors():
+    with SharedMemoryExecutor(processes=1) as executor, pytest.raises(Exception):
+        executor.area(dict(columns, mixer_type_hot='bypaas'))
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_fast import HeatExchangerReverseFast
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+from surrogate import HeatExchangerReverseSurrogateBatch, HeatExchangerReverseSurrogateFast, TemperatureDifferenceRatioSurrogate, exact_temperature_difference_ratio
+
+inlet_temperatures = [80.0, 20.0]
+film_heat_transfer_coefficients = [1, 1]
+heat_capacity_flows = [5, 4]
+heat_load = 50
+area = HeatExchanger(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load).area
+envelope = dict(
+    inlet_temperature_hot_stream=(70, 90),
+    inlet_temperature_cold_stream=(15, 25),
+    film_heat_transfer_coefficient_hot_stream=1,
+    film_heat_transfer_coefficient_cold_stream=1,
+    heat_capacity_flow_hot_stream=5,
+    heat_capacity_flow_cold_stream=4,
+    heat_load=(25, 75),
+    existent_area=(0.5 * area, 1.5 * area))
+temperatures = ['heat_exchanger_inlet_temperature_hot_stream', 'heat_exchanger_outlet_temperature_hot_stream', 'heat_exchanger_inlet_temperature_cold_stream', 'heat_exchanger_outlet_temperature_cold_stream']
+
+
+def test_build():
+    surrogate = TemperatureDifferenceRatioSurrogate.build(envelope, tolerance=1e-9)
+    assert surrogate.maximum_error <= 1e-9
+    assert 0 < surrogate.minimum_ratio < 1
+    assert TemperatureDifferenceRatioSurrogate.build(envelope, tolerance=1e-6).points < surrogate.points
+    with pytest.raises(Exception):
+        TemperatureDifferenceRatioSurrogate.build(dict(envelope, heat_load=(25, 300)))
+    with pytest.raises(Exception):
+        TemperatureDifferenceRatioSurrogate.build(envelope, tolerance=1e-16, maximum_points=257)
+
+
+def test_temperature_difference_ratio():
+    surrogate = TemperatureDifferenceRatioSurrogate.build(envelope)
+    # Inside the table, below it and above 1 (trivial solution)
+    dT_LMTD = np.concatenate((np.geomspace(surrogate.minimum_ratio, 1, 1001), [surrogate.minimum_ratio / 2, 1.5]))
+    beta = exact_temperature_difference_ratio(dT_LMTD)[0]
+    assert np.max(np.abs(surrogate.temperature_difference_ratio(dT_LMTD) / beta - 1)) <= 1e-9
+    for x, expected in zip(dT_LMTD, beta):
+        assert abs(surrogate.scalar_temperature_difference_ratio(float(x)) / expected - 1) <= 1e-9
+
+
+def test_derivative():
+    dT_LMTD = np.array([0.1, 0.5, 0.9])
+    step = 1e-6
+    derivative = (exact_temperature_difference_ratio(dT_LMTD * np.exp(step))[0] - exact_temperature_difference_ratio(dT_LMTD * np.exp(-step))[0]) / 2 / step
+    assert np.allclose(exact_temperature_difference_ratio(dT_LMTD)[1], derivative, rtol=1e-6)
+    # One-sided at x = 1, above 1 W_-1 only has the trivial solution
+    beta, derivative = exact_temperature_difference_ratio(np.array([1.0, np.exp(-step)]))
+    assert beta[0] == 1 and derivative[0] == -2
+    assert abs((beta[1] - 1) / step - 2) <= 1e-3
+
+
+def test_heat_exchanger_reverse_surrogate_batch():
+    surrogate = TemperatureDifferenceRatioSurrogate.build(envelope)
+    rng = np.random.default_rng(1)
+    rows = 1000
+    arguments = dict(
+        inlet_temperatures=[rng.uniform(70, 90, rows), rng.uniform(15, 25, rows)],
+        film_heat_transfer_coefficients=film_heat_transfer_coefficients,
+        heat_capacity_flows=heat_capacity_flows,
+        heat_load=rng.uniform(25, 75, rows),
+        existent_area=rng.uniform(0.5 * area, 1.5 * area, rows))
+    for mixer_side in ['hot', 'cold']:
+        exact = HeatExchangerReverseBatch(**arguments)
+        exact.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+        m = HeatExchangerReverseSurrogateBatch(surrogate, **arguments)
+        m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+        assert np.array_equal(m.mixer_type, exact.mixer_type)
+        for temperature in temperatures:
+            assert np.array_equal(np.isnan(getattr(m, temperature)), np.isnan(getattr(exact, temperature)))
+            assert np.nanmax(np.abs(getattr(m, temperature) - getattr(exact, temperature))) <= 1e-7
+
+
+def test_heat_exchanger_reverse_surrogate_fast():
+    surrogate = TemperatureDifferenceRatioSurrogate.build(envelope)
+    for existent_area in [0.8 * area, 1.2 * area]:
+        for mixer_side in ['hot', 'cold']:
+            exact = HeatExchangerReverseFast(inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area)
+            exact.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+            m = HeatExchangerReverseSurrogateFast(surrogate, inlet_temperatures, film_heat_transfer_coefficients, heat_capacity_flows, heat_load, existent_area)
+            m.heat_exchanger_temperature_calculation(mixer_side=mixer_side)
+            assert m.mixer_type == exact.mixer_type
+            for temperature in temperatures:
+                assert abs(getattr(m, temperature) - getattr(exact, temperature)) <= 1e-7
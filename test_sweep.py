@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_batch import ADMIXER, BYPASS, NONE
+from heat_exchanger_reverse import HeatExchangerReverse
+from sweep import heat_exchanger_reverse_sweep, heat_exchanger_sweep
+
+fixed = dict(
+    inlet_temperature_hot_stream=80.0,
+    inlet_temperature_cold_stream=20.0,
+    film_heat_transfer_coefficient_cold_stream=1,
+    heat_capacity_flow_hot_stream=5,
+    heat_capacity_flow_cold_stream=4,
+    mixer_type_hot='bypass')
+axes = dict(
+    heat_load=np.linspace(50, 100, 6),
+    mixer_fraction_hot=np.linspace(0, 0.3, 4),
+    film_heat_transfer_coefficient_hot_stream=np.array([0.5, 1, 2]))
+
+
+def test_heat_exchanger_sweep():
+    calls = []
+    result = heat_exchanger_sweep(axes, fixed, chunk_size=7, processes=1, progress=lambda evaluated, total: calls.append((evaluated, total)))
+    assert result.values.shape == (6, 4, 3)
+    assert list(result.axes) == ['heat_load', 'mixer_fraction_hot', 'film_heat_transfer_coefficient_hot_stream']
+    assert calls[-1] == (72, 72)
+    assert len(calls) == 11
+    h = HeatExchanger([80.0, 20.0], [2, 1], [5, 4], 90, mixer_type_hot='bypass', mixer_fraction_hot=0.2)
+    assert abs(result.values[4, 2, 2] - h.area) <= 10e-10
+
+
+def test_heat_exchanger_sweep_process_pool(tmp_path):
+    serial = heat_exchanger_sweep(axes, fixed, chunk_size=5, processes=1)
+    parallel = heat_exchanger_sweep(axes, fixed, chunk_size=5, processes=2, out=str(tmp_path / 'area.npy'))
+    assert np.array_equal(serial.values, parallel.values)
+    assert np.array_equal(np.load(tmp_path / 'area.npy'), serial.values)
+
+
+def test_heat_exchanger_reverse_sweep():
+    existent_area = HeatExchanger([80.0, 20.0], [1, 1], [5, 4], 100).area
+    reverse_fixed = dict(fixed, film_heat_transfer_coefficient_hot_stream=1)
+    result = heat_exchanger_reverse_sweep(dict(existent_area=[existent_area, 1.1 * existent_area], heat_load=[90, 100, 110]), reverse_fixed, mixer_side='hot', processes=1)
+    assert result.values.shape == (2, 3)
+    assert result.values[0, 1]['mixer_type'] == NONE and np.isnan(result.values[0, 1]['mixer_fraction'])
+    r = HeatExchangerReverse([80.0, 20.0], [1, 1], [5, 4], 110, existent_area)
+    r.heat_exchanger_temperature_calculation(mixer_side='hot')
+    assert result.values['mixer_type'][0, 2] == ADMIXER
+    assert abs(result.values['mixer_fraction'][0, 2] - r.admixer_fraction) <= 10e-10
+    r = HeatExchangerReverse([80.0, 20.0], [1, 1], [5, 4], 90, 1.1 * existent_area)
+    r.heat_exchanger_temperature_calculation(mixer_side='hot')
+    assert result.values['mixer_type'][1, 0] == BYPASS
+    assert abs(result.values['mixer_fraction'][1, 0] - r.bypass_fraction) <= 10e-10
+
+
+def test_non_contiguous_out():
+    out = np.empty((3, 4, 6)).transpose()
+    with pytest.raises(Exception):
+        heat_exchanger_sweep(axes, fixed, processes=1, out=out)
+    out = np.empty((6, 4, 3))
+    assert heat_exchanger_sweep(axes, fixed, processes=1, out=out).values is out
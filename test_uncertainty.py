@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from heat_exchanger import HeatExchanger
+from heat_exchanger_reverse import HeatExchangerReverse
+from uncertainty import StreamingStatistics, heat_exchanger_reverse_uncertainty, heat_exchanger_uncertainty, monte_carlo
+
+fixed = dict(
+    inlet_temperature_hot_stream=80.0,
+    inlet_temperature_cold_stream=20.0,
+    film_heat_transfer_coefficient_cold_stream=1,
+    heat_capacity_flow_hot_stream=5,
+    heat_capacity_flow_cold_stream=4,
+    heat_load=50)
+distributions = dict(film_heat_transfer_coefficient_hot_stream=('normal', 1, 0.1), heat_capacity_flow_cold_stream=('uniform', 3.5, 4.5))
+
+
+def test_streaming_statistics():
+    values = np.random.default_rng(0).normal(-1, 2, 10**5)
+    statistics = StreamingStatistics()
+    for chunk in np.array_split(values, 7):
+        statistics.update(chunk)
+    statistics.update([np.nan, 0.0])
+    values = np.append(values, 0.0)
+    assert statistics.count == len(values) and statistics.nan_count == 1
+    assert abs(statistics.mean - np.mean(values)) <= 1e-12
+    assert abs(statistics.variance - np.var(values, ddof=1)) <= 1e-10
+    assert statistics.minimum == np.min(values) and statistics.maximum == np.max(values)
+    q = np.array([0, 0.01, 0.25, 0.5, 0.75, 0.99, 1])
+    exact = np.quantile(values, q, method='lower')
+    assert np.all(np.abs(statistics.quantile(q) - exact) <= 1e-3 * np.abs(exact) + 1e-12)
+    # Merging the statistics of two halves equals the statistics of all values
+    first, second = StreamingStatistics(), StreamingStatistics()
+    first.update(values[:40000])
+    second.update(values[40000:])
+    merged = first.merge(second)
+    assert merged.count == len(values) and abs(merged.mean - statistics.mean) <= 1e-12
+    assert merged.positive_buckets == statistics.positive_buckets and merged.negative_buckets == statistics.negative_buckets
+    with pytest.raises(Exception):
+        merged.merge(StreamingStatistics(1e-2))
+    assert np.isnan(StreamingStatistics().quantile(0.5))
+    # Non-finite values are counted, not added
+    statistics = StreamingStatistics()
+    statistics.update([1.0, np.inf, np.nan, -np.inf])
+    assert (statistics.count, statistics.nan_count, statistics.infinite_count, statistics.mean, statistics.maximum) == (1, 1, 2, 1.0, 1.0)
+    assert StreamingStatistics().merge(statistics).infinite_count == 2
+    # The progress of results with infinite values reaches the number of samples
+    calls = []
+    statistics = monte_carlo(lambda columns: 1 / np.floor(columns['x']), dict(x=('uniform', 0, 2)), samples=1000, chunk_size=400, processes=1, progress=lambda evaluated, total: calls.append((evaluated, total)))
+    assert calls[-1] == (1000, 1000)
+    assert statistics.count + statistics.infinite_count == 1000 and statistics.infinite_count > 0
+
+
+def test_heat_exchanger_uncertainty():
+    calls = []
+    statistics = heat_exchanger_uncertainty(distributions, fixed, samples=25000, chunk_size=10000, processes=1, progress=lambda evaluated, total: calls.append((evaluated, total)))
+    assert calls == [(10000, 25000), (20000, 25000), (25000, 25000)]
+    assert statistics.count == 25000
+    nominal = HeatExchanger([80.0, 20.0], [1, 1], [5, 4], 50).area
+    assert abs(statistics.quantile(0.5) / nominal - 1) < 0.01
+    assert statistics.quantile(0.05) < nominal < statistics.quantile(0.95)
+    # Reproducible with the seed and independent of the number of processes
+    parallel = heat_exchanger_uncertainty(distributions, fixed, samples=25000, chunk_size=10000, processes=2)
+    assert (parallel.mean, parallel.variance, parallel.positive_buckets) == (statistics.mean, statistics.variance, statistics.positive_buckets)
+    assert heat_exchanger_uncertainty(distributions, fixed, samples=25000, chunk_size=10000, processes=1, seed=1).mean != statistics.mean
+    with pytest.raises(Exception):
+        monte_carlo(len, dict(heat_load=('gauss', 0, 1)), samples=10, processes=1)
+
+
+def test_heat_exchanger_reverse_uncertainty():
+    existent_area = 1.01 * HeatExchanger([80.0, 20.0], [1, 1], [5, 4], 50).area
+    statistics = heat_exchanger_reverse_uncertainty(dict(heat_capacity_flow_hot_stream=('normal', 5, 0.01)), dict(fixed, film_heat_transfer_coefficient_hot_stream=1, existent_area=existent_area), mixer_side='hot', samples=2000, processes=1)
+    m = HeatExchangerReverse([80.0, 20.0], [1, 1], [5, 4], 50, existent_area)
+    m.heat_exchanger_temperature_calculation(mixer_side='hot')
+    assert statistics.count == 2000
+    assert abs(statistics.quantile(0.5) - m.bypass_fraction) <= 0.01 * abs(m.bypass_fraction)
@@ -0,0 +1,92 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from heat_exchanger_batch import HeatExchangerBatch, mixer_type_codes
+from heat_exchanger_reverse_batch import HeatExchangerReverseBatch
+from workspace import REVERSE_OUTPUTS, Workspace, area_into, reverse_into
+
+rows = 10000
+rng = np.random.default_rng(2)
+columns = dict(
+    inlet_temperature_hot_stream=rng.uniform(60, 100, rows),
+    inlet_temperature_cold_stream=rng.uniform(10, 30, rows),
+    film_heat_transfer_coefficient_hot_stream=rng.uniform(0.5, 2, rows),
+    film_heat_transfer_coefficient_cold_stream=1.0,
+    heat_capacity_flow_hot_stream=rng.uniform(2, 6, rows),
+    heat_capacity_flow_cold_stream=4.0,
+    heat_load=rng.uniform(20, 80, rows),
+    mixer_type_hot=mixer_type_codes(rng.choice(['none', 'bypass', 'admixer'], rows)),
+    mixer_type_cold=mixer_type_codes(rng.choice(['none', 'bypass', 'admixer'], rows)),
+    mixer_fraction_hot=rng.uniform(0, 0.5, rows),
+    mixer_fraction_cold=rng.uniform(0, 0.5, rows),
+    existent_area=rng.uniform(1, 6, rows))
+mixer_side = rng.choice(['hot', 'cold'], rows)
+
+
+def relative_difference(a, b):
+    with np.errstate(invalid='ignore'):
+        return np.abs(a - b) / np.maximum(np.abs(b), 1)
+
+
+def test_area_into():
+    workspace = Workspace(rows)
+    out = np.empty(rows)
+    for lmtd_mode in ['exact', 'chen', 'underwood', 'paterson']:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = HeatExchangerBatch.from_columns(dict(columns, lmtd_mode=lmtd_mode)).area
+        area = area_into(dict(columns, lmtd_mode=lmtd_mode), workspace, out)
+        assert area is out
+        assert np.array_equal(np.isnan(area), np.isnan(expected))
+        assert np.nanmax(relative_difference(area, expected)) <= 1e-12
+    # Mixer type names and scalar columns
+    area = area_into(dict(columns, mixer_type_hot='bypass', mixer_type_cold='none', heat_load=50.0), workspace)
+    expected = HeatExchangerBatch.from_columns(dict(columns, mixer_type_hot='bypass', mixer_type_cold='none', heat_load=50.0)).area
+    assert np.nanmax(relative_difference(area, expected)) <= 1e-12
+
+
+def test_reverse_into():
+    workspace = Workspace(rows)
+    for side in ['hot', 'cold', mixer_side]:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m = HeatExchangerReverseBatch.from_columns(columns)
+            m.heat_exchanger_temperature_calculation(mixer_side=side)
+        outputs = reverse_into(columns, workspace, side)
+        assert np.array_equal(outputs['mixer_type'], m.mixer_type)
+        for name, _ in REVERSE_OUTPUTS[1:]:
+            expected = getattr(m, name)
+            assert np.array_equal(np.isnan(outputs[name]), np.isnan(expected))
+            # Fractions with vanishing denominators are ill-conditioned, large fractions amplify rounding
+            well_conditioned = np.abs(expected) < 1e3
+            assert np.max(relative_difference(outputs[name], expected)[well_conditioned]) <= (1e-11 if name.endswith('fraction') else 1e-12)
+
+
+def test_no_allocations():
+    workspace = Workspace(rows)
+    out = np.empty(rows)
+    outputs = {name: np.empty(rows, dtype=dtype) for name, dtype in REVERSE_OUTPUTS}
+    area_into(columns, workspace, out)
+    reverse_into(columns, workspace, mixer_side, outputs)
+    tracemalloc.start()
+    try:
+        area_into(columns, workspace, out)
+        reverse_into(columns, workspace, mixer_side, outputs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # Only the fixed size buffers of the NumPy iterator, not even half a row array of floats
+    assert peak < 4 * rows
+
+
+def test_chunks():
+    workspace = Workspace(4000)
+    area = np.empty(rows)
+    for start in range(0, rows, 4000):
+        chunk = {name: value[start:start + 4000] if np.ndim(value) else value for name, value in columns.items()}
+        area_into(chunk, workspace, area[start:start + 4000])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected = HeatExchangerBatch.from_columns(columns).area
+    assert np.nanmax(relative_difference(area, expected)) <= 1e-12
+    with pytest.raises(Exception):
+        area_into(columns, workspace)
@@ -0,0 +1,252 @@
+import collections
+import concurrent.futures
+import functools
+import math
+import os
+
+import numpy as np
+
+from sweep import area_evaluation, mixer_fraction_evaluation
+
+DISTRIBUTIONS = ('normal', 'uniform', 'lognormal', 'triangular')
+RELATIVE_ACCURACY = 1e-3
+
+
+class StreamingStatistics:
+    """Class for mean, variance, extremes and quantiles of a stream of values in constant memory
+
+        Mean and variance are updated chunk by chunk with the merge formula of Chan et al. (Welford's update for whole chunks). Quantiles come from a sketch of logarithmic buckets: every bucket covers values within the relative accuracy, so the number of buckets only grows with the logarithm of the range of the values, not with their count. Statistics of chunks evaluated elsewhere are combined with merge.
+        NaN values (e.g. infeasible samples) and infinite values are only counted, so count + nan_count + infinite_count is the number of all values.
+
+        Arguments:
+            relative_accuracy {float} -- Relative error of the quantiles
+        Properties:
+            count {int} -- Number of finite values
+            nan_count {int} -- Number of NaN values
+            infinite_count {int} -- Number of infinite values
+            mean {float} -- Mean of the finite values
+            variance {float} -- Sample variance of the finite values
+            standard_deviation {float} -- Sample standard deviation of the finite values
+            minimum {float} -- Smallest finite value
+            maximum {float} -- Largest finite value
+        """
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.count = 0
+        self.nan_count = 0
+        self.infinite_count = 0
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.zero_count = 0
+        self.positive_buckets = collections.Counter()
+        self.negative_buckets = collections.Counter()
+
+    @property
+    def variance(self):
+        return self.squared_deviations / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def standard_deviation(self):
+        return math.sqrt(self.variance)
+
+    def update(self, values):
+        """Adds an array of values"""
+        values = np.asarray(values, dtype=float).ravel()
+        finite = np.isfinite(values)
+        if not finite.all():
+            nan_count = int(np.count_nonzero(np.isnan(values)))
+            self.nan_count += nan_count
+            self.infinite_count += len(values) - int(np.count_nonzero(finite)) - nan_count
+            values = values[finite]
+        if not len(values):
+            return
+        mean = float(np.mean(values))
+        chunk = StreamingStatistics(self.relative_accuracy)
+        chunk.count = len(values)
+        chunk.mean = mean
+        chunk.squared_deviations = float(np.sum(np.square(values - mean)))
+        chunk.minimum = float(np.min(values))
+        chunk.maximum = float(np.max(values))
+        chunk.zero_count = int(np.count_nonzero(values == 0))
+        logarithm_gamma = math.log(self.gamma)
+        for buckets, magnitudes in ((chunk.positive_buckets, values[values > 0]), (chunk.negative_buckets, -values[values < 0])):
+            indices, counts = np.unique(np.ceil(np.log(magnitudes) / logarithm_gamma).astype(np.int64), return_counts=True)
+            buckets.update(dict(zip(indices.tolist(), counts.tolist())))
+        self.merge(chunk)
+
+    def merge(self, other):
+        """Adds the values of other statistics with the same relative accuracy"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise Exception("Sorry, only statistics with the same relative accuracy can be merged")
+        self.nan_count += other.nan_count
+        self.infinite_count += other.infinite_count
+        count = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.squared_deviations += other.squared_deviations + delta * delta * self.count * other.count / count
+            self.count = count
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+            self.zero_count += other.zero_count
+            self.positive_buckets.update(other.positive_buckets)
+            self.negative_buckets.update(other.negative_buckets)
+        return self
+
+    def quantile(self, q):
+        """Estimates quantiles within the relative accuracy
+
+        Args:
+            q (float or array): Probabilities 0...1
+
+        Returns:
+            float or array: Quantiles, NaN without finite values
+        """
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, np.nan)[()]
+        negative = sorted(self.negative_buckets.items(), reverse=True)
+        positive = sorted(self.positive_buckets.items())
+        # Representative value of bucket i: 2 * gamma^i / (gamma + 1) has a relative error of at most the relative accuracy
+        values = np.array([-2 * self.gamma ** index / (self.gamma + 1) for index, _ in negative] + [0.0] + [2 * self.gamma ** index / (self.gamma + 1) for index, _ in positive])
+        counts = np.array([count for _, count in negative] + [self.zero_count] + [count for _, count in positive])
+        position = np.searchsorted(np.cumsum(counts), q * (self.count - 1), side='right')
+        return np.clip(values[np.minimum(position, len(values) - 1)], self.minimum, self.maximum)[()]
+
+    def summary(self, quantiles=(0.05, 0.5, 0.95)):
+        """Statistics as plain Python numbers
+
+        Returns:
+            dict: count, nan_count, infinite_count, mean, standard_deviation, minimum, maximum and quantiles (probability -> quantile)
+        """
+        return dict(count=self.count, nan_count=self.nan_count, infinite_count=self.infinite_count, mean=self.mean, standard_deviation=self.standard_deviation, minimum=self.minimum, maximum=self.maximum, quantiles=dict(zip(quantiles, np.atleast_1d(self.quantile(quantiles)).tolist())))
+
+
+def draw(rng, distribution, size):
+    """Draws samples of one input
+
+    Args:
+        rng (Generator): NumPy random generator
+        distribution (tuple or float): (name, parameters...) with a name of DISTRIBUTIONS and the parameters of the Generator method of the same name, e.g. ('normal', mean, standard deviation), or a fixed value
+        size (int): Number of samples
+
+    Returns:
+        array or float: Samples
+    """
+    if np.ndim(distribution) == 0:
+        return distribution
+    name, *parameters = distribution
+    if name not in DISTRIBUTIONS:
+        raise Exception("Sorry, you've misspelled the distribution")
+    return getattr(rng, name)(*parameters, size=size)
+
+
+def evaluate_chunk(evaluation, distributions, fixed, seed, index, size, relative_accuracy):
+    """Draws and evaluates the samples of one chunk with the random stream of the chunk index
+
+    Returns:
+        tuple: Chunk index and StreamingStatistics of the results
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    columns = dict(fixed)
+    for name, distribution in distributions.items():
+        columns[name] = draw(rng, distribution, size)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.broadcast_to(evaluation(columns), (size,))
+    statistics = StreamingStatistics(relative_accuracy)
+    statistics.update(values)
+    return index, statistics
+
+
+def monte_carlo(evaluation, distributions, fixed=None, samples=10**6, chunk_size=100000, seed=0, processes=None, progress=None, relative_accuracy=RELATIVE_ACCURACY):
+    """Propagates input distributions through a calculation by Monte Carlo sampling, chunk by chunk across a process pool
+
+    Every chunk draws its samples from its own random stream, derived from the seed and the chunk index with numpy's SeedSequence, so the result is reproducible and independent of the number of processes (but not of the chunk size). The chunk statistics are merged in chunk order with at most two chunks per process in flight, so memory stays constant regardless of the number of samples.
+
+    Args:
+        evaluation (callable): Picklable function mapping a dict of columns to one result per row, e.g. sweep.area_evaluation
+        distributions (dict): Input name -> distribution, see draw
+        fixed (dict, optional): Column name -> value for all inputs without distribution. Defaults to None.
+        samples (int, optional): Number of samples. Defaults to 10**6.
+        chunk_size (int, optional): Number of samples evaluated per chunk. Defaults to 100000.
+        seed (int, optional): Seed of the random streams. Defaults to 0.
+        processes (int, optional): Number of worker processes, 1 evaluates in the calling process. Defaults to None (number of CPUs).
+        progress (callable, optional): Called with (evaluated samples, total samples) after every chunk. Defaults to None.
+        relative_accuracy (float, optional): Relative error of the quantiles. Defaults to RELATIVE_ACCURACY.
+
+    Returns:
+        StreamingStatistics: Statistics of the results
+    """
+    fixed = dict(fixed or {})
+    chunks = ((index, min(chunk_size, samples - start)) for index, start in enumerate(range(0, samples, chunk_size)))
+    statistics = StreamingStatistics(relative_accuracy)
+    pending = {}
+    merged = 0
+    evaluated = 0
+
+    def store(index, chunk_statistics):
+        nonlocal merged, evaluated
+        pending[index] = chunk_statistics
+        evaluated += chunk_statistics.count + chunk_statistics.nan_count + chunk_statistics.infinite_count
+        # Merging in chunk order makes the rounding of the mean independent of the completion order
+        while merged in pending:
+            statistics.merge(pending.pop(merged))
+            merged += 1
+        if progress is not None:
+            progress(evaluated, samples)
+
+    if processes == 1:
+        for index, size in chunks:
+            store(*evaluate_chunk(evaluation, distributions, fixed, seed, index, size, relative_accuracy))
+    else:
+        processes = processes or os.cpu_count()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+            maximum_in_flight = 2 * processes
+            in_flight = set()
+            for index, size in chunks:
+                in_flight.add(executor.submit(evaluate_chunk, evaluation, distributions, fixed, seed, index, size, relative_accuracy))
+                if len(in_flight) >= maximum_in_flight:
+                    done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        store(*future.result())
+            for future in concurrent.futures.as_completed(in_flight):
+                store(*future.result())
+    return statistics
+
+
+def mixer_fraction_values(columns, mixer_side='none'):
+    """Evaluation returning only the mixer fractions of sweep.mixer_fraction_evaluation"""
+    return mixer_fraction_evaluation(columns, mixer_side)['mixer_fraction']
+
+
+def heat_exchanger_uncertainty(distributions, fixed, **options):
+    """Spread of the area of HeatExchanger, e.g. for uncertain film heat transfer coefficients because of fouling
+
+    Args:
+        distributions (dict): Attribute name of HeatExchanger (e.g. film_heat_transfer_coefficient_hot_stream) -> distribution, see draw
+        fixed (dict): Attribute name -> value for all attributes without distribution
+        options: Keyword arguments of monte_carlo
+
+    Returns:
+        StreamingStatistics: Statistics of the areas (m2)
+    """
+    return monte_carlo(area_evaluation, distributions, fixed, **options)
+
+
+def heat_exchanger_reverse_uncertainty(distributions, fixed, mixer_side='none', **options):
+    """Spread of the mixer fraction of HeatExchangerReverse, e.g. for uncertain heat capacity flows
+
+    Args:
+        distributions (dict): Attribute name of HeatExchangerReverse (e.g. heat_capacity_flow_hot_stream) -> distribution, see draw
+        fixed (dict): Attribute name -> value for all attributes without distribution
+        mixer_side (str, optional): Side of the mixer, see heat_exchanger_temperature_calculation. Defaults to 'none'.
+        options: Keyword arguments of monte_carlo
+
+    Returns:
+        StreamingStatistics: Statistics of the admixer or bypass fractions ((kg/s)/(kg/s)), samples without mixer are counted as NaN
+    """
+    return monte_carlo(functools.partial(mixer_fraction_values, mixer_side=mixer_side), distributions, fixed, **options)
@@ -0,0 +1,242 @@
+import numpy as np
+
+from heat_exchanger_batch import ADMIXER, BYPASS, NONE, mixer_type_codes
+from lambert_w import lambert_w_minus_one_into
+from lmtd import logarithmic_mean_temperature_difference_into
+
+AREA_COLUMNS = ('inlet_temperature_hot_stream', 'inlet_temperature_cold_stream', 'film_heat_transfer_coefficient_hot_stream', 'film_heat_transfer_coefficient_cold_stream', 'heat_capacity_flow_hot_stream', 'heat_capacity_flow_cold_stream', 'heat_load')
+REVERSE_COLUMNS = AREA_COLUMNS + ('existent_area',)
+REVERSE_OUTPUTS = (('mixer_type', np.int8), ('admixer_fraction', float), ('bypass_fraction', float), ('heat_exchanger_inlet_temperature_hot_stream', float), ('heat_exchanger_outlet_temperature_hot_stream', float), ('heat_exchanger_inlet_temperature_cold_stream', float), ('heat_exchanger_outlet_temperature_cold_stream', float))
+
+
+class Workspace:
+    """Class for reusable scratch arrays of the in-place batch calculations
+
+        Every scratch array is allocated on first use with size rows and reused by all later calculations with at most size rows, so evaluating chunk after chunk allocates no array data once the first chunk is done.
+
+        Arguments:
+            size {int} -- Largest number of rows of a calculation
+        Properties:
+            nbytes {int} -- Memory of all scratch arrays (bytes)
+        """
+
+    def __init__(self, size):
+        self.size = size
+        self._buffers = {}
+
+    def buffer(self, name, rows, dtype=float):
+        """Scratch array of the name with the first rows; its content is overwritten by the next calculation using the name"""
+        if rows > self.size:
+            raise Exception("Sorry, the workspace is too small for {} rows".format(rows))
+        try:
+            array = self._buffers[name]
+        except KeyError:
+            array = self._buffers[name] = np.empty(self.size, dtype=dtype)
+        return array[:rows]
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self._buffers.values())
+
+
+def number_of_rows(columns, names):
+    """Number of rows of the one-dimensional columns after broadcasting"""
+    shape = np.broadcast(*(columns[name] for name in names)).shape
+    if len(shape) > 1:
+        raise Exception("Sorry, the in-place calculation only supports one-dimensional columns")
+    return shape[0] if shape else 1
+
+
+def mixer_type_column(columns, name):
+    """Mixer type codes of the column; integer codes are used without conversion"""
+    mixer_type = columns.get(name, NONE)
+    if np.asarray(mixer_type).dtype.kind in 'iu':
+        return mixer_type
+    return mixer_type_codes(mixer_type)
+
+
+def flow_coefficients(workspace, side, rows, heat_capacity_flow, mixer_type, mixer_fraction):
+    """In-place k = 1 / (C * flow factor) and g = f * k for admixers (0 otherwise), see HeatExchangerBatch.mixer_coefficients"""
+    k = workspace.buffer('k_' + side, rows)
+    g = workspace.buffer('g_' + side, rows)
+    mask = workspace.buffer('mask', rows, bool)
+    k.fill(1)
+    np.equal(mixer_type, BYPASS, out=mask)
+    np.subtract(1, mixer_fraction, out=k, where=mask)
+    np.equal(mixer_type, ADMIXER, out=mask)
+    np.add(1, mixer_fraction, out=k, where=mask)
+    np.multiply(k, heat_capacity_flow, out=k)
+    np.divide(1, k, out=k)
+    g.fill(0)
+    np.multiply(mixer_fraction, k, out=g, where=mask)
+    return k, g
+
+
+def area_into(columns, workspace, out=None):
+    """Areas of HeatExchangerBatch calculated in place
+
+    Both temperature differences are dTa = Ti_h - Ti_c - Q * (g_h + k_h + g_c) and dTb = Ti_h - Ti_c - Q * (g_h + g_c + k_c) (see HeatExchangerBatch.area_gradient), which needs a fixed set of scratch arrays instead of one temporary per operation.
+
+    Args:
+        columns (dict): One-dimensional columns or scalars named like in HeatExchangerBatch.from_columns; mixer types preferably as int8 codes, names are converted
+        workspace (Workspace): Scratch arrays
+        out (array, optional): Array for the areas. Defaults to None (new array).
+
+    Returns:
+        array: Areas (m2)
+    """
+    rows = number_of_rows(columns, AREA_COLUMNS)
+    if out is None:
+        out = np.empty(rows)
+    heat_load = columns['heat_load']
+    k_h, g_h = flow_coefficients(workspace, 'hot', rows, columns['heat_capacity_flow_hot_stream'], mixer_type_column(columns, 'mixer_type_hot'), columns.get('mixer_fraction_hot', 0))
+    k_c, g_c = flow_coefficients(workspace, 'cold', rows, columns['heat_capacity_flow_cold_stream'], mixer_type_column(columns, 'mixer_type_cold'), columns.get('mixer_fraction_cold', 0))
+    temperature_difference_a = workspace.buffer('temperature_difference_a', rows)
+    temperature_difference_b = workspace.buffer('temperature_difference_b', rows)
+    logarithmic_mean = workspace.buffer('logarithmic_mean', rows)
+    scratch = workspace.buffer('scratch', rows)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.subtract(columns['inlet_temperature_hot_stream'], columns['inlet_temperature_cold_stream'], out=temperature_difference_a)
+        np.copyto(temperature_difference_b, temperature_difference_a)
+        np.add(g_h, g_c, out=scratch)
+        np.add(k_h, scratch, out=k_h)
+        np.multiply(k_h, heat_load, out=k_h)
+        np.subtract(temperature_difference_a, k_h, out=temperature_difference_a)
+        np.add(k_c, scratch, out=k_c)
+        np.multiply(k_c, heat_load, out=k_c)
+        np.subtract(temperature_difference_b, k_c, out=temperature_difference_b)
+        logarithmic_mean_temperature_difference_into(temperature_difference_a, temperature_difference_b, logarithmic_mean, workspace, columns.get('lmtd_mode', 'exact'))
+        # A = Q / (U * LMTD)
+        np.divide(1, columns['film_heat_transfer_coefficient_hot_stream'], out=scratch)
+        np.divide(1, columns['film_heat_transfer_coefficient_cold_stream'], out=g_h)
+        np.add(scratch, g_h, out=scratch)
+        np.divide(1, scratch, out=scratch)
+        np.multiply(scratch, logarithmic_mean, out=scratch)
+        np.divide(heat_load, scratch, out=out)
+    return out
+
+
+def reverse_into(columns, workspace, mixer_side='none', out=None):
+    """Mixer types, mixer fractions and heat exchanger temperatures of HeatExchangerReverseBatch.heat_exchanger_temperature_calculation calculated in place
+
+    Args:
+        columns (dict): One-dimensional columns or scalars named like in HeatExchangerReverseBatch.from_columns
+        workspace (Workspace): Scratch arrays
+        mixer_side (str or array, optional): Side of the mixer, see heat_exchanger_temperature_calculation. Defaults to 'none'.
+        out (dict, optional): Output name (see REVERSE_OUTPUTS) -> array for the results; missing outputs are new arrays. Defaults to None.
+
+    Returns:
+        dict: Output name -> array, mixer types as int8 codes and NaN fractions for rows without the mixer
+    """
+    rows = number_of_rows(columns, REVERSE_COLUMNS)
+    out = dict(out or {})
+    for name, dtype in REVERSE_OUTPUTS:
+        if name not in out:
+            out[name] = np.empty(rows, dtype=dtype)
+    inlet_temperature_hot_stream = columns['inlet_temperature_hot_stream']
+    inlet_temperature_cold_stream = columns['inlet_temperature_cold_stream']
+    heat_load = columns['heat_load']
+    existent_area = columns['existent_area']
+    outlet_temperature_hot_stream = workspace.buffer('outlet_temperature_hot_stream', rows)
+    outlet_temperature_cold_stream = workspace.buffer('outlet_temperature_cold_stream', rows)
+    dT_1 = workspace.buffer('temperature_difference_a', rows)
+    dT_2 = workspace.buffer('temperature_difference_b', rows)
+    logarithmic_mean = workspace.buffer('logarithmic_mean', rows)
+    scratch = workspace.buffer('scratch', rows)
+    dT_known = workspace.buffer('dT_known', rows)
+    dT_LMTD = workspace.buffer('dT_LMTD', rows)
+    dT_unknown = workspace.buffer('dT_unknown', rows)
+    hot_side = workspace.buffer('hot_side', rows, bool)
+    admixer_hot = workspace.buffer('admixer_hot', rows, bool)
+    admixer_cold = workspace.buffer('admixer_cold', rows, bool)
+    bypass_hot = workspace.buffer('bypass_hot', rows, bool)
+    bypass_cold = workspace.buffer('bypass_cold', rows, bool)
+    mask = workspace.buffer('mask', rows, bool)
+    mixer_type = out['mixer_type']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(heat_load, columns['heat_capacity_flow_hot_stream'], out=outlet_temperature_hot_stream)
+        np.subtract(inlet_temperature_hot_stream, outlet_temperature_hot_stream, out=outlet_temperature_hot_stream)
+        np.divide(heat_load, columns['heat_capacity_flow_cold_stream'], out=outlet_temperature_cold_stream)
+        np.add(inlet_temperature_cold_stream, outlet_temperature_cold_stream, out=outlet_temperature_cold_stream)
+        np.subtract(outlet_temperature_hot_stream, inlet_temperature_cold_stream, out=dT_1)
+        np.subtract(inlet_temperature_hot_stream, outlet_temperature_cold_stream, out=dT_2)
+        logarithmic_mean_temperature_difference_into(dT_1, dT_2, logarithmic_mean, workspace, columns.get('lmtd_mode', 'exact'))
+
+        # Area without mixer Q / (U * LMTD) decides the mixer type
+        np.divide(1, columns['film_heat_transfer_coefficient_hot_stream'], out=scratch)
+        np.divide(1, columns['film_heat_transfer_coefficient_cold_stream'], out=dT_LMTD)
+        np.add(scratch, dT_LMTD, out=scratch)
+        np.divide(1, scratch, out=scratch)
+        np.multiply(scratch, logarithmic_mean, out=dT_LMTD)
+        np.divide(heat_load, dT_LMTD, out=dT_LMTD)
+        mixer_type.fill(NONE)
+        np.greater(dT_LMTD, existent_area, out=mask)
+        np.copyto(mixer_type, ADMIXER, where=mask)
+        np.less(dT_LMTD, existent_area, out=mask)
+        np.copyto(mixer_type, BYPASS, where=mask)
+        # Logarithmic mean temperature difference of the existent area Q / (U * A)
+        np.multiply(scratch, existent_area, out=logarithmic_mean)
+        np.divide(heat_load, logarithmic_mean, out=logarithmic_mean)
+
+        if isinstance(mixer_side, str):
+            hot_side.fill(mixer_side == 'hot')
+        else:
+            np.equal(mixer_side, 'hot', out=hot_side)
+        np.equal(mixer_type, ADMIXER, out=mask)
+        np.logical_and(mask, hot_side, out=admixer_hot)
+        np.logical_xor(mask, admixer_hot, out=admixer_cold)
+        np.equal(mixer_type, BYPASS, out=mask)
+        np.logical_and(mask, hot_side, out=bypass_hot)
+        np.logical_xor(mask, bypass_hot, out=bypass_cold)
+
+        # Admixer hot side and bypass cold side start from dT_1, admixer cold side and bypass hot side from dT_2
+        np.logical_or(admixer_hot, bypass_cold, out=mask)
+        np.copyto(dT_known, dT_2)
+        np.copyto(dT_known, dT_1, where=mask)
+        np.divide(dT_known, logarithmic_mean, out=dT_LMTD)
+        np.not_equal(dT_known, logarithmic_mean, out=hot_side)
+        np.not_equal(mixer_type, NONE, out=mask)
+        np.logical_and(mask, hot_side, out=mask)
+        np.logical_not(mask, out=mask)
+        # z = -x * exp(-x), rows without solution get an argument inside the domain instead
+        np.negative(dT_LMTD, out=scratch)
+        np.exp(scratch, out=scratch)
+        np.multiply(scratch, dT_LMTD, out=scratch)
+        np.negative(scratch, out=scratch)
+        np.copyto(scratch, -0.25, where=mask)
+        lambert_w_minus_one_into(scratch, dT_unknown, workspace)
+        np.divide(dT_unknown, dT_LMTD, out=dT_unknown)
+        np.negative(dT_unknown, out=dT_unknown)
+        np.multiply(dT_unknown, dT_known, out=dT_unknown)
+        np.copyto(dT_unknown, dT_known, where=mask)
+
+        heat_exchanger_inlet_temperature_hot_stream = out['heat_exchanger_inlet_temperature_hot_stream']
+        heat_exchanger_outlet_temperature_hot_stream = out['heat_exchanger_outlet_temperature_hot_stream']
+        heat_exchanger_inlet_temperature_cold_stream = out['heat_exchanger_inlet_temperature_cold_stream']
+        heat_exchanger_outlet_temperature_cold_stream = out['heat_exchanger_outlet_temperature_cold_stream']
+        np.add(inlet_temperature_cold_stream, dT_unknown, out=scratch)
+        np.copyto(heat_exchanger_inlet_temperature_hot_stream, inlet_temperature_hot_stream)
+        np.copyto(heat_exchanger_inlet_temperature_hot_stream, scratch, where=admixer_hot)
+        np.copyto(heat_exchanger_outlet_temperature_hot_stream, outlet_temperature_hot_stream)
+        np.copyto(heat_exchanger_outlet_temperature_hot_stream, scratch, where=bypass_hot)
+        np.subtract(outlet_temperature_hot_stream, dT_unknown, out=scratch)
+        np.copyto(heat_exchanger_inlet_temperature_cold_stream, inlet_temperature_cold_stream)
+        np.copyto(heat_exchanger_inlet_temperature_cold_stream, scratch, where=admixer_cold)
+        np.subtract(inlet_temperature_hot_stream, dT_unknown, out=scratch)
+        np.copyto(heat_exchanger_outlet_temperature_cold_stream, outlet_temperature_cold_stream)
+        np.copyto(heat_exchanger_outlet_temperature_cold_stream, scratch, where=bypass_cold)
+
+        admixer_fraction = out['admixer_fraction']
+        bypass_fraction = out['bypass_fraction']
+        admixer_fraction.fill(np.nan)
+        bypass_fraction.fill(np.nan)
+        for fraction, where, numerator_minuend, numerator_subtrahend, denominator_minuend, denominator_subtrahend in (
+                (admixer_fraction, admixer_hot, inlet_temperature_hot_stream, heat_exchanger_inlet_temperature_hot_stream, heat_exchanger_inlet_temperature_hot_stream, outlet_temperature_hot_stream),
+                (admixer_fraction, admixer_cold, inlet_temperature_cold_stream, heat_exchanger_inlet_temperature_cold_stream, heat_exchanger_inlet_temperature_cold_stream, outlet_temperature_cold_stream),
+                (bypass_fraction, bypass_hot, outlet_temperature_hot_stream, inlet_temperature_hot_stream, heat_exchanger_outlet_temperature_hot_stream, inlet_temperature_hot_stream),
+                (bypass_fraction, bypass_cold, outlet_temperature_cold_stream, inlet_temperature_cold_stream, heat_exchanger_outlet_temperature_cold_stream, inlet_temperature_cold_stream)):
+            np.subtract(numerator_minuend, numerator_subtrahend, out=scratch)
+            np.subtract(denominator_minuend, denominator_subtrahend, out=dT_LMTD)
+            np.divide(scratch, dT_LMTD, out=scratch)
+            np.copyto(fraction, scratch, where=where)
+    return out